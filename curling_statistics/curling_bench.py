@@ -0,0 +1,248 @@
+"""
+Curling Stats Benchmark Harness
+===============================
+
+Times each stage of the curling pipeline on synthetic datasets (curling_synth.py)
+across sizes and file formats, with peak memory per stage, and writes the results as
+JSON for regression comparisons between commits or machines.
+
+Stages (per size x format):
+- generate: write the synthetic file (write_synthetic)
+- load_table: read it back
+- parse_end_value: the scalar token parser over up to --scalar-cells raw end cells
+- parse_end_columns: columnar parse of every end cell (EndMatrix.from_frame)
+- compute_stats_for_team: the most frequent team
+- compute_stats_all_teams: every team in one pass
+- save_table: write the combined per-game frame in the same format
+- run_all_teams: the full CLI run into a scratch output folder (sizes up to --run-all-max-rows)
+
+Peak memory is the tracemalloc high-water mark of the stage (Python and NumPy
+allocations; Arrow buffers are not tracked), plus the process max RSS after it.
+Tracing slows object-heavy stages; use --no-trace-memory for clean timings.
+
+Usage examples:
+  python curling_bench.py --sizes 1000 10000 100000 --formats csv parquet --out bench.json
+  python curling_bench.py --sizes 100000 --out bench_new.json --compare bench.json --tolerance 0.2
+"""
+
+#########################################
+# Importing Base Packages for Scripting #
+#########################################
+
+# Standard Python Base Packages
+from __future__ import annotations
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Third-Party Packages to be Installed via pip
+import numpy as np
+import pandas as pd
+
+# Project modules
+import run_all_teams
+from curling_stats import (
+    EndMatrix, _end_columns, compute_stats_all_teams, compute_stats_for_team, load_table,
+    parse_end_value, save_table,
+)
+from curling_metrics import max_rss_mb
+from curling_synth import write_synthetic
+
+FORMAT_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "xlsx": ".xlsx"}
+
+
+##########################
+# Measurement primitives #
+##########################
+
+def measure(fn: Callable[[], Any], trace_memory: bool = True) -> Tuple[Any, Dict[str, Any]]:
+    # Run fn once; returns (fn's result, timing / memory record)
+    gc.collect()
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        result = fn()
+    finally:
+        seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+    return result, {
+        "seconds": round(seconds, 6),
+        "peak_mb": None if peak is None else round(peak / 2**20, 2),
+        "max_rss_mb": max_rss_mb(),
+    }
+
+
+###############
+# Stage suite #
+###############
+
+def bench_dataset(
+    rows: int,
+    fmt: str,
+    workdir: str,
+    seed: int = 0,
+    trace_memory: bool = True,
+    scalar_cells: int = 200_000,
+    run_all_max_rows: int = 1_000_000,
+    synth_options: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Every stage for one size and format. A stage that fails is recorded with its
+    error and the stages that depend on it are skipped.
+    """
+    path = os.path.join(workdir, f"synthetic_{rows}{FORMAT_EXTENSIONS[fmt]}")
+    records: List[Dict[str, Any]] = []
+
+    def run(stage: str, fn: Callable[[], Any], units: int):
+        try:
+            result, rec = measure(fn, trace_memory)
+        except Exception as e:  # recorded, not raised: one broken stage should not end the suite
+            records.append({"stage": stage, "format": fmt, "rows": rows, "traced": trace_memory,
+                            "error": f"{type(e).__name__}: {e}"})
+            return None, False
+        rec.update(stage=stage, format=fmt, rows=rows, traced=trace_memory, units=units,
+                   units_per_sec=round(units / rec["seconds"], 1) if rec["seconds"] > 0 else None)
+        records.append(rec)
+        return result, True
+
+    _, ok = run("generate", lambda: write_synthetic(path, rows, seed=seed, **(synth_options or {})), rows)
+    if not ok:
+        return records
+    df, ok = run("load_table", lambda: load_table(path), rows)
+    if not ok:
+        return records
+
+    end_cols = _end_columns(df)
+    cells = df[end_cols].to_numpy().ravel()[:scalar_cells]
+    run("parse_end_value", lambda: [parse_end_value(c) for c in cells], len(cells))
+    ends, _ = run("parse_end_columns", lambda: EndMatrix.from_frame(df, end_cols), rows * len(end_cols))
+
+    team_col = next(c for c in df.columns if str(c).strip().lower() == "team name")
+    team = df[team_col].value_counts().index[0]
+    run("compute_stats_for_team", lambda: compute_stats_for_team(df, team, ends=ends), rows)
+    out, ok = run("compute_stats_all_teams", lambda: compute_stats_all_teams(df, ends=ends), rows)
+    if ok:
+        out_path = os.path.join(workdir, f"per_game_{rows}{FORMAT_EXTENSIONS[fmt]}")
+        run("save_table", lambda: save_table(out[1], out_path), len(out[1]))
+
+    if rows <= run_all_max_rows:
+        outdir = os.path.join(workdir, f"outputs_{rows}_{fmt}")
+
+        def run_all():
+            with contextlib.redirect_stdout(io.StringIO()):
+                run_all_teams.main(["--input", path, "--outdir", outdir])
+
+        run("run_all_teams", run_all, rows)
+    return records
+
+def environment() -> Dict[str, Any]:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+#############################
+# Reporting and comparisons #
+#############################
+
+def results_frame(results: List[Dict[str, Any]]) -> pd.DataFrame:
+    cols = ["stage", "format", "rows", "traced", "seconds", "units_per_sec", "peak_mb", "max_rss_mb", "error"]
+    frame = pd.DataFrame(results)
+    return frame.reindex(columns=[c for c in cols if c in frame.columns])
+
+def compare(current: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> pd.DataFrame:
+    """
+    Stage timings joined on (stage, format, rows, traced) with `ratio` = current /
+    baseline seconds; `regression` marks ratios above 1 + tolerance. Traced and
+    untraced runs are never paired, since tracemalloc inflates the timings.
+    """
+    key = ["stage", "format", "rows", "traced"]
+    cur = results_frame(current).dropna(subset=["seconds"])[key + ["seconds", "peak_mb"]]
+    base = results_frame(baseline).dropna(subset=["seconds"])[key + ["seconds", "peak_mb"]]
+    joined = cur.merge(base, on=key, suffixes=("", "_baseline"))
+    joined["ratio"] = (joined["seconds"] / joined["seconds_baseline"]).round(3)
+    joined["regression"] = joined["ratio"] > 1 + tolerance
+    return joined
+
+
+############################
+# Command line entry point #
+############################
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark the curling stats pipeline on synthetic data.")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                   help="Dataset sizes in rows (default: 1000 10000 100000)")
+    p.add_argument("--formats", nargs="+", choices=sorted(FORMAT_EXTENSIONS), default=["csv", "parquet"],
+                   help="File formats to test (default: csv parquet)")
+    p.add_argument("--teams", type=int, default=None, help="Distinct teams (default: rows / 100, at least 10)")
+    p.add_argument("--seed", type=int, default=0, help="Seed for the synthetic files (default: 0)")
+    p.add_argument("--scalar-cells", type=int, default=200_000,
+                   help="End cells fed to the scalar parse_end_value stage (default: 200000)")
+    p.add_argument("--run-all-max-rows", type=int, default=1_000_000,
+                   help="Largest size for the run_all_teams stage, which writes per-team files (default: 1000000)")
+    p.add_argument("--no-trace-memory", action="store_true", help="Skip tracemalloc (faster, no peak_mb)")
+    p.add_argument("--workdir", default=None, help="Folder for the generated files (default: a temporary folder)")
+    p.add_argument("--keep", action="store_true", help="Keep the generated files")
+    p.add_argument("--out", default=None, help="Write results as JSON to this path")
+    p.add_argument("--compare", default=None, help="Baseline results JSON to compare timings against")
+    p.add_argument("--tolerance", type=float, default=0.25,
+                   help="Allowed slowdown vs the baseline before a stage counts as a regression (default: 0.25)")
+    args = p.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="curling_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    results: List[Dict[str, Any]] = []
+    try:
+        for rows in args.sizes:
+            for fmt in args.formats:
+                opts = {"n_teams": args.teams or max(10, rows // 100)}
+                print(f"Benchmarking {rows} rows ({fmt}) ...", flush=True)
+                results += bench_dataset(
+                    rows, fmt, workdir, seed=args.seed, trace_memory=not args.no_trace_memory,
+                    scalar_cells=args.scalar_cells, run_all_max_rows=args.run_all_max_rows, synth_options=opts,
+                )
+    finally:
+        if not args.keep and args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print(results_frame(results).to_string(index=False))
+    payload = {"environment": environment(), "config": vars(args), "results": results}
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+        print(f"Wrote benchmark results: {args.out}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        cmp = compare(results, baseline, args.tolerance)
+        print("\nComparison against baseline:")
+        print(cmp.to_string(index=False))
+        if cmp["regression"].any():
+            print(f"{int(cmp['regression'].sum())} stage(s) slower than baseline by more than {args.tolerance:.0%}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+"""
+Curling Batch Results as Columnar Datasets
+==========================================
+
+Columnar output mode for run_all_teams.py (--output-format dataset). It replaces two
+small files per team and the ALL_* CSVs with three artifacts:
+
+  <OUTDIR>/per_game/team=<team>/part-0.parquet   per-game rows, one Hive partition per team
+  <OUTDIR>/team_stats.jsonl                      one aggregate dict per team, team order
+  <OUTDIR>/ALL_team_aggregate.parquet            flattened KPIs, one row per team
+
+Partition directory names are URL-encoded team names (the pyarrow / Hive convention),
+so `load_table(<OUTDIR>/per_game, team=...)` prunes partitions the same way it does for
+input archives. Every file is written to a temporary name next to its target and
+renamed into place; a full run builds the new per_game folder beside the old one and
+swaps it in, and an incremental run replaces only the partitions of changed teams.
+
+Per-game columns have a fixed schema (text columns as strings, end counts and
+counters as nullable int64, plus the float64 Elo columns of an --elo run), so chunks
+and runs always line up.
+
+Usage examples:
+  python run_all_teams.py --input games.csv --outdir outputs --output-format dataset
+  python curling_dataset.py outputs --team "Raccoons" --out raccoons_games.csv
+"""
+
+#########################################
+# Importing Base Packages for Scripting #
+#########################################
+
+# Standard Python Base Packages
+from __future__ import annotations
+import argparse
+import json
+import os
+import shutil
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from urllib.parse import quote
+
+# Third-Party Packages to be Installed via pip
+import pandas as pd
+
+# Project modules
+from curling_ratings import FEATURE_COLUMNS as PER_GAME_ELO_COLUMNS
+from curling_stats import save_table
+
+PER_GAME_DIR = "per_game"
+STATS_JSONL = "team_stats.jsonl"
+AGG_PARQUET = "ALL_team_aggregate.parquet"
+PARTITION_KEY = "team"
+
+# Per-game columns (as produced by compute_stats_all_teams) and their Parquet types
+PER_GAME_TEXT_COLUMNS = [
+    "__Team__", "Season", "Date", "Team Name", "Opponent", "Location", "Outcome (from dataset)",
+    "Computed Result", "Sheet", "Stone Color", "Game Type",
+]
+PER_GAME_INT_COLUMNS = [
+    "Planned Ends", "Ends Played", "Points For", "Points Against", "Hammer Ends",
+    "No-Hammer Ends", "Steals For", "Steals Against",
+]
+
+
+##################
+# Atomic writing #
+##################
+
+@contextmanager
+def atomic_path(path: str) -> Iterator[str]:
+    # Yields a temporary path next to `path`; renamed over `path` only if the block succeeds
+    tmp = os.path.join(os.path.dirname(path) or ".", f".{os.path.basename(path)}.tmp-{os.getpid()}")
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def partition_dir(outdir: str, team: str) -> str:
+    return os.path.join(outdir, PER_GAME_DIR, f"{PARTITION_KEY}={quote(str(team), safe='')}")
+
+
+#####################
+# Per-game datasets #
+#####################
+
+def per_game_schema(elo: bool = False):
+    import pyarrow as pa  # pandas' own Parquet engine
+    return pa.schema(
+        [(c, pa.string()) for c in PER_GAME_TEXT_COLUMNS] + [(c, pa.int64()) for c in PER_GAME_INT_COLUMNS]
+        + [(c, pa.float64()) for c in (PER_GAME_ELO_COLUMNS if elo else [])]
+    )
+
+def _text(values: pd.Series) -> pd.Series:
+    # Strings with nulls kept; whole-number floats (from columns with gaps) lose their ".0"
+    def one(v):
+        if v is None or (isinstance(v, float) and pd.isna(v)):
+            return None
+        if isinstance(v, float) and v.is_integer():
+            return str(int(v))
+        return str(v)
+    return pd.Series([one(v) for v in values], dtype=object)
+
+def per_game_table(per_game: pd.DataFrame):
+    """
+    Per-game frame with a `__Team__` column (compute_stats_all_teams /
+    TeamStatsAccumulator.update output) as an Arrow table in per_game_schema(), with
+    the Elo columns when the frame carries them. Non-numeric end counts become nulls.
+    """
+    import pyarrow as pa  # pandas' own Parquet engine
+    elo = all(c in per_game.columns for c in PER_GAME_ELO_COLUMNS)
+    arrays = []
+    for c in PER_GAME_TEXT_COLUMNS:
+        arrays.append(pa.array(_text(per_game[c]), type=pa.string()))
+    for c in PER_GAME_INT_COLUMNS:
+        num = pd.to_numeric(per_game[c], errors="coerce")
+        num = num.where(num.isna() | (num % 1 == 0))
+        arrays.append(pa.array(num.astype("Int64"), type=pa.int64()))
+    for c in PER_GAME_ELO_COLUMNS if elo else []:
+        arrays.append(pa.array(per_game[c].astype(float), type=pa.float64()))
+    return pa.Table.from_arrays(arrays, schema=per_game_schema(elo))
+
+def _write_partitions(data, base_dir: str, max_partitions: int):
+    # data: Arrow table, or a dataset / record batch reader in per_game_schema()
+    import pyarrow as pa  # pandas' own Parquet engine
+    import pyarrow.dataset as ds
+
+    partitioning = ds.partitioning(pa.schema([(PARTITION_KEY, pa.string())]), flavor="hive")
+    if isinstance(data, ds.Dataset):
+        data = data.scanner().to_reader()
+    if isinstance(data, pa.Table):
+        data = data.append_column(PARTITION_KEY, data["__Team__"])
+    else:
+        schema = data.schema.append(pa.field(PARTITION_KEY, pa.string()))
+        batches = (b.append_column(PARTITION_KEY, b.column("__Team__")) for b in data)
+        data = pa.RecordBatchReader.from_batches(schema, batches)
+    ds.write_dataset(
+        data, base_dir, format="parquet", partitioning=partitioning,
+        basename_template="part-{i}.parquet", preserve_order=True,
+        max_partitions=max(1024, max_partitions), existing_data_behavior="overwrite_or_ignore",
+    )
+    os.makedirs(base_dir, exist_ok=True)  # nothing is created for empty input
+
+def write_per_game_dataset(
+    outdir: str,
+    data,
+    n_teams: int,
+    replace_teams: Optional[Iterable[str]] = None,
+    remove_teams: Iterable[str] = (),
+):
+    """
+    Write per-game rows (see _write_partitions for accepted `data`) as the
+    team-partitioned dataset under `outdir`. With `replace_teams` None the whole
+    dataset is rebuilt beside the old one and swapped in; otherwise only those teams'
+    partitions (plus `remove_teams`) are replaced or removed.
+    """
+    root = os.path.join(outdir, PER_GAME_DIR)
+    staging = os.path.join(outdir, f".{PER_GAME_DIR}.tmp-{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    try:
+        _write_partitions(data, staging, n_teams)
+        if replace_teams is None:
+            # Swap whole folders: a rename cannot replace a non-empty directory in one step
+            old = f"{root}.old-{os.getpid()}"
+            if os.path.isdir(root):
+                os.replace(root, old)
+            os.replace(staging, root)
+            shutil.rmtree(old, ignore_errors=True)
+            return
+        os.makedirs(root, exist_ok=True)
+        for team in list(replace_teams) + list(remove_teams):
+            target = partition_dir(outdir, team)
+            staged = os.path.join(staging, os.path.basename(target))
+            if os.path.isdir(target):
+                shutil.rmtree(target)
+            if os.path.isdir(staged):
+                os.replace(staged, target)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+class PerGameStream:
+    """
+    Streamed counterpart of write_per_game_dataset: write() appends one chunk's
+    per-game rows to a staging Parquet file, and leaving the `with` block without an
+    error splits them into team partitions (rows stay in file order).
+    """
+
+    def __init__(self, outdir: str):
+        import pyarrow.parquet as pq  # pandas' own Parquet engine
+        self.outdir = outdir
+        self.path = os.path.join(outdir, f".{PER_GAME_DIR}.staging-{os.getpid()}.parquet")
+        self.teams: set = set()
+        self._writer = pq.ParquetWriter(self.path, per_game_schema())
+
+    def write(self, per_game: pd.DataFrame):
+        self.teams.update(per_game["__Team__"].astype(str).unique())
+        self._writer.write_table(per_game_table(per_game))
+
+    def __enter__(self) -> "PerGameStream":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        import pyarrow.dataset as ds
+        self._writer.close()
+        try:
+            if exc_type is None:
+                write_per_game_dataset(self.outdir, ds.dataset(self.path, format="parquet"), len(self.teams))
+        finally:
+            os.remove(self.path)
+
+
+#########################
+# Aggregate stats files #
+#########################
+
+def write_team_stats(outdir: str, stats: Dict[str, Dict[str, Any]], agg_frame: pd.DataFrame):
+    # team_stats.jsonl (nested dicts, in `stats` order) and the flattened Parquet table
+    with atomic_path(os.path.join(outdir, STATS_JSONL)) as tmp:
+        with open(tmp, "w", encoding="utf-8") as f:
+            for agg in stats.values():
+                f.write(json.dumps(agg, ensure_ascii=False, default=str) + "\n")
+    with atomic_path(os.path.join(outdir, AGG_PARQUET)) as tmp:
+        agg_frame.to_parquet(tmp, index=False)
+
+def read_team_stats(outdir: str, teams: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+    # {team: stats dict} from team_stats.jsonl, optionally only `teams`
+    wanted = None if teams is None else set(teams)
+    out: Dict[str, Dict[str, Any]] = {}
+    with open(os.path.join(outdir, STATS_JSONL), "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                agg = json.loads(line)
+                if wanted is None or agg["team"] in wanted:
+                    out[agg["team"]] = agg
+    return out
+
+def dataset_outputs_exist(outdir: str) -> bool:
+    return all(os.path.exists(os.path.join(outdir, n)) for n in (PER_GAME_DIR, STATS_JSONL, AGG_PARQUET))
+
+
+##########
+# Reader #
+##########
+
+def read_per_game(
+    outdir: str,
+    teams: Optional[Iterable[str]] = None,
+    columns: Optional[List[str]] = None,
+    memory_map: bool = True,
+) -> pd.DataFrame:
+    """
+    Per-game rows from the dataset under `outdir` (or the per_game folder itself),
+    in the layout of ALL_per_game.csv: leading `__Team__`, teams in sorted order, each
+    team's games in file order. `teams` (exact names) prunes partitions before any
+    file is opened; `columns` limits the columns read. Files are memory-mapped.
+    """
+    import pyarrow as pa  # pandas' own Parquet engine
+    import pyarrow.dataset as ds
+    from pyarrow import fs
+
+    root = outdir if os.path.basename(os.path.normpath(outdir)) == PER_GAME_DIR else os.path.join(outdir, PER_GAME_DIR)
+    dataset = ds.dataset(
+        os.path.abspath(root), format="parquet",
+        partitioning=ds.partitioning(pa.schema([(PARTITION_KEY, pa.string())]), flavor="hive"),
+        filesystem=fs.LocalFileSystem(use_mmap=memory_map),
+    )
+    wanted = None if columns is None else ["__Team__"] + [c for c in columns if c != "__Team__"]
+    filt = None if teams is None else ds.field(PARTITION_KEY).isin(list(teams))
+    table = dataset.to_table(columns=wanted, filter=filt)
+    # Stable sort: partitions come back in directory order, rows within a team keep file order
+    table = table.sort_by([("__Team__", "ascending")])
+    # The Hive partition column is not part of the ALL_per_game.csv layout (it repeats __Team__)
+    if PARTITION_KEY in table.column_names and (columns is None or PARTITION_KEY not in columns):
+        table = table.drop_columns([PARTITION_KEY])
+    return table.to_pandas()
+
+
+############################
+# Command line entry point #
+############################
+
+def main(argv: Optional[List[str]] = None):
+    p = argparse.ArgumentParser(description="Read a team-partitioned curling results dataset written by run_all_teams.py.")
+    p.add_argument("outdir", help="run_all_teams.py output folder (written with --output-format dataset)")
+    p.add_argument("--team", action="append", default=None, help="Team to read (exact name; repeatable)")
+    p.add_argument("--columns", nargs="+", default=None, help="Per-game columns to read")
+    p.add_argument("--out", default=None, help="Optional path to write the per-game rows (CSV/XLSX/Parquet)")
+    args = p.parse_args(argv)
+
+    per_game = read_per_game(args.outdir, teams=args.team, columns=args.columns)
+    stats = read_team_stats(args.outdir, teams=args.team)
+    print(f"Read {len(per_game)} per-game rows for {per_game['__Team__'].nunique()} team(s)")
+    for team, agg in stats.items():
+        rec = agg["record"]
+        print(f"  {team}: {agg['games_played']} games, {rec['wins']}-{rec['losses']}-{rec['ties']}")
+    if args.out:
+        save_table(per_game, args.out)
+        print(f"Wrote per-game rows: {args.out}")
+
+if __name__ == "__main__":
+    main()
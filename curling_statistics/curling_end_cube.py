@@ -0,0 +1,205 @@
+"""
+Curling End-Position Cube
+=========================
+
+Team x end number x hammer state analytics for every team in one vectorized pass.
+
+Every played end of every game becomes one cell contribution keyed by (team, optional
+slice columns, end position, hammer state). The counts are summed with np.bincount,
+so the cost does not grow with the number of teams. This answers questions like
+"how do we do in the last two ends with hammer" without per-team loops.
+
+End positions are counted from the start (`End N`) by default. With `align="finish"`
+they count back from the last end each game actually played (1 = final end, 2 = the
+one before it), which lines up the closing ends of 8- and 10-end games.
+
+Hammer state is "hammer", "no_hammer" or "unknown" (no H/N marker and nothing to
+infer it from). Each cube row reports ends, points for/against, scoring / 2+ / blank
+ends, steals for (without hammer) and steals against (with hammer), plus rates per end.
+
+Usage examples:
+  python curling_end_cube.py curling_statistics\\data\\curling_data.csv --out end_cube.csv
+  python curling_end_cube.py curling_statistics\\data\\curling_data.csv --align finish --by opponent --out closing_ends.csv
+"""
+
+#########################################
+# Importing Base Packages for Scripting #
+#########################################
+
+# Standard Python Base Packages
+from __future__ import annotations
+import argparse
+from typing import Dict, List, Optional, Sequence
+
+# Third-Party Packages to be Installed via pip
+import numpy as np
+import pandas as pd
+
+# Project modules
+from curling_stats import (
+    HAMMER_UNKNOWN, EndMatrix, _end_matrix, _normalized, _resolve_columns, _team_groups,
+    load_table, save_table,
+)
+from curling_trends import _rate
+
+################################
+# Cube dimensions and measures #
+################################
+
+# Optional slice name -> schema column
+SLICE_COLUMNS = {
+    "opponent": "Opponent",
+    "location": "Location",
+    "game_type": "Game Type",
+}
+
+# Hammer code (offset by -HAMMER_UNKNOWN so it indexes from 0) -> label
+HAMMER_LABELS = np.array(["unknown", "no_hammer", "hammer"])
+# Slice label for games with no value in the slice column
+UNKNOWN_SLICE = "(unknown)"
+
+MEASURES = [
+    "ends", "points_for", "points_against", "scoring_ends", "two_plus_ends",
+    "blank_ends", "steals_for", "steals_against",
+]
+
+
+def _end_measures(ends: EndMatrix) -> Dict[str, np.ndarray]:
+    # One value per played end (row-major order, matching np.nonzero(ends.played))
+    played = ends.played
+    pf = ends.points_for[played]
+    pa = ends.points_against[played]
+    return {
+        "ends": np.ones(len(pf), dtype=np.int64),
+        "points_for": pf,
+        "points_against": pa,
+        "scoring_ends": pf > 0,
+        "two_plus_ends": pf >= 2,
+        "blank_ends": ends.blank[played],
+        "steals_for": ends.steal_for[played],
+        "steals_against": ends.steal_against[played],
+    }
+
+def _end_positions(ends: EndMatrix, game: np.ndarray, end: np.ndarray, align: str) -> np.ndarray:
+    # 0-based end position of each played end, from the first end or back from the last played one
+    if align == "start" or not len(end):
+        return end
+    n_ends = ends.shape[1]
+    last_played = n_ends - 1 - np.argmax(ends.played[:, ::-1], axis=1)
+    return last_played[game] - end
+
+def _slice_codes(frame: pd.DataFrame, cols: Dict[str, object], by: Sequence[str]):
+    # Per-game codes and display labels for each slice; values match case-insensitively.
+    # Missing values (factorize code -1) get their own UNKNOWN_SLICE label after the seen ones
+    codes, labels = [], []
+    for name in by:
+        values = frame[cols[SLICE_COLUMNS[name]]]
+        code, uniques = pd.factorize(_normalized(values))
+        known = np.flatnonzero(code >= 0)
+        first_seen = known[np.unique(code[known], return_index=True)[1]]
+        codes.append(np.where(code >= 0, code, len(uniques)))
+        labels.append(np.append(values.astype(str).str.strip().to_numpy(dtype=object)[first_seen], UNKNOWN_SLICE))
+    return codes, labels
+
+
+################
+# Cube builder #
+################
+
+def end_cube(
+    df: pd.DataFrame,
+    season: Optional[str] = None,
+    by: Sequence[str] = (),
+    align: str = "start",
+    ends: Optional[EndMatrix] = None,
+) -> pd.DataFrame:
+    """
+    Tidy team x [slices] x end x hammer cube, one row per non-empty cell.
+
+    Teams are matched and named exactly as compute_stats_all_teams does. `by` adds any
+    of "opponent", "location", "game_type" as extra dimensions. The end column is
+    `end` (1 = first end) for align="start" and `end_from_finish` (1 = last end played)
+    for align="finish". `ends` may carry the already-parsed EndMatrix for all of `df`.
+    """
+    unknown = [b for b in by if b not in SLICE_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown slice(s) {unknown}; choose from {sorted(SLICE_COLUMNS)}")
+    if align not in ("start", "finish"):
+        raise ValueError(f"align must be 'start' or 'finish', not '{align}'")
+
+    cols, end_cols_real = _resolve_columns(df)
+    rows, groups = _team_groups(df, cols, season)
+    frame = df if rows is None else df.iloc[rows]
+    matrix = _end_matrix(df, end_cols_real, ends, rows)
+
+    # Per-game group id over (team, *slices)
+    team_names = list(groups)
+    team_code = np.full(len(frame), -1, dtype=np.int64)
+    for i, team_rows in enumerate(groups.values()):
+        team_code[team_rows] = i
+    slice_codes, slice_labels = _slice_codes(frame, cols, by)
+    game_keys, game_group = np.unique(np.column_stack([team_code] + slice_codes), axis=0, return_inverse=True)
+    game_group = game_group.ravel()
+
+    # Flatten to one entry per played end and scatter into (group, end position, hammer) cells
+    n_ends = matrix.shape[1]
+    game, end = np.nonzero(matrix.played)
+    # Games with no (matching) team name are not part of any team's cube
+    kept = team_code[game] >= 0
+    game, end = game[kept], end[kept]
+    position = _end_positions(matrix, game, end, align)
+    hammer = matrix.hammer[game, end].astype(np.int64) - HAMMER_UNKNOWN
+    cell = (game_group[game] * n_ends + position) * len(HAMMER_LABELS) + hammer
+    n_cells = len(game_keys) * n_ends * len(HAMMER_LABELS)
+
+    sums = {
+        m: np.bincount(cell, weights=w[kept], minlength=n_cells).astype(np.int64)
+        for m, w in _end_measures(matrix).items()
+    }
+    occupied = np.flatnonzero(sums["ends"])
+    group, rest = np.divmod(occupied, n_ends * len(HAMMER_LABELS))
+    position, hammer = np.divmod(rest, len(HAMMER_LABELS))
+
+    keys = game_keys[group]
+    out = {"team": np.array(team_names, dtype=object)[keys[:, 0]]}
+    for j, name in enumerate(by):
+        out[name] = slice_labels[j][keys[:, j + 1]]
+    out["end_from_finish" if align == "finish" else "end"] = position + 1
+    out["hammer"] = HAMMER_LABELS[hammer]
+    cube = pd.DataFrame(out)
+    for m in MEASURES:
+        cube[m] = sums[m][occupied]
+
+    e = cube["ends"].to_numpy()
+    cube["net_points_per_end"] = _rate(cube["points_for"].to_numpy() - cube["points_against"].to_numpy(), e)
+    for m in ("scoring_ends", "two_plus_ends", "blank_ends", "steals_for", "steals_against"):
+        cube[m.replace("_ends", "") + "_rate"] = _rate(cube[m].to_numpy(), e)
+    return cube
+
+
+############################
+# Command line entry point #
+############################
+
+def main(argv: Optional[List[str]] = None):
+    p = argparse.ArgumentParser(description="Team x end x hammer-state cube for every team in one pass.")
+    p.add_argument("input", help="Path to input table (CSV/XLSX/Parquet), or a directory/glob of partition files")
+    p.add_argument("--season", default=None, help="Optional season filter (exact match)")
+    p.add_argument("--by", action="append", default=[], choices=sorted(SLICE_COLUMNS),
+                   help="Extra slice dimension (repeatable)")
+    p.add_argument("--align", choices=["start", "finish"], default="start",
+                   help="Number ends from the first end (start) or back from the last end played (finish)")
+    p.add_argument("--out", default=None, help="Optional path to write the cube (CSV/XLSX/Parquet)")
+    args = p.parse_args(argv)
+
+    df = load_table(args.input, season=args.season)
+    cube = end_cube(df, season=args.season, by=args.by, align=args.align)
+
+    if args.out:
+        save_table(cube, args.out)
+        print(f"Wrote {len(cube)} cube rows for {cube['team'].nunique()} teams: {args.out}")
+    else:
+        print(cube.head(20).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
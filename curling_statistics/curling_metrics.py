@@ -0,0 +1,206 @@
+"""
+Curling Run Metrics
+===================
+
+Lightweight per-stage instrumentation for the curling CLIs (--profile /
+--metrics-out / --cprofile on curling_stats.py and run_all_teams.py).
+
+A RunMetrics object records, per named stage: wall time, number of calls (stages
+entered repeatedly, e.g. once per streamed chunk, are summed), the process max RSS
+after the stage and, with trace_memory=True, the tracemalloc peak inside it (absolute,
+and as growth over what was traced when the stage was entered; stages may nest, and an
+inner stage's peak also counts toward the stages around it). Free-form
+counts (rows, teams, ends, malformed tokens, ...) sit next to the stages, and the
+whole record is written as JSON. One stage can additionally run under cProfile, with
+the stats dumped to a .prof file (open with `python -m pstats` or snakeviz).
+
+Library functions take `metrics: Optional[RunMetrics] = None` and fall back to
+NO_METRICS, whose stages and counts do nothing, so uninstrumented calls cost nothing.
+"""
+
+#########################################
+# Importing Base Packages for Scripting #
+#########################################
+
+# Standard Python Base Packages
+from __future__ import annotations
+import cProfile
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource  # POSIX only; max RSS is reported as None elsewhere
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+
+def max_rss_mb() -> Optional[float]:
+    # Process high-water resident set size so far
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+##################
+# Metrics record #
+##################
+
+class RunMetrics:
+    """
+    Stage timings and counts for one CLI run. `cprofile_stage` names the stage run
+    under cProfile; its stats go to `cprofile_path`.
+    """
+
+    def __init__(
+        self,
+        command: str,
+        argv: Optional[List[str]] = None,
+        trace_memory: bool = False,
+        cprofile_path: Optional[str] = None,
+        cprofile_stage: Optional[str] = None,
+    ):
+        self.command = command
+        self.argv = list(argv) if argv is not None else sys.argv[1:]
+        self.trace_memory = trace_memory
+        self.cprofile_path = cprofile_path
+        self.cprofile_stage = cprofile_stage
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.counts: Dict[str, Any] = {}
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self._started = time.perf_counter()
+        self._profiler: Optional[cProfile.Profile] = cProfile.Profile() if cprofile_path else None
+        # [traced bytes at entry, running peak] per open stage, innermost last
+        self._memory_stack: List[List[int]] = []
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        profile = self._profiler is not None and name == self.cprofile_stage
+        if self.trace_memory:
+            # Bank the enclosing stage's peak so far before the global peak is reset
+            current, peak = tracemalloc.get_traced_memory()
+            if self._memory_stack:
+                self._memory_stack[-1][1] = max(self._memory_stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            self._memory_stack.append([current, current])
+        if profile:
+            self._profiler.enable()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            if profile:
+                self._profiler.disable()
+            rec = self.stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+            rec["seconds"] += seconds
+            rec["calls"] += 1
+            rec["max_rss_mb"] = max_rss_mb()
+            if self.trace_memory:
+                entered, banked = self._memory_stack.pop()
+                peak = max(banked, tracemalloc.get_traced_memory()[1])
+                if self._memory_stack:
+                    self._memory_stack[-1][1] = max(self._memory_stack[-1][1], peak)
+                rec["peak_traced_mb"] = max(rec.get("peak_traced_mb", 0.0), round(peak / 2**20, 2))
+                rec["peak_growth_mb"] = max(rec.get("peak_growth_mb", 0.0), round((peak - entered) / 2**20, 2))
+
+    def count(self, **values: Any):
+        # Numbers are summed across calls (e.g. per chunk); anything else is overwritten
+        for k, v in values.items():
+            if isinstance(v, (int, float)) and not isinstance(v, bool) and isinstance(self.counts.get(k), (int, float)):
+                self.counts[k] += v
+            else:
+                self.counts[k] = v
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "command": self.command,
+            "argv": self.argv,
+            "started_at": self.started_at,
+            "total_seconds": round(time.perf_counter() - self._started, 6),
+            "max_rss_mb": max_rss_mb(),
+            "stages": {
+                name: {k: round(v, 6) if isinstance(v, float) else v for k, v in rec.items()}
+                for name, rec in self.stages.items()
+            },
+            "counts": self.counts,
+            "environment": {"python": platform.python_version(), "platform": platform.platform(), "pid": os.getpid()},
+        }
+
+    def summary(self) -> str:
+        d = self.to_dict()
+        lines = [f"=== Stage metrics ({d['total_seconds']:.3f}s total, max RSS {d['max_rss_mb']} MB) ==="]
+        for name, rec in d["stages"].items():
+            mem = (f", traced peak {rec['peak_traced_mb']} MB (+{rec['peak_growth_mb']} MB)"
+                   if "peak_traced_mb" in rec else "")
+            calls = f" x{rec['calls']}" if rec["calls"] > 1 else ""
+            lines.append(f"  {name:<24} {rec['seconds']:>10.4f}s{calls}{mem}")
+        for k, v in d["counts"].items():
+            lines.append(f"  {k}: {v}")
+        return "\n".join(lines)
+
+    def finish(self, metrics_out: Optional[str] = None, print_summary: bool = False):
+        # Write the JSON record and the cProfile dump (when requested); stop memory tracing
+        if self._profiler is not None:
+            if self.cprofile_stage in self.stages:
+                self._profiler.dump_stats(self.cprofile_path)
+            else:
+                # An empty dump is not a valid pstats file
+                print(f"--cprofile: stage '{self.cprofile_stage}' did not run; nothing written to {self.cprofile_path}",
+                      file=sys.stderr)
+        if metrics_out:
+            with open(metrics_out + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, indent=2, default=str)
+            os.replace(metrics_out + ".tmp", metrics_out)
+        if print_summary:
+            print(self.summary(), file=sys.stderr)
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+class _NoMetrics:
+    # Stand-in used when a caller passes no metrics: every call is a no-op
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        yield
+
+    def count(self, **values: Any):
+        pass
+
+
+NO_METRICS = _NoMetrics()
+
+
+########################
+# Shared CLI arguments #
+########################
+
+def add_metrics_arguments(p, hot_stage: str):
+    p.add_argument("--profile", action="store_true", help="Print per-stage timings and counts to stderr")
+    p.add_argument("--metrics-out", default=None, help="Write per-stage timings and counts as JSON to this path")
+    p.add_argument("--trace-memory", action="store_true",
+                   help="Also record each stage's tracemalloc peak (slows Python-heavy stages)")
+    p.add_argument("--cprofile", default=None, metavar="PATH",
+                   help="Run one stage under cProfile and dump the stats to PATH (read with python -m pstats)")
+    p.add_argument("--cprofile-stage", default=hot_stage,
+                   help=f"Stage profiled by --cprofile (default: {hot_stage})")
+
+def metrics_from_args(args, command: str, argv: Optional[List[str]] = None) -> Optional[RunMetrics]:
+    # A RunMetrics when any metrics flag is set, else None
+    if not (args.profile or args.metrics_out or args.trace_memory or args.cprofile):
+        return None
+    return RunMetrics(
+        command, argv=argv, trace_memory=args.trace_memory,
+        cprofile_path=args.cprofile, cprofile_stage=args.cprofile_stage,
+    )
@@ -0,0 +1,434 @@
+"""
+Curling Team Ratings (Incremental Elo with As-Of Lookups)
+=========================================================
+
+Elo strength ratings for every team and opponent in the dataset, processed in Date
+order with the game result computed from the ends (W = 1, T = 0.5, L = 0).
+
+- A game between two tracked teams appears twice in the data (once from each side);
+  the mirrored rows are matched on (date, teams, score) and rated once.
+- New teams start at --initial and use the larger --k-provisional factor for their
+  first --provisional-games games, so early ratings settle quickly (the Glicko idea of
+  a wide initial uncertainty, without its full bookkeeping).
+- --margin scales K by the margin of victory (log of the point difference, damped
+  for favourites).
+
+A RatingBook keeps the current ratings plus a rating-history index: one int64 key
+per rated game (team code in the high 32 bits, day number in the low 32), sorted, with
+the rating after that game alongside. "Rating of X as of D" is one binary search over
+that array, and a batch of lookups is a single vectorized searchsorted. Books are saved
+as .npz and extended incrementally: only games after the last rated day (or on it but
+not yet rated) are processed, so history is never replayed.
+
+Per-game features (aligned to the input rows, NaN for unrated rows):
+  Elo, Opponent Elo (both before the game), Elo Expected Score, Elo Change
+
+Usage examples:
+  python curling_ratings.py curling_statistics\\data\\curling_data.csv --book ratings.npz
+  python curling_ratings.py curling_statistics\\data\\curling_data.csv --out-games elo_games.csv
+  python curling_ratings.py --book ratings.npz --as-of 2024-01-15 --team Friday_Monsters --team Raccoons
+"""
+
+#########################################
+# Importing Base Packages for Scripting #
+#########################################
+
+# Standard Python Base Packages
+from __future__ import annotations
+import argparse
+import json
+import math
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Third-Party Packages to be Installed via pip
+import numpy as np
+import pandas as pd
+
+# Project modules
+from curling_stats import (
+    EndMatrix, _end_matrix, _normalized, _resolve_columns, _result_letters, _team_groups,
+    load_table, save_table,
+)
+
+BOOK_VERSION = 1
+RESULT_SCORES = {"W": 1.0, "T": 0.5, "L": 0.0}
+FEATURE_COLUMNS = ["Elo", "Opponent Elo", "Elo Expected Score", "Elo Change"]
+
+# History keys pack (team code, day) into one sortable int64
+_DAY_OFFSET = 2**31
+_CODE_SHIFT = 2**32
+
+
+##############
+# Game table #
+##############
+
+def _days(dates: pd.Series) -> np.ndarray:
+    # Days since 1970-01-01 as float (NaN where the date does not parse)
+    parsed = pd.to_datetime(dates, errors="coerce").to_numpy(dtype="datetime64[ns]")
+    days = parsed.astype("datetime64[D]").astype(np.int64).astype(float)
+    days[np.isnat(parsed)] = np.nan
+    return days
+
+def games_frame(
+    df: pd.DataFrame,
+    season: Optional[str] = None,
+    ends: Optional[EndMatrix] = None,
+) -> pd.DataFrame:
+    """
+    One row per dated, played game row of `df` (after the optional season filter), in date
+    then file order: row (position in df), day, team / opponent (display names and
+    normalized keys), points, score, and `game` / `nth` / `primary`. Mirrored rows
+    of the same game share `game`; only the first of them has `primary` True. `nth`
+    numbers repeat meetings with the same score on the same day.
+    """
+    cols, end_cols = _resolve_columns(df)
+    rows, _ = _team_groups(df, cols, season)
+    frame = df if rows is None else df.iloc[rows]
+    positions = np.arange(len(df)) if rows is None else rows
+
+    matrix = _end_matrix(df, end_cols, ends, rows)
+    counters = matrix.game_counters()
+    letters = _result_letters(counters)
+    games = pd.DataFrame({
+        "row": positions,
+        "day": _days(frame[cols["Date"]]),
+        "team": frame[cols["Team Name"]].astype(str).str.strip().to_numpy(),
+        "opponent": frame[cols["Opponent"]].astype(str).str.strip().to_numpy(),
+        "team_key": _normalized(frame[cols["Team Name"]]).to_numpy(),
+        "opponent_key": _normalized(frame[cols["Opponent"]]).to_numpy(),
+        "points_for": counters["points_for"],
+        "points_against": counters["points_against"],
+        "score": pd.Series(letters).map(RESULT_SCORES).to_numpy(),
+    })
+    valid = (
+        ~np.isnan(games["day"].to_numpy())
+        & matrix.played.any(axis=1)
+        & frame[cols["Team Name"]].notna().to_numpy()
+        & frame[cols["Opponent"]].notna().to_numpy()
+        & (games["team_key"] != games["opponent_key"]).to_numpy()
+    )
+    games = games[valid].sort_values(["day", "row"], kind="stable").reset_index(drop=True)
+    games["day"] = games["day"].astype(np.int64)
+
+    # Orient every row as (lo, hi) team keys; the k-th occurrence from each side is the same game
+    flip = games["team_key"] > games["opponent_key"]
+    lo = games["team_key"].where(~flip, games["opponent_key"])
+    hi = games["opponent_key"].where(~flip, games["team_key"])
+    lo_pts = games["points_for"].where(~flip, games["points_against"])
+    hi_pts = games["points_against"].where(~flip, games["points_for"])
+    key = pd.DataFrame({"day": games["day"], "lo": lo, "hi": hi, "lo_pts": lo_pts, "hi_pts": hi_pts, "side": flip})
+    games["nth"] = key.groupby(["day", "lo", "hi", "lo_pts", "hi_pts", "side"], sort=False).cumcount().to_numpy()
+    game_key = key.drop(columns="side").assign(nth=games["nth"])
+    games["game"] = game_key.groupby(list(game_key.columns), sort=False).ngroup().to_numpy()
+    games["primary"] = ~games["game"].duplicated().to_numpy()
+    return games
+
+
+###############
+# Rating book #
+###############
+
+class RatingBook:
+    """
+    Current Elo ratings plus the as-of history index. add_games() rates only games
+    the book has not seen; as_of() / as_of_many() answer from the index.
+    """
+
+    def __init__(
+        self,
+        k: float = 20.0,
+        k_provisional: float = 40.0,
+        provisional_games: int = 10,
+        initial: float = 1500.0,
+        margin: bool = False,
+    ):
+        self.k, self.k_provisional, self.provisional_games = k, k_provisional, provisional_games
+        self.initial, self.margin = initial, margin
+        self.names: List[str] = []           # display name per team code
+        self.codes: Dict[str, int] = {}      # normalized name -> code
+        self.ratings: List[float] = []
+        self.games: List[int] = []
+        self.last_day: Optional[int] = None
+        self.last_day_games: set = set()     # (lo, hi, lo_pts, hi_pts, nth) rated on last_day
+        self._hist_keys: List[np.ndarray] = []
+        self._hist_ratings: List[np.ndarray] = []
+        self._index: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    # ----- rating -----
+
+    def _code(self, key: str, name: str) -> int:
+        code = self.codes.get(key)
+        if code is None:
+            code = self.codes[key] = len(self.names)
+            self.names.append(name)
+            self.ratings.append(self.initial)
+            self.games.append(0)
+        return code
+
+    def _k(self, code: int) -> float:
+        return self.k_provisional if self.games[code] < self.provisional_games else self.k
+
+    def add_games(self, games: pd.DataFrame) -> pd.DataFrame:
+        """
+        Rate the games in `games` (a games_frame) that the book has not rated yet, in
+        order, and return their per-row features (index = games' `row`). Games dated
+        before the book's last rated day are taken as already rated and skipped, so a
+        grown file can be passed in whole; back-dated additions need a fresh book.
+        """
+        if self.last_day is not None:
+            games = games[games["day"].to_numpy() >= self.last_day]
+
+        primary = games[games["primary"].to_numpy()]
+        team_key, opp_key = primary["team_key"].to_numpy(), primary["opponent_key"].to_numpy()
+        team_name, opp_name = primary["team"].to_numpy(), primary["opponent"].to_numpy()
+        days, scores = primary["day"].to_numpy(), primary["score"].to_numpy()
+        diff = (primary["points_for"] - primary["points_against"]).to_numpy()
+        fingerprint = _game_fingerprints(primary)
+
+        n = len(primary)
+        rated = np.zeros(n, dtype=bool)
+        before = np.full((n, 2), np.nan)
+        change = np.full((n, 2), np.nan)
+        hist_codes, hist_days, hist_ratings = [], [], []
+        ratings, games_played = self.ratings, self.games
+
+        for i in range(n):
+            day = int(days[i])
+            if day == self.last_day and fingerprint[i] in self.last_day_games:
+                continue
+            if day != self.last_day:
+                self.last_day, self.last_day_games = day, set()
+            self.last_day_games.add(fingerprint[i])
+
+            a, b = self._code(team_key[i], team_name[i]), self._code(opp_key[i], opp_name[i])
+            ra, rb = ratings[a], ratings[b]
+            expected = 1.0 / (1.0 + 10.0 ** ((rb - ra) / 400.0))
+            mult = _margin_multiplier(diff[i], ra - rb) if self.margin else 1.0
+            da = self._k(a) * mult * (scores[i] - expected)
+            db = self._k(b) * mult * ((1.0 - scores[i]) - (1.0 - expected))
+            ratings[a], ratings[b] = ra + da, rb + db
+            games_played[a] += 1
+            games_played[b] += 1
+
+            rated[i] = True
+            before[i] = (ra, rb)
+            change[i] = (da, db)
+            hist_codes += (a, b)
+            hist_days += (day, day)
+            hist_ratings += (ratings[a], ratings[b])
+
+        if hist_codes:
+            self._hist_keys.append(_history_keys(np.array(hist_codes), np.array(hist_days)))
+            self._hist_ratings.append(np.array(hist_ratings, dtype=np.float32))
+            self._index = None
+        return _features(games, primary["game"].to_numpy()[rated], before[rated], change[rated])
+
+    # ----- lookups -----
+
+    def index(self) -> Tuple[np.ndarray, np.ndarray]:
+        # (sorted history keys, rating after each entry); rebuilt lazily after add_games
+        if self._index is None:
+            keys = np.concatenate(self._hist_keys) if self._hist_keys else np.zeros(0, dtype=np.int64)
+            vals = np.concatenate(self._hist_ratings) if self._hist_ratings else np.zeros(0, dtype=np.float32)
+            order = np.argsort(keys, kind="stable")
+            self._hist_keys, self._hist_ratings = [keys[order]], [vals[order]]
+            self._index = (self._hist_keys[0], self._hist_ratings[0])
+        return self._index
+
+    def as_of_many(self, teams: Iterable[str], dates: Iterable[object]) -> np.ndarray:
+        """
+        Rating of each team after all of its games on or before the matching date
+        (--initial before its first game, NaN for unknown teams or dates).
+        """
+        teams = [str(t).strip().lower() for t in teams]
+        days = _days(pd.Series(list(dates), dtype=object))
+        codes = np.array([self.codes.get(t, -1) for t in teams], dtype=np.int64)
+        out = np.full(len(teams), np.nan)
+        ok = (codes >= 0) & ~np.isnan(days)
+        if not ok.any():
+            return out
+        keys, vals = self.index()
+        q = _history_keys(codes[ok], days[ok].astype(np.int64))
+        pos = np.searchsorted(keys, q, side="right") - 1
+        hit = (pos >= 0) & (keys[np.maximum(pos, 0)] // _CODE_SHIFT == codes[ok])
+        out[ok] = np.where(hit, vals[np.maximum(pos, 0)], self.initial)
+        return out
+
+    def as_of(self, team: str, date: object) -> Optional[float]:
+        value = self.as_of_many([team], [date])[0]
+        return None if np.isnan(value) else float(value)
+
+    def table(self, date: Optional[object] = None) -> pd.DataFrame:
+        # Leaderboard: current ratings, or as of `date`
+        ratings, games = np.array(self.ratings), np.array(self.games)
+        if date is not None:
+            ratings = self.as_of_many(self.names, [date] * len(self.names))
+            # Games so far = history entries between the team's first key and the as-of key
+            keys, _ = self.index()
+            codes = np.arange(len(self.names), dtype=np.int64)
+            day = _days(pd.Series([date], dtype=object))[0]
+            if np.isnan(day):
+                raise ValueError(f"Could not parse as-of date: {date!r}")
+            games = (
+                np.searchsorted(keys, _history_keys(codes, np.full(len(codes), int(day))), side="right")
+                - np.searchsorted(keys, codes * _CODE_SHIFT)
+            )
+            keep = games > 0
+            ratings, games, names = ratings[keep], games[keep], np.array(self.names, dtype=object)[keep]
+        else:
+            names = self.names
+        frame = pd.DataFrame({"team": names, "rating": np.round(ratings, 1), "games": games})
+        return frame.sort_values(["rating", "team"], ascending=[False, True], kind="stable").reset_index(drop=True)
+
+    # ----- persistence -----
+
+    def save(self, path: str):
+        keys, vals = self.index()
+        meta = {
+            "version": BOOK_VERSION,
+            "params": {"k": self.k, "k_provisional": self.k_provisional, "provisional_games": self.provisional_games,
+                       "initial": self.initial, "margin": self.margin},
+            "names": self.names,
+            "ratings": self.ratings,
+            "games": self.games,
+            "last_day": self.last_day,
+            "last_day_games": sorted(list(g) for g in self.last_day_games),
+        }
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, keys=keys, ratings=vals, meta=np.array(json.dumps(meta)))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "RatingBook":
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            keys, vals = data["keys"], data["ratings"]
+        if meta.get("version") != BOOK_VERSION:
+            raise ValueError(f"Rating book {path} has version {meta.get('version')}, expected {BOOK_VERSION}")
+        book = cls(**meta["params"])
+        book.names, book.ratings, book.games = meta["names"], meta["ratings"], meta["games"]
+        book.codes = {n.strip().lower(): i for i, n in enumerate(book.names)}
+        book.last_day = meta["last_day"]
+        book.last_day_games = {tuple(g) for g in meta["last_day_games"]}
+        book._hist_keys, book._hist_ratings = [keys], [vals]
+        book._index = (keys, vals)
+        return book
+
+
+def _history_keys(codes: np.ndarray, days: np.ndarray) -> np.ndarray:
+    return codes.astype(np.int64) * _CODE_SHIFT + (days.astype(np.int64) + _DAY_OFFSET)
+
+def _margin_multiplier(point_diff: int, rating_diff: float) -> float:
+    # Bigger wins move ratings more; the winner's rating edge damps it (avoids runaway favourites)
+    if point_diff == 0:
+        return 1.0
+    winner_edge = rating_diff if point_diff > 0 else -rating_diff
+    return math.log(abs(point_diff) + 1) * 2.2 / (winner_edge * 0.001 + 2.2)
+
+def _game_fingerprints(games: pd.DataFrame) -> List[tuple]:
+    # Same-day identity of a game that survives re-reading the file: (lo, hi, lo_pts, hi_pts, nth)
+    flip = (games["team_key"] > games["opponent_key"]).to_numpy()
+    tk, ok = games["team_key"].to_numpy(), games["opponent_key"].to_numpy()
+    pf, pa = games["points_for"].to_numpy(), games["points_against"].to_numpy()
+    return list(zip(
+        np.where(flip, ok, tk).tolist(), np.where(flip, tk, ok).tolist(),
+        np.where(flip, pa, pf).tolist(), np.where(flip, pf, pa).tolist(), games["nth"].tolist(),
+    ))
+
+def _features(games: pd.DataFrame, rated_games: np.ndarray, before: np.ndarray, change: np.ndarray) -> pd.DataFrame:
+    # Per-row features for every row (both sides) of the rated games, indexed by df position
+    lookup = pd.DataFrame({
+        "game": rated_games, "ra": before[:, 0], "rb": before[:, 1], "da": change[:, 0], "db": change[:, 1],
+    })
+    rows = games[["row", "game", "primary"]].merge(lookup, on="game", how="inner")
+    # A game has at most one row per side, so the non-primary row is the mirrored view
+    own = rows["primary"].to_numpy()
+    elo = np.where(own, rows["ra"], rows["rb"])
+    opp = np.where(own, rows["rb"], rows["ra"])
+    expected = 1.0 / (1.0 + 10.0 ** ((opp - elo) / 400.0))
+    return pd.DataFrame({
+        "Elo": np.round(elo, 1),
+        "Opponent Elo": np.round(opp, 1),
+        "Elo Expected Score": np.round(expected, 4),
+        "Elo Change": np.round(np.where(own, rows["da"], rows["db"]), 2),
+    }, index=pd.Index(rows["row"].to_numpy(), name="row")).sort_index()
+
+
+##################
+# Dataset helper #
+##################
+
+def rating_features(
+    df: pd.DataFrame,
+    season: Optional[str] = None,
+    ends: Optional[EndMatrix] = None,
+    book: Optional[RatingBook] = None,
+) -> Tuple[pd.DataFrame, RatingBook]:
+    """
+    (FEATURE_COLUMNS frame aligned to df's rows, the book) after rating every new game
+    of `df` into `book` (a fresh RatingBook when None). Rows the book rated in an
+    earlier run, undated rows and games against oneself get NaN.
+    """
+    book = book if book is not None else RatingBook()
+    features = book.add_games(games_frame(df, season=season, ends=ends))
+    aligned = pd.DataFrame(np.nan, index=pd.RangeIndex(len(df)), columns=FEATURE_COLUMNS)
+    aligned.loc[features.index, FEATURE_COLUMNS] = features[FEATURE_COLUMNS].to_numpy()
+    return aligned, book
+
+
+############################
+# Command line entry point #
+############################
+
+def main(argv: Optional[List[str]] = None):
+    p = argparse.ArgumentParser(description="Elo ratings for curling teams, with as-of-date lookups.")
+    p.add_argument("input", nargs="?", default=None,
+                   help="Path to input table (CSV/XLSX/Parquet) or a directory/glob of partition files; "
+                        "omit to only query an existing --book")
+    p.add_argument("--season", default=None, help="Optional season filter (exact match)")
+    p.add_argument("--book", default=None, help="Rating book (.npz) to extend and save; created if missing")
+    p.add_argument("--k", type=float, default=20.0, help="K factor (default: 20)")
+    p.add_argument("--k-provisional", type=float, default=40.0, help="K factor for a team's first games (default: 40)")
+    p.add_argument("--provisional-games", type=int, default=10, help="Games played with the provisional K (default: 10)")
+    p.add_argument("--initial", type=float, default=1500.0, help="Starting rating (default: 1500)")
+    p.add_argument("--margin", action="store_true", help="Scale K by the margin of victory")
+    p.add_argument("--as-of", default=None, help="Report ratings as of this date instead of the latest")
+    p.add_argument("--team", action="append", default=None, help="Only report these teams (repeatable)")
+    p.add_argument("--out", default=None, help="Optional path to write the ratings table (CSV/XLSX/Parquet)")
+    p.add_argument("--out-games", default=None,
+                   help="Optional path to write the input with Elo features per game row (CSV/XLSX/Parquet)")
+    args = p.parse_args(argv)
+
+    if args.book and os.path.exists(args.book):
+        book = RatingBook.load(args.book)
+    else:
+        book = RatingBook(k=args.k, k_provisional=args.k_provisional, provisional_games=args.provisional_games,
+                          initial=args.initial, margin=args.margin)
+    if args.input:
+        df = load_table(args.input, season=args.season)
+        features, book = rating_features(df, season=args.season, book=book)
+        print(f"Rated {int(features['Elo'].notna().sum())} new game rows; {len(book.names)} teams in the book")
+        if args.out_games:
+            save_table(pd.concat([df.reset_index(drop=True), features], axis=1), args.out_games)
+            print(f"Wrote per-game Elo features: {args.out_games}")
+        if args.book:
+            book.save(args.book)
+            print(f"Saved rating book: {args.book}")
+    elif not args.book:
+        p.error("Pass an input table, a --book, or both")
+
+    table = book.table(args.as_of)
+    if args.team:
+        wanted = {t.strip().lower() for t in args.team}
+        table = table[table["team"].str.strip().str.lower().isin(wanted)]
+    print(f"\n=== Ratings{' as of ' + args.as_of if args.as_of else ''} ===")
+    print(table.head(50).to_string(index=False))
+    if args.out:
+        save_table(table, args.out)
+        print(f"Wrote ratings: {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+Curling Stats Query Server
+==========================
+
+Long-running local HTTP/JSON server that loads a curling dataset once and answers
+team stats queries without re-reading or re-parsing the file per request.
+
+On load the dataset's end cells are parsed into one EndMatrix and the per-game
+counters for every row are computed up front. Row-position indexes are built on
+team, season, opponent, location and game type (case-insensitive, like
+compute_stats_for_team), so a query is an index intersection plus a few array sums.
+Finalized results are kept in an LRU cache that is cleared whenever the input
+file(s) change on disk.
+
+Endpoints (GET, JSON responses):
+- /stats?team=Monsters[&season=..][&opponent=..][&location=..][&game_type=..][&games=1]
+    → {"aggregate": {...same as compute_stats_for_team...}, "games": [...]} (games only with games=1)
+- /teams → sorted team names
+- /health → row count, cache size, load time
+
+Usage examples:
+  python curling_stats.py serve curling_statistics\\data\\curling_data.csv
+  python curling_server.py curling_statistics\\data\\curling_data.csv --port 8765 --cache-size 2048
+"""
+
+#########################################
+# Importing Base Packages for Scripting #
+#########################################
+
+# Standard Python Base Packages
+from __future__ import annotations
+import argparse
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# Third-Party Packages to be Installed via pip
+import numpy as np
+
+# Project modules
+from curling_stats import (
+    EndMatrix, _build_aggregate, _key_groups, _per_game_frame, _resolve_columns, _result_letters,
+    dataset_files, is_multi_file, load_table, load_table_cached,
+)
+
+###########################
+# Query dimensions/config #
+###########################
+
+# Query parameter -> schema column indexed for it
+INDEXED_COLUMNS = {
+    "team": "Team Name",
+    "season": "Season",
+    "opponent": "Opponent",
+    "location": "Location",
+    "game_type": "Game Type",
+}
+CHECK_INTERVAL = 1.0  # seconds between on-disk change checks
+
+
+class UnknownFilterError(KeyError):
+    """A query filter that is not one of INDEXED_COLUMNS (HTTP 400)."""
+
+
+################################################
+# In-memory dataset with indexes and LRU cache #
+################################################
+
+class StatsIndex:
+    """
+    Dataset loaded once with per-row game counters and per-dimension row indexes.
+    Thread-safe; reloads itself when the source file(s) change.
+    """
+
+    def __init__(self, path: str, cache_size: int = 1024, use_parse_cache: bool = False):
+        self.path = path
+        self.cache_size = cache_size
+        self.use_parse_cache = use_parse_cache and not is_multi_file(path)
+        self._lock = threading.RLock()
+        self._reload_lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple, Dict]" = OrderedDict()
+        self._fingerprint: Tuple = ()
+        self._checked_at = 0.0
+        self.load()
+
+    def _source_fingerprint(self) -> Tuple:
+        files = dataset_files(self.path) if is_multi_file(self.path) else [self.path]
+        return tuple((f, os.stat(f).st_size, os.stat(f).st_mtime_ns) for f in files)
+
+    def load(self):
+        started = time.perf_counter()
+        fingerprint = self._source_fingerprint()
+        if self.use_parse_cache:
+            df, ends = load_table_cached(self.path)
+        else:
+            df = load_table(self.path)
+            ends = None
+        cols, end_cols = _resolve_columns(df)
+        if ends is None:
+            ends = EndMatrix.from_frame(df, end_cols)
+
+        # Every game's counters are computed once; queries only sum subsets of them
+        counters = ends.game_counters()
+        letters = _result_letters(counters)
+        indexes = {param: _key_groups(df[cols[col]]) for param, col in INDEXED_COLUMNS.items()}
+        teams = sorted(df[cols["Team Name"]].dropna().astype(str).unique())
+
+        with self._lock:
+            self.df, self.cols = df, cols
+            self.counters, self.letters = counters, letters
+            self.indexes, self.teams = indexes, teams
+            self.season_values = df[cols["Season"]].tolist()
+            self._fingerprint = fingerprint
+            self._checked_at = time.monotonic()
+            self._cache.clear()
+            self.load_seconds = time.perf_counter() - started
+
+    def refresh_if_changed(self):
+        # Cheap stat() check, rate-limited; a changed source reloads and empties the cache.
+        # One thread reloads (outside the query lock); requests arriving meanwhile use the loaded data.
+        # A failed load leaves the old data and fingerprint in place and raises; it is retried on a later check.
+        now = time.monotonic()
+        if now - self._checked_at < CHECK_INTERVAL:
+            return
+        if not self._reload_lock.acquire(blocking=False):
+            return
+        try:
+            with self._lock:
+                self._checked_at = now
+            try:
+                changed = self._source_fingerprint() != self._fingerprint
+            except OSError:
+                return
+            if changed:
+                self.load()
+        finally:
+            self._reload_lock.release()
+
+    def _rows(self, filters: Dict[str, str]) -> np.ndarray:
+        rows: Optional[np.ndarray] = None
+        for param, value in filters.items():
+            hit = self.indexes[param].get(value.strip().lower())
+            if hit is None:
+                return np.array([], dtype=np.intp)
+            # Index position lists are sorted, so intersections stay sorted too
+            rows = hit if rows is None else np.intersect1d(rows, hit, assume_unique=True)
+        return rows
+
+    def query(self, team: str, include_games: bool = False, **filters: Optional[str]) -> Dict:
+        """
+        Same aggregate as compute_stats_for_team(df, team, season) with optional extra
+        opponent/location/game_type filters. Raises ValueError when nothing matches.
+        """
+        filters = {k: v for k, v in filters.items() if v is not None}
+        unknown = set(filters) - set(INDEXED_COLUMNS)
+        if unknown:
+            raise UnknownFilterError(f"Unknown filter(s): {sorted(unknown)}")
+        filters["team"] = team
+
+        key = (team, include_games) + tuple(sorted((k, v.strip().lower()) for k, v in filters.items()))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+            rows = self._rows(filters)
+            if len(rows) == 0:
+                extra = {k: v for k, v in filters.items() if k != "team"}
+                msg = f"No rows found for team '{team}'" + (f" with {extra}" if extra else "")
+                raise ValueError(msg)
+
+            seasons = {str(self.season_values[i]) for i in rows}
+            counters = {f: v[rows] for f, v in self.counters.items()}
+            result = {"aggregate": _build_aggregate(team, seasons, counters, self.letters[rows]).finalize()}
+            if include_games:
+                games = _per_game_frame(self.df.iloc[rows], self.cols, counters, self.letters[rows])
+                result["games"] = json.loads(games.to_json(orient="records"))
+
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return result
+
+
+##################
+# HTTP interface #
+##################
+
+def make_handler(index: StatsIndex, verbose: bool = False):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload):
+            body = json.dumps(payload, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            try:
+                index.refresh_if_changed()
+            except Exception as e:  # e.g. a half-written input file; the next check retries
+                return self._send(503, {"error": f"Reloading the dataset failed: {e}"})
+
+            if url.path == "/health":
+                return self._send(200, {
+                    "rows": len(index.df),
+                    "teams": len(index.teams),
+                    "cached_results": len(index._cache),
+                    "load_seconds": round(index.load_seconds, 4),
+                })
+            if url.path == "/teams":
+                return self._send(200, index.teams)
+            if url.path != "/stats":
+                return self._send(404, {"error": f"Unknown path '{url.path}'"})
+
+            team = params.pop("team", None)
+            if not team:
+                return self._send(400, {"error": "Missing required 'team' parameter"})
+            include_games = params.pop("games", "0").lower() in {"1", "true", "yes"}
+            try:
+                return self._send(200, index.query(team, include_games=include_games, **params))
+            except UnknownFilterError as e:
+                return self._send(400, {"error": str(e.args[0])})
+            except ValueError as e:
+                return self._send(404, {"error": str(e)})
+
+        def log_message(self, format, *args):
+            if verbose:
+                super().log_message(format, *args)
+
+    return Handler
+
+def serve(index: StatsIndex, host: str = "127.0.0.1", port: int = 8765, verbose: bool = False):
+    server = ThreadingHTTPServer((host, port), make_handler(index, verbose))
+    print(f"Serving {len(index.df)} rows / {len(index.teams)} teams from {index.path} on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+############################
+# Command line entry point #
+############################
+
+def main(argv: Optional[List[str]] = None):
+    p = argparse.ArgumentParser(description="Serve curling team stats over local HTTP/JSON from an in-memory dataset.")
+    p.add_argument("input", help="Path to input table (CSV/XLSX/Parquet), or a directory/glob of partition files")
+    p.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    p.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765)")
+    p.add_argument("--cache-size", type=int, default=1024, help="Finalized results kept in the LRU cache")
+    p.add_argument("--cache", action=argparse.BooleanOptionalAction, default=False,
+                   help="Load through the on-disk parse cache (single files only)")
+    p.add_argument("--verbose", action="store_true", help="Log every request")
+    args = p.parse_args(argv)
+
+    index = StatsIndex(args.input, cache_size=args.cache_size, use_parse_cache=args.cache)
+    serve(index, host=args.host, port=args.port, verbose=args.verbose)
+
+if __name__ == "__main__":
+    main()
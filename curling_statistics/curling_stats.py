@@ -17,7 +17,7 @@ Required columns (exact logical fields; matching is case-insensitive):
 - Game Type [ex: "League", "Playoff"], text
 - Planned Ends [ex: 8, 10], integer
 - Ends Played [ex: 8, 10], integer
-- End 1, End 2, ... End 9 (any subset present is OK) [ex: "+2H", "-1N", "B"], text
+- End 1, End 2, ... End N (any number of ends; any subset present is OK) [ex: "+2H", "-1N", "B"], text
 
 Per-end cell encoding (flexible):
 - "+2H" → scored 2 with hammer
@@ -34,6 +34,8 @@ Outputs:
 
 Usage examples:
   python curling_stats.py curling_statistics\data\curling_data.csv "Monsters"
+  python curling_stats.py "archive/season=*/*.parquet" "Monsters" --season 2024-2025
+  python curling_stats.py serve curling_statistics\data\curling_data.csv --port 8765
   python curling_stats.py curling_statistics\data\curling_data.csv "Monsters" --season 2025 --out-json curling_statistics\data\stats.json --out-games curling_statistics\data\per_game.csv
 
 """
@@ -45,14 +47,38 @@ Usage examples:
 # Standard Python Base Packages
 from __future__ import annotations
 import argparse
+import csv
+import glob
+import hashlib
+import importlib
 import json
+import math
 import os
+import pickle
 import re
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
-
-# Third-Party Packages to be Installed via pip
-import pandas as pd
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields, replace
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import unquote
+
+class _LazyModule:
+    # Stands in for a module until one of its attributes is read, then imports it and
+    # replaces itself in this module's globals (single-team CSV queries never need them)
+    def __init__(self, name: str, alias: str):
+        self._name, self._alias = name, alias
+
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self._name)
+        globals()[self._alias] = module
+        return getattr(module, attr)
+
+# Third-Party Packages to be Installed via pip (imported on first use, see _LazyModule)
+np = _LazyModule("numpy", "np")
+pd = _LazyModule("pandas", "pd")
+
+# Project modules
+from curling_metrics import NO_METRICS, RunMetrics, add_metrics_arguments, metrics_from_args
 
 ##############################
 # Constants for fixed schema #
@@ -62,23 +88,50 @@ SCHEMA_COLS = [
     "Season", "Date", "Team Name", "Opponent", "Location", "Outcome", "Sheet",
     "Stone Color", "Game Type", "Planned Ends", "Ends Played",
 ]
-END_COLUMNS = [f"End {i}" for i in range(1, 10)]  # End 1..End 9
+END_COLUMN_RE = re.compile(r"^end\s*(\d+)$", re.IGNORECASE)  # "End 1", "end 10", "END12", ...
 
 # Regex for parsing end tokens (avoid backslash sequences in this file)
 NORMALIZE_KEEP = re.compile(r"[^0-9+HNBN-]", re.IGNORECASE)  # keep digits, +, H/N/B, -
 
+# Tri-state hammer codes used by the columnar end parser
+HAMMER_UNKNOWN = -1
+HAMMER_NO = 0
+HAMMER_YES = 1
+
 
 #############################################################
 # Parsing helpers for Input File Interpretation/Integration #
 #############################################################
 
-@dataclass #Shortcut for creating classes for data storage in statistics
-
 class EndResult:
-    points_for: int = 0
-    points_against: int = 0
-    had_hammer: Optional[bool] = None  # True (H), False (N), None unknown
-    is_blank: bool = False
+    # Thin single-end view; bulk data lives in EndMatrix, so keep instances slot-only
+    __slots__ = ("points_for", "points_against", "had_hammer", "is_blank")
+
+    def __init__(
+        self,
+        points_for: int = 0,
+        points_against: int = 0,
+        had_hammer: Optional[bool] = None,  # True (H), False (N), None unknown
+        is_blank: bool = False,
+    ):
+        self.points_for = points_for
+        self.points_against = points_against
+        self.had_hammer = had_hammer
+        self.is_blank = is_blank
+
+    def _astuple(self) -> Tuple[int, int, Optional[bool], bool]:
+        return (self.points_for, self.points_against, self.had_hammer, self.is_blank)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, EndResult):
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    def __repr__(self) -> str:
+        return (
+            f"EndResult(points_for={self.points_for!r}, points_against={self.points_against!r}, "
+            f"had_hammer={self.had_hammer!r}, is_blank={self.is_blank!r})"
+        )
 
     @property
     def steal_for(self) -> Optional[bool]:
@@ -122,12 +175,30 @@ class EndResult:
             return None
         return (not self.had_hammer) and (self.points_against <= 1)
 
+def _is_missing(raw: object) -> bool:
+    # pd.isna for one cell, without touching pandas for plain strings and numbers
+    if raw is None:
+        return True
+    if isinstance(raw, (str, int)):
+        return False
+    if isinstance(raw, float):
+        return math.isnan(raw)
+    return bool(pd.isna(raw))
+
+# Integral numbers written as floats ("2.0", "-3.00H"); the fraction is dropped before stripping
+INTEGRAL_FLOAT_RE = re.compile(r"^([+-]?[0-9]+)[.]0*(?=\s*[HN]?$)", re.IGNORECASE)
+
 def _clean_end_token(raw: object) -> str:
-    if raw is None or (isinstance(raw, float) and pd.isna(raw)):
+    if _is_missing(raw):
         return ""
+    if isinstance(raw, float) and raw.is_integer():
+        # Numeric end columns with gaps load as floats; 2.0 is the token "2", not "20"
+        raw = int(raw)
     s = str(raw).strip()
     if not s:
         return ""
+    # The same cell as text ("2.0" in a mixed column or the stdlib CSV path) scores the same
+    s = INTEGRAL_FLOAT_RE.sub(r"\1", s)
     if s.lower() in {"b", "blank", "blank end"}:
         return "B"
     s2 = re.sub(NORMALIZE_KEEP, "", s)
@@ -139,7 +210,7 @@ def _clean_end_token(raw: object) -> str:
     return s2.upper()
 
 def parse_end_value(raw: object) -> Optional[EndResult]:
-    if pd.isna(raw):
+    if _is_missing(raw):
         return None
     token = _clean_end_token(raw)
     if token == "":
@@ -171,6 +242,281 @@ def parse_end_value(raw: object) -> Optional[EndResult]:
     else:
         return EndResult(points_for=0, points_against=abs(val), had_hammer=hh, is_blank=False)
 
+# Which route parse_end_value takes for a raw cell, for malformed-data metrics
+END_TOKEN_PATHS = ("clean", "normalized", "salvaged", "fallback", "unparsed")
+
+def end_token_path(raw: object) -> Optional[str]:
+    """
+    None for an empty cell, else one of END_TOKEN_PATHS:
+    - clean: already canonical ("+2H", "-1N", "B")
+    - normalized: canonical once stray characters are stripped ("+2 H", "2h*")
+    - salvaged: stripping left nothing and digits/flags were pulled from the raw text
+    - fallback: the strict pattern failed and the first number was taken ("2-1H")
+    - unparsed: filled in but not parseable
+    """
+    token = _clean_end_token(raw)
+    if token == "":
+        return "unparsed" if not _is_missing(raw) and str(raw).strip() else None
+    if parse_end_value(raw) is None:
+        return "unparsed"
+    if token not in {"B", "BH", "BN"} and not re.match(r"^([+-]?)([0-9]+)([HN])?$", token):
+        return "fallback"
+    s = str(raw).strip()
+    if s.lower() in {"b", "blank", "blank end"} or s.upper() == token:
+        return "clean"
+    return "salvaged" if not re.sub(NORMALIZE_KEEP, "", s) else "normalized"
+
+def _end_result_codes(raw: object) -> Tuple[int, int, int, bool, bool]:
+    # (points_for, points_against, hammer code, is_blank, played) for one raw cell
+    res = parse_end_value(raw)
+    if res is None:
+        return 0, 0, HAMMER_UNKNOWN, False, False
+    if res.had_hammer is None:
+        hammer = HAMMER_UNKNOWN
+    else:
+        hammer = HAMMER_YES if res.had_hammer else HAMMER_NO
+    return res.points_for, res.points_against, hammer, res.is_blank, True
+
+def _small_int(a: np.ndarray) -> np.ndarray:
+    # int8 covers any real curling score; widen only for malformed cells like "120"
+    for dt in (np.int8, np.int16, np.int32):
+        if a.size == 0 or (a.min() >= np.iinfo(dt).min and a.max() <= np.iinfo(dt).max):
+            return a.astype(dt)
+    return a
+
+def parse_end_columns(
+    df: pd.DataFrame,
+    end_cols: List[str],
+    token_paths: Optional[Dict[str, int]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Parse all End N columns of `df` at once into (rows x ends) arrays.
+
+    Every distinct cell value is run through parse_end_value exactly once and the
+    results are broadcast back through a NumPy lookup table, so the regex work scales
+    with the number of distinct tokens rather than the number of cells.
+
+    Returned keys:
+    - points_for / points_against: int8 (wider only if a malformed cell overflows int8)
+    - hammer: int8 tri-state (HAMMER_YES, HAMMER_NO, HAMMER_UNKNOWN)
+    - blank: bool
+    - played: bool, False where parse_end_value would return None
+
+    When `token_paths` is given, the number of non-empty cells per end_token_path
+    route is added to it (distinct tokens are classified once, weighted by count).
+    """
+    shape = (len(df), len(end_cols))
+    points_for = np.zeros(shape, dtype=np.int64)
+    points_against = np.zeros(shape, dtype=np.int64)
+    hammer = np.full(shape, HAMMER_UNKNOWN, dtype=np.int8)
+    blank = np.zeros(shape, dtype=bool)
+    played = np.zeros(shape, dtype=bool)
+
+    # Keyed on (type, value) so that e.g. 2 and 2.0 (which stringify differently) stay apart
+    memo: Dict[Tuple[type, object], Tuple[int, int, int, bool, bool]] = {}
+    path_memo: Dict[Tuple[type, object], Optional[str]] = {}
+
+    for j, c in enumerate(end_cols):
+        values = df[c]
+        if values.dtype == object:
+            # Mixed cells like 2 and 2.0 hash equal but stringify differently ("2" vs "2.0");
+            # _clean_end_token reads both texts as the token "2"
+            values = values.where(values.isna(), values.astype(str))
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        # One extra trailing slot holds the "missing" entry, which code -1 indexes directly
+        table = []
+        for u in uniques:
+            key = (type(u), u)
+            if key not in memo:
+                memo[key] = _end_result_codes(u)
+            table.append(memo[key])
+        table.append((0, 0, HAMMER_UNKNOWN, False, False))
+
+        if token_paths is not None:
+            cells = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            for u, n in zip(uniques, cells):
+                key = (type(u), u)
+                if key not in path_memo:
+                    path_memo[key] = end_token_path(u)
+                if path_memo[key] is not None:
+                    token_paths[path_memo[key]] = token_paths.get(path_memo[key], 0) + int(n)
+
+        pf_tab, pa_tab, hh_tab, blank_tab, played_tab = (np.array(t) for t in zip(*table))
+        points_for[:, j] = pf_tab[codes]
+        points_against[:, j] = pa_tab[codes]
+        hammer[:, j] = hh_tab[codes]
+        blank[:, j] = blank_tab[codes]
+        played[:, j] = played_tab[codes]
+
+    return {
+        "points_for": _small_int(points_for),
+        "points_against": _small_int(points_against),
+        "hammer": hammer,
+        "blank": blank,
+        "played": played,
+    }
+
+
+###########################################
+# Columnar End Storage (games x ends grid) #
+###########################################
+
+class EndMatrix:
+    """
+    Struct-of-arrays store for parsed ends: one row per game, one column per End N.
+
+    Each end costs a few bytes (int8 points for/against, int8 tri-state hammer code,
+    bool blank/played) instead of a Python object. The EndResult flags are exposed as
+    boolean masks of the same shape; like the EndResult properties they are False
+    wherever the hammer state is unknown or the end was not played.
+    """
+
+    __slots__ = ("points_for", "points_against", "hammer", "blank", "played")
+
+    def __init__(
+        self,
+        points_for: np.ndarray,
+        points_against: np.ndarray,
+        hammer: np.ndarray,
+        blank: np.ndarray,
+        played: np.ndarray,
+    ):
+        self.points_for = points_for
+        self.points_against = points_against
+        self.hammer = hammer
+        self.blank = blank
+        self.played = played
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        end_cols: List[str],
+        token_paths: Optional[Dict[str, int]] = None,
+    ) -> "EndMatrix":
+        return cls(**parse_end_columns(df, end_cols, token_paths))
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.points_for.shape
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self.__slots__)
+
+    def take(self, rows: np.ndarray) -> "EndMatrix":
+        # Subset of games (rows) as a new matrix
+        return EndMatrix(*(getattr(self, name)[rows] for name in self.__slots__))
+
+    def end(self, game: int, end: int) -> Optional[EndResult]:
+        # Single-end view matching parse_end_value's output for that cell
+        if not self.played[game, end]:
+            return None
+        code = int(self.hammer[game, end])
+        return EndResult(
+            points_for=int(self.points_for[game, end]),
+            points_against=int(self.points_against[game, end]),
+            had_hammer=None if code == HAMMER_UNKNOWN else code == HAMMER_YES,
+            is_blank=bool(self.blank[game, end]),
+        )
+
+    # Vectorized equivalents of the EndResult flags
+    @property
+    def has_hammer(self) -> np.ndarray:
+        return self.played & (self.hammer == HAMMER_YES)
+
+    @property
+    def no_hammer(self) -> np.ndarray:
+        return self.played & (self.hammer == HAMMER_NO)
+
+    @property
+    def steal_for(self) -> np.ndarray:
+        return self.no_hammer & (self.points_for > 0)
+
+    @property
+    def steal_against(self) -> np.ndarray:
+        return self.has_hammer & (self.points_against > 0)
+
+    @property
+    def hammer_two_plus(self) -> np.ndarray:
+        return self.has_hammer & (self.points_for >= 2)
+
+    @property
+    def hammer_scoring(self) -> np.ndarray:
+        return self.has_hammer & (self.points_for > 0)
+
+    @property
+    def hammer_blank(self) -> np.ndarray:
+        return self.has_hammer & self.blank
+
+    @property
+    def force_exactly_one(self) -> np.ndarray:
+        return self.no_hammer & (self.points_against == 1) & (self.points_for == 0)
+
+    @property
+    def no_hammer_defense_leq_one(self) -> np.ndarray:
+        return self.no_hammer & (self.points_against <= 1)
+
+    def game_counters(self) -> Dict[str, np.ndarray]:
+        # Per-game mask sums keyed by the matching TeamAggregate field
+        return {
+            "points_for": self.points_for.sum(axis=1, dtype=np.int64),
+            "points_against": self.points_against.sum(axis=1, dtype=np.int64),
+            "hammer_ends": self.has_hammer.sum(axis=1),
+            "nonhammer_ends": self.no_hammer.sum(axis=1),
+            "hammer_scoring_ends": self.hammer_scoring.sum(axis=1),
+            "hammer_two_plus_ends": self.hammer_two_plus.sum(axis=1),
+            "hammer_blank_ends": self.hammer_blank.sum(axis=1),
+            "steals_for": self.steal_for.sum(axis=1),
+            "steals_against": self.steal_against.sum(axis=1),
+            "force_exactly_one_ends": self.force_exactly_one.sum(axis=1),
+            "no_hammer_defense_leq_one_ends": self.no_hammer_defense_leq_one.sum(axis=1),
+        }
+
+    # Hammer alternation: the team scored on gets hammer for the next end; a blank keeps it
+    def implied_hammer(self) -> np.ndarray:
+        # Hammer state each end should have given the end before it (unknown for end 1,
+        # after an unplayed end, or after a blank whose own hammer state is unknown)
+        implied = np.full(self.shape, HAMMER_UNKNOWN, dtype=np.int8)
+        pf, pa = self.points_for[:, :-1], self.points_against[:, :-1]
+        implied[:, 1:] = np.where(
+            ~self.played[:, :-1],
+            HAMMER_UNKNOWN,
+            np.where(pf > 0, HAMMER_NO, np.where(pa > 0, HAMMER_YES, self.hammer[:, :-1])),
+        )
+        return implied
+
+    def hammer_conflicts(self) -> np.ndarray:
+        # Played ends whose hammer state contradicts the previous end's result
+        # (on an infer_hammer() copy this also checks chains through inferred ends)
+        implied = self.implied_hammer()
+        return (
+            self.played
+            & (self.hammer != HAMMER_UNKNOWN)
+            & (implied != HAMMER_UNKNOWN)
+            & (self.hammer != implied)
+        )
+
+    def infer_hammer(self) -> "EndMatrix":
+        """
+        Copy with unknown hammer states on played ends filled from the alternation
+        rule, one vectorized step per end column across all games. A forward pass
+        carries each end's result into the next end; a backward pass gives a blank
+        end the hammer state of the end after it. Recorded states are never changed.
+        """
+        hammer = self.hammer.copy()
+        pf, pa, played = self.points_for, self.points_against, self.played
+        n_ends = self.shape[1]
+        for j in range(1, n_ends):
+            nxt = np.where(pf[:, j - 1] > 0, HAMMER_NO, np.where(pa[:, j - 1] > 0, HAMMER_YES, hammer[:, j - 1]))
+            fill = played[:, j] & played[:, j - 1] & (hammer[:, j] == HAMMER_UNKNOWN)
+            hammer[fill, j] = nxt[fill]
+        for j in range(n_ends - 2, -1, -1):
+            blank_end = played[:, j] & (pf[:, j] == 0) & (pa[:, j] == 0)
+            fill = blank_end & played[:, j + 1] & (hammer[:, j] == HAMMER_UNKNOWN)
+            hammer[fill, j] = hammer[fill, j + 1]
+        return EndMatrix(self.points_for, self.points_against, hammer, self.blank, self.played)
+
 
 ##############################################
 # Data Class for Team Aggregation Statistics #
@@ -208,6 +554,14 @@ class TeamAggregate:
     force_exactly_one_ends: int = 0
     no_hammer_defense_leq_one_ends: int = 0
 
+    def merge(self, other: "TeamAggregate") -> "TeamAggregate":
+        # Combine partial aggregates of the same team (e.g. from separate chunks or files)
+        merged = TeamAggregate(team=self.team, seasons=set(self.seasons) | set(other.seasons))
+        for f in fields(self):
+            if f.name not in ("team", "seasons"):
+                setattr(merged, f.name, getattr(self, f.name) + getattr(other, f.name))
+        return merged
+
     def finalize(self) -> Dict:
         pf, pa = self.points_for, self.points_against
         gd = pf - pa
@@ -255,137 +609,439 @@ class TeamAggregate:
 # Core computation #
 ####################
 
-def compute_stats_for_team(
-    df: pd.DataFrame,
-    team: str,
-    season: Optional[str] = None,
-) -> Tuple[Dict, pd.DataFrame]:
+# Per-game counters summed into the TeamAggregate field of the same name
+GAME_COUNTER_FIELDS = [
+    "points_for", "points_against", "hammer_ends", "nonhammer_ends",
+    "hammer_scoring_ends", "hammer_two_plus_ends", "hammer_blank_ends",
+    "steals_for", "steals_against", "force_exactly_one_ends",
+    "no_hammer_defense_leq_one_ends",
+]
+
+def end_column_number(name) -> Optional[int]:
+    # N for an "End N" column name (any case/spacing), else None
+    m = END_COLUMN_RE.match(str(name).strip())
+    return int(m.group(1)) if m else None
+
+def _end_columns(df: pd.DataFrame) -> List[object]:
+    # Real-case names of every End N column present in df, ordered by N
+    return _end_column_names(df.columns)
+
+def _end_column_names(columns) -> List[object]:
+    found: Dict[int, object] = {}
+    for c in columns:
+        n = end_column_number(c)
+        if n is not None and n > 0:
+            found.setdefault(n, c)
+    return [found[n] for n in sorted(found)]
+
+def _resolve_columns(df: pd.DataFrame) -> Tuple[Dict[str, object], List[object]]:
+    return _resolve_column_names(df.columns)
+
+def _resolve_column_names(columns) -> Tuple[Dict[str, object], List[object]]:
     # Normalize columns by case-insensitive lookup
-    lc = {str(c).strip().lower(): c for c in df.columns}
+    lc = {str(c).strip().lower(): c for c in columns}
 
     # Validate presence (we allow missing trailing End columns)
     missing = [c for c in SCHEMA_COLS if c.lower() not in lc]
     if missing:
         raise ValueError(f"Missing required columns: {missing}")
 
-    end_cols_present = [c for c in END_COLUMNS if c.lower() in lc]
-    # Map to real-case column names from df
-    season_col = lc["season"]
-    date_col = lc["date"]
-    team_col = lc["team name"]
-    opp_col = lc["opponent"]
-    location_col = lc["location"]
-    outcome_col = lc["outcome"]
-    sheet_col = lc["sheet"]
-    stone_col = lc["stone color"]
-    game_type_col = lc["game type"]
-    planned_col = lc["planned ends"]
-    played_col = lc["ends played"]
-    end_cols_real = [lc[c.lower()] for c in end_cols_present]
+    # Map logical schema names to real-case column names from df
+    cols = {c: lc[c.lower()] for c in SCHEMA_COLS}
+    return cols, _end_column_names(columns)
+
+def _end_matrix(
+    df: pd.DataFrame,
+    end_cols: List[object],
+    ends: Optional[EndMatrix],
+    rows: Optional[np.ndarray] = None,
+    metrics: Optional[RunMetrics] = None,
+) -> EndMatrix:
+    # Use pre-parsed ends (e.g. from load_table_cached) when given, else parse now
+    if ends is None:
+        frame = df if rows is None else df.iloc[rows]
+        matrix = _parse_ends(frame, end_cols, metrics)
+        _count_ends(metrics, matrix)
+        return matrix
+    if ends.shape != (len(df), len(end_cols)):
+        raise ValueError(
+            f"Parsed ends shape {ends.shape} does not match dataset ({len(df)} rows, {len(end_cols)} end columns)"
+        )
+    matrix = ends if rows is None else ends.take(rows)
+    _count_ends(metrics, matrix)
+    return matrix
+
+def _parse_ends(frame: pd.DataFrame, end_cols: List[object], metrics: Optional[RunMetrics] = None) -> EndMatrix:
+    # EndMatrix.from_frame, timed as the parse_ends stage with per-route token counts when metrics are on
+    if metrics is None:
+        return EndMatrix.from_frame(frame, end_cols)
+    token_paths: Dict[str, int] = {}
+    with metrics.stage("parse_ends"):
+        matrix = EndMatrix.from_frame(frame, end_cols, token_paths)
+    metrics.count(**{f"end_tokens_{p}": token_paths.get(p, 0) for p in END_TOKEN_PATHS})
+    return matrix
+
+def _count_ends(metrics: Optional[RunMetrics], matrix: EndMatrix):
+    # Game / end counts of the matrix a computation ran on
+    if metrics is None:
+        return
+    metrics.count(
+        games=matrix.shape[0],
+        end_columns=matrix.shape[1],
+        played_ends=int(matrix.played.sum()),
+        hammer_unknown_ends=int((matrix.played & (matrix.hammer == HAMMER_UNKNOWN)).sum()),
+    )
+
+def infer_hammer_ends(
+    df: pd.DataFrame,
+    ends: Optional[EndMatrix] = None,
+    metrics: Optional[RunMetrics] = None,
+) -> EndMatrix:
+    # Parsed ends for all of df (reusing `ends` when given) with unknown hammer states inferred
+    if ends is None:
+        ends = _parse_ends(df, _end_columns(df), metrics)
+    with (metrics or NO_METRICS).stage("infer_hammer"):
+        return ends.infer_hammer()
+
+def _normalized(series: pd.Series) -> pd.Series:
+    return series.astype(str).str.strip().str.lower()
+
+def _result_letters(counters: Dict[str, np.ndarray]) -> np.ndarray:
+    pf, pa = counters["points_for"], counters["points_against"]
+    return np.where(pf > pa, "W", np.where(pf < pa, "L", "T"))
+
+def _build_aggregate(
+    team: str,
+    seasons: set,
+    counters: Dict[str, np.ndarray],
+    letters: np.ndarray,
+) -> TeamAggregate:
+    agg = TeamAggregate(team=team, seasons=seasons)
+    agg.games_played = len(letters)
+    agg.wins = int((letters == "W").sum())
+    agg.losses = int((letters == "L").sum())
+    agg.ties = int((letters == "T").sum())
+    for field in GAME_COUNTER_FIELDS:
+        setattr(agg, field, int(counters[field].sum()))
+    return agg
+
+def _per_game_frame(
+    frame: pd.DataFrame,
+    cols: Dict[str, object],
+    counters: Dict[str, np.ndarray],
+    letters: np.ndarray,
+) -> pd.DataFrame:
+    def col(name):
+        return frame[cols[name]].reset_index(drop=True)
+
+    return pd.DataFrame({
+        "Season": col("Season"),
+        "Date": col("Date"),
+        "Team Name": col("Team Name"),
+        "Opponent": col("Opponent"),
+        "Location": col("Location"),
+        "Outcome (from dataset)": col("Outcome"),
+        "Computed Result": letters,
+        "Sheet": col("Sheet"),
+        "Stone Color": col("Stone Color"),
+        "Game Type": col("Game Type"),
+        "Planned Ends": col("Planned Ends"),
+        "Ends Played": col("Ends Played"),
+        "Points For": counters["points_for"],
+        "Points Against": counters["points_against"],
+        "Hammer Ends": counters["hammer_ends"],
+        "No-Hammer Ends": counters["nonhammer_ends"],
+        "Steals For": counters["steals_for"],
+        "Steals Against": counters["steals_against"],
+    })
+
+def compute_stats_for_team(
+    df: pd.DataFrame,
+    team: str,
+    season: Optional[str] = None,
+    ends: Optional[EndMatrix] = None,
+    metrics: Optional[RunMetrics] = None,
+) -> Tuple[Dict, pd.DataFrame]:
+    m = metrics or NO_METRICS
+    cols, end_cols_real = _resolve_columns(df)
 
     # Filter to the specified team and optional season
-    mask = df[team_col].astype(str).str.strip().str.lower() == team.strip().lower()
-    if season is not None:
-        mask &= df[season_col].astype(str).str.strip().str.lower() == str(season).strip().lower()
-    team_df = df.loc[mask].copy()
+    with m.stage("filter_team"):
+        mask = _normalized(df[cols["Team Name"]]) == team.strip().lower()
+        if season is not None:
+            mask &= _normalized(df[cols["Season"]]) == str(season).strip().lower()
+        team_df = df.loc[mask].copy()
+    m.count(rows=len(df), rows_selected=len(team_df), teams=1)
 
     if team_df.empty:
         msg = f"No rows found for team '{team}'" + (f" in season '{season}'" if season else "")
         raise ValueError(msg)
 
-    agg = TeamAggregate(team=team, seasons=set())
-    per_game_records: List[Dict] = []
-
-    for _, row in team_df.iterrows():
-        agg.seasons.add(str(row[season_col]))
-
-        game_points_for = 0
-        game_points_against = 0
-        hammer_ends = nonhammer_ends = 0
-        hammer_scoring_ends = hammer_two_plus_ends = hammer_blank_ends = 0
-        steals_for = steals_against = 0
-        force_exactly_one_ends = no_hammer_defense_leq_one_ends = 0
-
-        for c in end_cols_real:
-            res = parse_end_value(row[c])
-            if res is None:
-                continue
+    # Parse every end cell for the team in one columnar pass
+    rows = np.flatnonzero(mask.to_numpy())
+    matrix = _end_matrix(df, end_cols_real, ends, rows, metrics)
+    with m.stage("aggregate"):
+        counters = matrix.game_counters()
+        letters = _result_letters(counters)
+        seasons = {str(v) for v in team_df[cols["Season"]].tolist()}
+        agg = _build_aggregate(team, seasons, counters, letters)
+        stats = agg.finalize()
+    with m.stage("per_game"):
+        per_game = _per_game_frame(team_df, cols, counters, letters)
+    return stats, per_game
+
+def _key_groups(team_values: pd.Series) -> Dict[str, np.ndarray]:
+    # Positions of the rows for each normalized team key, each in file order
+    codes, keys = pd.factorize(_normalized(team_values), use_na_sentinel=True)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(keys) + 1))
+    return {k: order[bounds[i]:bounds[i + 1]] for i, k in enumerate(keys)}
+
+def _team_groups(
+    df: pd.DataFrame,
+    cols: Dict[str, object],
+    season: Optional[str] = None,
+) -> Tuple[Optional[np.ndarray], Dict[str, np.ndarray]]:
+    # (season row positions or None for all rows, {team: positions within those rows})
+    team_col = cols["Team Name"]
+    teams = sorted(df[team_col].dropna().astype(str).unique())
 
-            game_points_for += res.points_for
-            game_points_against += res.points_against
-
-            if res.had_hammer is True:
-                hammer_ends += 1
-                if res.hammer_scoring:
-                    hammer_scoring_ends += 1
-                if res.hammer_two_plus:
-                    hammer_two_plus_ends += 1
-                if res.hammer_blank:
-                    hammer_blank_ends += 1
-                if res.steal_against:
-                    steals_against += 1
-            elif res.had_hammer is False:
-                nonhammer_ends += 1
-                if res.steal_for:
-                    steals_for += 1
-                if res.force_exactly_one:
-                    force_exactly_one_ends += 1
-                if res.no_hammer_defense_leq_one:
-                    no_hammer_defense_leq_one_ends += 1
-
-        # Update aggregates
-        agg.games_played += 1
-        agg.points_for += game_points_for
-        agg.points_against += game_points_against
-        agg.hammer_ends += hammer_ends
-        agg.nonhammer_ends += nonhammer_ends
-        agg.hammer_scoring_ends += hammer_scoring_ends
-        agg.hammer_two_plus_ends += hammer_two_plus_ends
-        agg.hammer_blank_ends += hammer_blank_ends
-        agg.steals_for += steals_for
-        agg.steals_against += steals_against
-        agg.force_exactly_one_ends += force_exactly_one_ends
-        agg.no_hammer_defense_leq_one_ends += no_hammer_defense_leq_one_ends
-
-        g = TeamGameStats(points_for=game_points_for, points_against=game_points_against)
-        res_letter = g.result()
-        if res_letter == "W":
-            agg.wins += 1
-        elif res_letter == "L":
-            agg.losses += 1
+    frame, rows = df, None
+    if season is not None:
+        season_mask = _normalized(df[cols["Season"]]) == str(season).strip().lower()
+        frame, rows = df.loc[season_mask], np.flatnonzero(season_mask.to_numpy())
+
+    # Group rows on the normalized team key once, then hand each raw name its key's rows
+    by_key = _key_groups(frame[team_col])
+    groups: Dict[str, np.ndarray] = {}
+    for team in teams:
+        key_rows = by_key.get(team.strip().lower())
+        if key_rows is not None:
+            groups[team] = key_rows
+    return rows, groups
+
+def team_row_positions(df: pd.DataFrame, season: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """
+    Row positions in `df` of each team's games, keyed by the distinct `Team Name`
+    values in sorted order and matched exactly as compute_stats_for_team does.
+    Teams with no rows after the season filter are left out.
+    """
+    cols, _ = _resolve_columns(df)
+    rows, groups = _team_groups(df, cols, season)
+    if rows is None:
+        return groups
+    return {team: rows[g] for team, g in groups.items()}
+
+def compute_stats_all_teams(
+    df: pd.DataFrame,
+    season: Optional[str] = None,
+    ends: Optional[EndMatrix] = None,
+    metrics: Optional[RunMetrics] = None,
+) -> Tuple[Dict[str, Dict], pd.DataFrame]:
+    """
+    Compute stats for every team in `df` with a single parse and grouping pass.
+
+    Returns ({team: TeamAggregate.finalize() dict}, combined per-game frame). Teams are
+    the distinct `Team Name` values in sorted order, matched case-insensitively exactly
+    as compute_stats_for_team does; teams with no rows after the season filter are
+    left out. The combined frame carries a leading `__Team__` column and is the
+    per-team frames concatenated in team order.
+
+    `ends` may carry the already-parsed EndMatrix for all of `df` (see load_table_cached).
+    `metrics` (a RunMetrics) receives stage timings and row / team / end counts.
+    """
+    m = metrics or NO_METRICS
+    cols, end_cols_real = _resolve_columns(df)
+    with m.stage("group_teams"):
+        rows, groups = _team_groups(df, cols, season)
+        frame = df if rows is None else df.iloc[rows]
+    m.count(rows=len(df), rows_selected=len(frame), teams=len(groups))
+
+    # One parse + counter pass over every game of every team
+    matrix = _end_matrix(df, end_cols_real, ends, rows, metrics)
+    with m.stage("per_game"):
+        counters = matrix.game_counters()
+        letters = _result_letters(counters)
+        per_game_all = _per_game_frame(frame, cols, counters, letters)
+        season_values = frame[cols["Season"]].tolist()
+
+    results: Dict[str, Dict] = {}
+    team_frames: List[pd.DataFrame] = []
+    with m.stage("team_split"):
+        for team, team_rows in groups.items():
+            seasons = {str(season_values[i]) for i in team_rows}
+            team_counters = {f: v[team_rows] for f, v in counters.items()}
+            agg = _build_aggregate(team, seasons, team_counters, letters[team_rows])
+            results[team] = agg.finalize()
+
+            team_frame = per_game_all.iloc[team_rows].reset_index(drop=True)
+            team_frames.append(team_frame.assign(**{"__Team__": team}))
+
+        if team_frames:
+            combined = pd.concat(team_frames, ignore_index=True)
         else:
-            agg.ties += 1
-
-        per_game_records.append({
-            "Season": row[season_col],
-            "Date": row[date_col],
-            "Team Name": row[team_col],
-            "Opponent": row[opp_col],
-            "Location": row[location_col],
-            "Outcome (from dataset)": row[outcome_col],
-            "Computed Result": res_letter,
-            "Sheet": row[sheet_col],
-            "Stone Color": row[stone_col],
-            "Game Type": row[game_type_col],
-            "Planned Ends": row[planned_col],
-            "Ends Played": row[played_col],
-            "Points For": game_points_for,
-            "Points Against": game_points_against,
-            "Hammer Ends": hammer_ends,
-            "No-Hammer Ends": nonhammer_ends,
-            "Steals For": steals_for,
-            "Steals Against": steals_against,
-        })
-
-    per_game_df = pd.DataFrame(per_game_records)
-    return agg.finalize(), per_game_df
+            combined = per_game_all.iloc[:0].assign(**{"__Team__": pd.Series(dtype=object)})
+        combined = combined[["__Team__"] + [c for c in combined.columns if c != "__Team__"]]
+    return results, combined
+
+
+class TeamStatsAccumulator:
+    """
+    Streaming counterpart of compute_stats_all_teams.
+
+    Feed chunks of the dataset (same columns each time) to update(); per-team
+    TeamAggregate partials are merged as they arrive, so memory stays bounded by
+    the number of teams rather than the number of games. results() returns the same
+    {team: finalize() dict} mapping compute_stats_all_teams would for the whole file.
+    """
+
+    def __init__(self, season: Optional[str] = None):
+        self.season = season
+        self._aggs: Dict[str, TeamAggregate] = {}       # keyed by normalized team name
+        self._names: Dict[str, set] = {}                # raw names seen for each key
+
+    def update(
+        self,
+        chunk: pd.DataFrame,
+        ends: Optional[EndMatrix] = None,
+        metrics: Optional[RunMetrics] = None,
+    ) -> pd.DataFrame:
+        """
+        Fold one chunk into the running aggregates and return its per-game rows
+        (file order, leading `__Team__` column) so callers can write them out.
+        """
+        m = metrics or NO_METRICS
+        cols, end_cols_real = _resolve_columns(chunk)
+        team_col = cols["Team Name"]
+
+        for name in chunk[team_col].dropna().astype(str).unique():
+            self._names.setdefault(name.strip().lower(), set()).add(name)
+
+        frame, rows = chunk, None
+        if self.season is not None:
+            season_mask = _normalized(chunk[cols["Season"]]) == str(self.season).strip().lower()
+            frame, rows = chunk.loc[season_mask], np.flatnonzero(season_mask.to_numpy())
+
+        m.count(rows=len(chunk), rows_selected=len(frame))
+
+        counters = _end_matrix(chunk, end_cols_real, ends, rows, metrics).game_counters()
+        letters = _result_letters(counters)
+        season_values = frame[cols["Season"]].tolist()
+
+        with m.stage("aggregate"):
+            for key, key_rows in _key_groups(frame[team_col]).items():
+                seasons = {str(season_values[i]) for i in key_rows}
+                part = _build_aggregate(key, seasons, {f: v[key_rows] for f, v in counters.items()}, letters[key_rows])
+                self._aggs[key] = self._aggs[key].merge(part) if key in self._aggs else part
+
+        with m.stage("per_game"):
+            per_game = _per_game_frame(frame, cols, counters, letters)
+            per_game.insert(0, "__Team__", frame[team_col].astype(str).to_numpy())
+        return per_game
+
+    def results(self) -> Dict[str, Dict]:
+        out: Dict[str, Dict] = {}
+        for key, names in self._names.items():
+            if key not in self._aggs:
+                continue
+            for name in names:
+                out[name] = replace(self._aggs[key], team=name).finalize()
+        return dict(sorted(out.items()))
 
 
 ###########################################
 # Definitions for Loading and Saving Data #
 ###########################################
 
-def load_table(path: str) -> pd.DataFrame:
+# File types picked up when the input is a directory or glob of partition files
+TABLE_EXTENSIONS = {".csv", ".tsv", ".xlsx", ".xls", ".parquet"}
+
+# Hive-style partition keys (`season=2024-2025/`) and the schema column each one fills
+PARTITION_KEYS = {"season": "Season", "team": "Team Name", "team name": "Team Name", "team_name": "Team Name"}
+
+def is_multi_file(path: str) -> bool:
+    return os.path.isdir(path) or any(ch in path for ch in "*?[")
+
+def partition_values(file_path: str) -> Dict[str, str]:
+    # Schema column -> value for every `key=value` directory in the file's path
+    # (values are URL-decoded, as pyarrow writes them: team=Friday%20Monsters)
+    values = {}
+    for part in os.path.normpath(os.path.dirname(file_path)).split(os.sep):
+        key, sep, value = part.partition("=")
+        if sep and key.strip().lower() in PARTITION_KEYS:
+            values[PARTITION_KEYS[key.strip().lower()]] = unquote(value)
+    return values
+
+def dataset_files(path: str, season: Optional[str] = None, team: Optional[str] = None) -> List[str]:
+    """
+    Files making up the dataset at `path` (a file, a directory searched recursively,
+    or a glob), sorted. Files whose `season=`/`team=` partition directories do not
+    match the requested season/team are pruned here, before anything is opened.
+    """
+    if os.path.isdir(path):
+        files = [
+            os.path.join(root, name)
+            for root, _, names in os.walk(path)
+            for name in names
+            if os.path.splitext(name)[1].lower() in TABLE_EXTENSIONS
+        ]
+    elif is_multi_file(path):
+        files = [f for f in glob.glob(path, recursive=True) if os.path.isfile(f)]
+    else:
+        return [path]
+
+    def matches(f: str) -> bool:
+        parts = partition_values(f)
+        for col, want in (("Season", season), ("Team Name", team)):
+            if want is not None and col in parts and parts[col].strip().lower() != str(want).strip().lower():
+                return False
+        return True
+
+    return [f for f in sorted(files) if matches(f)]
+
+def _canonical_columns(df: pd.DataFrame) -> pd.DataFrame:
+    # Rename schema/end columns to their canonical spelling so partition files line up
+    canonical = {c.lower(): c for c in SCHEMA_COLS}
+
+    def rename(c):
+        n = end_column_number(c)
+        return f"End {n}" if n is not None else canonical.get(str(c).strip().lower(), c)
+
+    return df.rename(columns=rename)
+
+def _with_partitions(df: pd.DataFrame, file_path: str) -> pd.DataFrame:
+    # Fill schema columns that only live in the directory layout (e.g. season=2024-2025/)
+    df = _canonical_columns(df)
+    for col, value in partition_values(file_path).items():
+        if col not in df.columns:
+            df[col] = value
+    return df
+
+def load_table(
+    path: str,
+    season: Optional[str] = None,
+    team: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Load a single table, or a partitioned dataset when `path` is a directory or glob.
+
+    For partitioned input, files outside the requested `season`/`team` partitions are
+    skipped unopened, the rest are read in parallel threads, schema columns are matched
+    case-insensitively and partition values fill columns missing from the files.
+    `season`/`team` only prune files; row filtering still happens in the compute step.
+    """
+    if not is_multi_file(path):
+        return _read_file(path)
+
+    files = dataset_files(path, season=season, team=team)
+    if not files:
+        raise ValueError(f"No input files found for '{path}'")
+    with ThreadPoolExecutor(max_workers=max_workers or min(32, len(files))) as pool:
+        frames = list(pool.map(lambda f: _with_partitions(_read_file(f), f), files))
+    return pd.concat(frames, ignore_index=True, sort=False)
+
+def _read_file(path: str) -> pd.DataFrame:
     ext = os.path.splitext(path)[1].lower()
     if ext in {".csv", ".tsv"}:
         return pd.read_csv(path)
@@ -396,6 +1052,89 @@ def load_table(path: str) -> pd.DataFrame:
     # default to csv
     return pd.read_csv(path)
 
+def iter_table_chunks(
+    path: str,
+    chunksize: int,
+    season: Optional[str] = None,
+    team: Optional[str] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield the table at `path` in pieces of about `chunksize` rows: CSV via the
+    chunked reader, Parquet batch by batch. Excel cannot be streamed, so it is
+    read once and sliced. Directories/globs are streamed file by file after the
+    same partition pruning as load_table.
+    """
+    files = [path] if not is_multi_file(path) else dataset_files(path, season=season, team=team)
+    # One cheap pass over just the end-count columns so every chunk types them as a full load would
+    kinds = _csv_count_kinds([f for f in files if _is_csv(f)], chunksize)
+    if not is_multi_file(path):
+        yield from _iter_file_chunks(path, chunksize, kinds)
+        return
+    for f in files:
+        for chunk in _iter_file_chunks(f, chunksize, kinds):
+            yield _with_partitions(chunk, f)
+
+def _is_csv(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() not in {".parquet", ".xlsx", ".xls"}
+
+# End-count columns whose pandas type (and so their CSV text, "8" vs "8.0") depends on the whole column
+COUNT_COLUMNS = ("planned ends", "ends played")
+COUNT_KINDS = ("int", "float", "text")
+
+def _csv_count_kinds(paths: List[str], chunksize: int) -> Dict[str, str]:
+    """
+    How pd.read_csv would type each end-count column over all of `paths`: "int"
+    (every value an integer literal), "float" (any blank or decimal) or "text" (any
+    non-numeric value). Read in chunks of just those columns.
+    """
+    kinds: Dict[str, str] = {}
+    for path in paths:
+        header = pd.read_csv(path, nrows=0)
+        lc = {str(c).strip().lower(): c for c in header.columns}
+        wanted = {lc[c]: c for c in COUNT_COLUMNS if c in lc}
+        if not wanted:
+            continue
+        with pd.read_csv(path, usecols=list(wanted), dtype=str, chunksize=chunksize) as reader:
+            for chunk in reader:
+                for col, name in wanted.items():
+                    values = chunk[col]
+                    text = values.dropna().str.strip()
+                    if pd.to_numeric(text, errors="coerce").isna().any():
+                        kind = "text"
+                    elif values.isna().any() or not text.str.fullmatch(r"[+-]?\d+").all():
+                        kind = "float"
+                    else:
+                        kind = "int"
+                    kinds[name] = max(kinds.get(name, "int"), kind, key=COUNT_KINDS.index)
+    return kinds
+
+def _iter_file_chunks(path: str, chunksize: int, count_kinds: Optional[Dict[str, str]] = None) -> Iterator[pd.DataFrame]:
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".parquet":
+        import pyarrow.parquet as pq  # pandas' own Parquet engine
+        pf = pq.ParquetFile(path)
+        for batch in pf.iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+        return
+    if ext in {".xlsx", ".xls"}:
+        df = pd.read_excel(path)
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start:start + chunksize]
+        return
+    # csv / tsv / default. Type inference runs per chunk, so pin the end and end-count
+    # columns to text: otherwise "7" vs "7.0" (or a bare "1" read as 1.0) varies by chunk.
+    header = pd.read_csv(path, nrows=0)
+    lc = {str(c).strip().lower(): c for c in header.columns}
+    pinned = _end_columns(header) + [lc[c] for c in COUNT_COLUMNS if c in lc]
+    # The end-count columns are then typed per count_kinds (see _csv_count_kinds) so chunks write them like a full load
+    convert = {lc[c]: (count_kinds or {}).get(c, "text") for c in COUNT_COLUMNS if c in lc}
+    with pd.read_csv(path, chunksize=chunksize, dtype={c: str for c in pinned}) as reader:
+        for chunk in reader:
+            for col, kind in convert.items():
+                if kind != "text":
+                    chunk[col] = pd.to_numeric(chunk[col]).astype("int64" if kind == "int" else "float64")
+            yield chunk
+
 def save_table(df: pd.DataFrame, path: Optional[str]):
     if not path:
         return
@@ -410,22 +1149,422 @@ def save_table(df: pd.DataFrame, path: Optional[str]):
         df.to_csv(path, index=False)
 
 
+#########################################################
+# Persistent Parsed-Dataset Cache (opt-in, next to input) #
+#########################################################
+
+# Bump when parsing semantics or the cache layout change so stale caches are rebuilt
+CACHE_VERSION = 3
+CACHE_DIRNAME = ".curling_cache"
+
+def _cache_paths(path: str) -> Dict[str, str]:
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIRNAME)
+    base = os.path.join(cache_dir, os.path.basename(path))
+    return {
+        "dir": cache_dir,
+        "meta": base + ".meta.json",
+        "parquet": base + ".table.parquet",
+        "pickle": base + ".table.pkl",
+        "ends": base + ".ends.npz",
+    }
+
+def _content_hash(path: str) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _fingerprint(path: str, content_hash: Optional[str] = None) -> Dict:
+    st = os.stat(path)
+    return {
+        "version": CACHE_VERSION,
+        "path": os.path.abspath(path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha": content_hash if content_hash is not None else _content_hash(path),
+    }
+
+def _write_json_atomic(obj: Dict, path: str):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f)
+    os.replace(tmp, path)
+
+def _read_cache(path: str, paths: Dict[str, str]) -> Optional[Tuple[pd.DataFrame, EndMatrix]]:
+    try:
+        with open(paths["meta"], "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    st = os.stat(path)
+    key = meta.get("key", {})
+    if key.get("version") != CACHE_VERSION or key.get("path") != os.path.abspath(path):
+        return None
+    if key.get("size") != st.st_size:
+        return None
+    # Same size: the content hash decides; a touched-but-identical file keeps its cache
+    sha = _content_hash(path)
+    if key.get("sha") != sha:
+        return None
+    if key.get("mtime_ns") != st.st_mtime_ns:
+        meta["key"] = _fingerprint(path, sha)
+        _write_json_atomic(meta, paths["meta"])
+
+    try:
+        if meta["table_format"] == "parquet":
+            df = pd.read_parquet(paths["parquet"])
+        else:
+            df = pd.read_pickle(paths["pickle"])
+        with np.load(paths["ends"]) as npz:
+            ends = EndMatrix(**{name: npz[name] for name in EndMatrix.__slots__})
+    except (OSError, ValueError, KeyError, pickle.UnpicklingError):
+        return None
+
+    if [str(c) for c in _end_columns(df)] != meta.get("end_columns") or ends.shape[0] != len(df):
+        return None
+    return df, ends
+
+def _write_cache(path: str, paths: Dict[str, str], df: pd.DataFrame, ends: EndMatrix, sha: str):
+    os.makedirs(paths["dir"], exist_ok=True)
+
+    # Parquet when pyarrow can represent every column, otherwise a pickle of the frame
+    try:
+        df.to_parquet(paths["parquet"] + ".tmp", index=False)
+        os.replace(paths["parquet"] + ".tmp", paths["parquet"])
+        table_format = "parquet"
+    except Exception:
+        df.to_pickle(paths["pickle"] + ".tmp")
+        os.replace(paths["pickle"] + ".tmp", paths["pickle"])
+        table_format = "pickle"
+
+    with open(paths["ends"] + ".tmp", "wb") as f:
+        np.savez(f, **{name: getattr(ends, name) for name in EndMatrix.__slots__})
+    os.replace(paths["ends"] + ".tmp", paths["ends"])
+
+    # Meta goes last so a half-written cache is never considered valid
+    _write_json_atomic({
+        "key": _fingerprint(path, sha),
+        "table_format": table_format,
+        "end_columns": [str(c) for c in _end_columns(df)],
+    }, paths["meta"])
+
+def load_table_cached(path: str, rebuild: bool = False) -> Tuple[pd.DataFrame, EndMatrix]:
+    """
+    Load `path` together with its parsed EndMatrix, reusing an on-disk cache.
+
+    The cache lives in a `.curling_cache/` folder next to the input and is keyed by
+    absolute path, size, mtime and a BLAKE2 content hash, so edits invalidate it
+    automatically. `rebuild=True` ignores any existing cache and rewrites it.
+    """
+    if is_multi_file(path):
+        raise ValueError("The parse cache applies to single input files, not directories or globs")
+    paths = _cache_paths(path)
+    if not rebuild:
+        cached = _read_cache(path, paths)
+        if cached is not None:
+            return cached
+
+    sha = _content_hash(path)
+    df = load_table(path)
+    ends = EndMatrix.from_frame(df, _end_columns(df))
+    try:
+        _write_cache(path, paths, df, ends, sha)
+    except OSError as e:
+        print(f"⚠️ Could not write parse cache for {path}: {e}")
+    return df, ends
+
+
+##########################################
+# Lightweight CSV Path (no pandas/NumPy) #
+##########################################
+
+# Single CSV inputs up to this size are read with the csv module by main(); importing
+# pandas costs more than scanning a file this small row by row
+CSV_FAST_PATH_MAX_BYTES = 8 * 1024 * 1024
+
+# Cells pandas.read_csv reads as NaN by default
+CSV_NA_VALUES = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+})
+CSV_INT_RE = re.compile(r"^[+-]?[0-9]+$")
+CSV_FLOAT_RE = re.compile(r"^[+-]?([0-9]+[.]?[0-9]*|[.][0-9]+)([eE][+-]?[0-9]+)?$")
+
+# EndResult flag counted into each TeamAggregate end counter
+END_FLAG_FIELDS = {
+    "hammer_scoring_ends": "hammer_scoring",
+    "hammer_two_plus_ends": "hammer_two_plus",
+    "hammer_blank_ends": "hammer_blank",
+    "steals_for": "steal_for",
+    "steals_against": "steal_against",
+    "force_exactly_one_ends": "force_exactly_one",
+    "no_hammer_defense_leq_one_ends": "no_hammer_defense_leq_one",
+}
+
+def use_csv_fast_path(path: str, out_games: Optional[str] = None) -> bool:
+    # A single small CSV whose outputs need no pandas writer
+    return (
+        not is_multi_file(path)
+        and os.path.splitext(path)[1].lower() == ".csv"
+        and os.path.isfile(path)
+        and os.path.getsize(path) <= CSV_FAST_PATH_MAX_BYTES
+        and (out_games is None or os.path.splitext(out_games)[1].lower() == ".csv")
+    )
+
+def _csv_value(raw: Optional[str]) -> Optional[str]:
+    # None where pandas would read NaN (including cells missing from short rows)
+    return None if raw is None or raw in CSV_NA_VALUES else raw
+
+# Schema columns copied from the input into the per-game rows
+CSV_PASSTHROUGH_COLUMNS = (
+    "Season", "Date", "Team Name", "Opponent", "Location", "Outcome",
+    "Sheet", "Stone Color", "Game Type", "Planned Ends", "Ends Played",
+)
+
+class _CsvColumnType:
+    # Tracks what dtype pandas would infer for one column, to reproduce its values and str(value)
+    def __init__(self):
+        self.ints, self.floats, self.missing = True, True, False
+
+    def add(self, value: Optional[str]):
+        if value is None:
+            self.missing = True
+            return
+        if not self.floats:
+            return  # already text; every int is also a float
+        v = value.strip()
+        self.ints = self.ints and bool(CSV_INT_RE.match(v))
+        self.floats = self.floats and bool(CSV_FLOAT_RE.match(v))
+
+    def text(self, value: Optional[str]) -> str:
+        if value is None:
+            return "nan"
+        if self.ints and not self.missing:
+            return str(int(value))
+        if self.floats:
+            return str(float(value))
+        return value
+
+    def value(self, value: Optional[str]) -> object:
+        # int, float (NaN when missing) or str (None when missing), as the loaded column holds it
+        if self.ints and not self.missing:
+            return int(value)
+        if self.floats:
+            return math.nan if value is None else float(value)
+        return value
+
+def compute_stats_for_team_csv(
+    path: str,
+    team: str,
+    season: Optional[str] = None,
+    metrics: Optional[RunMetrics] = None,
+) -> Tuple[Dict, List[Dict[str, object]]]:
+    """
+    compute_stats_for_team for a CSV file using only the standard library.
+
+    Rows are streamed with csv.DictReader and only the team's games are kept; each
+    end cell goes through parse_end_value (once per distinct token) and the counts
+    feed the same TeamAggregate, so the returned stats dict equals
+    compute_stats_for_team(load_table(path), team, season)[0]. Per-game rows are dicts
+    with the same columns as the pandas per-game frame; passed-through cells hold the
+    value pandas would load (int, float with NaN for gaps, or str with None for gaps).
+    """
+    m = metrics or NO_METRICS
+    key = team.strip().lower()
+    # One dtype tracker per passed-through column, fed every row as pandas infers from the whole file
+    types = {c: _CsvColumnType() for c in CSV_PASSTHROUGH_COLUMNS}
+    season_type = types["Season"]
+    n_rows = 0
+    team_rows: List[Dict[str, Optional[str]]] = []
+
+    with m.stage("load"):
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.DictReader(f)
+            cols, end_cols = _resolve_column_names(reader.fieldnames or [])
+            for row in reader:
+                n_rows += 1
+                for c, column_type in types.items():
+                    column_type.add(_csv_value(row.get(cols[c])))
+                name = _csv_value(row.get(cols["Team Name"]))
+                if name is not None and name.strip().lower() == key:
+                    team_rows.append(row)
+
+    # Season text depends on the whole column's dtype, so filter only once it is known;
+    # like the pandas mask, a missing season never matches
+    season_values = [_csv_value(row.get(cols["Season"])) for row in team_rows]
+    seasons_text = [season_type.text(v) for v in season_values]
+    if season is not None:
+        want = str(season).strip().lower()
+        keep = [i for i, s in enumerate(seasons_text) if season_values[i] is not None and s.strip().lower() == want]
+        team_rows, seasons_text = [team_rows[i] for i in keep], [seasons_text[i] for i in keep]
+    m.count(rows_loaded=n_rows, rows=n_rows, rows_selected=len(team_rows), teams=1, fast_path=True)
+
+    if not team_rows:
+        msg = f"No rows found for team '{team}'" + (f" in season '{season}'" if season else "")
+        raise ValueError(msg)
+
+    agg = TeamAggregate(team=team, seasons=set(seasons_text))
+    parsed: Dict[str, Tuple[Optional[EndResult], Optional[str]]] = {}
+    paths: Dict[str, int] = {}
+    played_ends = unknown_ends = 0
+    per_game: List[Dict[str, object]] = []
+
+    with m.stage("aggregate"):
+        for row in team_rows:
+            game = {f: 0 for f in GAME_COUNTER_FIELDS}
+            for c in end_cols:
+                raw = _csv_value(row.get(c))
+                if raw is None:
+                    continue
+                if raw not in parsed:
+                    parsed[raw] = (parse_end_value(raw), end_token_path(raw))
+                res, path_name = parsed[raw]
+                if path_name is not None:
+                    paths[path_name] = paths.get(path_name, 0) + 1
+                if res is None:
+                    continue
+                played_ends += 1
+                game["points_for"] += res.points_for
+                game["points_against"] += res.points_against
+                if res.had_hammer is None:
+                    unknown_ends += 1
+                    continue
+                game["hammer_ends" if res.had_hammer else "nonhammer_ends"] += 1
+                for field, flag in END_FLAG_FIELDS.items():
+                    game[field] += bool(getattr(res, flag))
+
+            letter = TeamGameStats(game["points_for"], game["points_against"]).result()
+            agg.games_played += 1
+            agg.wins += letter == "W"
+            agg.losses += letter == "L"
+            agg.ties += letter == "T"
+            for field in GAME_COUNTER_FIELDS:
+                setattr(agg, field, getattr(agg, field) + game[field])
+
+            def col(name):
+                return types[name].value(_csv_value(row.get(cols[name])))
+
+            per_game.append({
+                "Season": col("Season"),
+                "Date": col("Date"),
+                "Team Name": col("Team Name"),
+                "Opponent": col("Opponent"),
+                "Location": col("Location"),
+                "Outcome (from dataset)": col("Outcome"),
+                "Computed Result": letter,
+                "Sheet": col("Sheet"),
+                "Stone Color": col("Stone Color"),
+                "Game Type": col("Game Type"),
+                "Planned Ends": col("Planned Ends"),
+                "Ends Played": col("Ends Played"),
+                "Points For": game["points_for"],
+                "Points Against": game["points_against"],
+                "Hammer Ends": game["hammer_ends"],
+                "No-Hammer Ends": game["nonhammer_ends"],
+                "Steals For": game["steals_for"],
+                "Steals Against": game["steals_against"],
+            })
+        stats = agg.finalize()
+
+    m.count(
+        games=len(team_rows), end_columns=len(end_cols), played_ends=played_ends, hammer_unknown_ends=unknown_ends,
+        **{f"end_tokens_{p}": paths.get(p, 0) for p in END_TOKEN_PATHS},
+    )
+    return stats, per_game
+
+def _is_gap(value: object) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+def _write_rows_csv(rows: List[Dict[str, object]], path: str):
+    # Gaps are written as empty cells and floats in repr form, like DataFrame.to_csv
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else [], lineterminator=os.linesep)
+        writer.writeheader()
+        writer.writerows({k: "" if _is_gap(v) else v for k, v in r.items()} for r in rows)
+
+def _float_cells(values: List[float]) -> List[str]:
+    # Shared fixed-point precision (at most 6 places, trailing zeros trimmed together), as pandas prints floats
+    cells = [f"{v:.6f}" for v in values if not math.isnan(v)]
+    while cells and all(c.endswith("0") and not c.endswith(".0") for c in cells):
+        cells = [c[:-1] for c in cells]
+    it = iter(cells)
+    return ["NaN" if math.isnan(v) else next(it) for v in values]
+
+def _rows_text(rows: List[Dict[str, object]]) -> str:
+    # Right-aligned text table in the layout of DataFrame.to_string(index=False)
+    if not rows:
+        return ""
+    columns = list(rows[0])
+    columns_cells = []
+    numeric = []
+    for c in columns:
+        values = [r[c] for r in rows]
+        if all(isinstance(v, float) for v in values):
+            columns_cells.append(_float_cells(values))
+        else:
+            columns_cells.append(["NaN" if _is_gap(v) else str(v) for v in values])
+        # pandas keeps one extra column of padding (for a sign) in front of numeric columns
+        numeric.append(all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values))
+    widths = [max(len(c), *map(len, cells)) + pad for c, cells, pad in zip(columns, columns_cells, numeric)]
+    lines = [" ".join(c.rjust(w) for c, w in zip(columns, widths))]
+    lines += [" ".join(cells[i].rjust(w) for cells, w in zip(columns_cells, widths)) for i in range(len(rows))]
+    return "\n".join(lines)
+
+
 #################################################################
 # Definitions for Client Interactions for Calling Specific Data #
 #################################################################
 
-def main():
+def main(argv: Optional[List[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    # `serve` subcommand: long-running query server (see curling_server.py)
+    if argv and argv[0] == "serve":
+        from curling_server import main as serve_main
+        return serve_main(argv[1:])
+
     p = argparse.ArgumentParser(description="Compute curling stats for a team from a fixed-schema dataset.")
-    p.add_argument("input", help="Path to input table (CSV/XLSX/Parquet)")
+    p.add_argument("input", help="Path to input table (CSV/XLSX/Parquet), or a directory/glob of season-partitioned files")
     p.add_argument("team", help="Team name to analyze (exact match, case-insensitive)")
     p.add_argument("--season", default=None, help="Optional season filter (exact match)")
     p.add_argument("--out-json", default=None, help="Optional path to write aggregate stats JSON")
     p.add_argument("--out-games", default=None, help="Optional path to write per-game CSV/XLSX/Parquet")
-    
-    args = p.parse_args()
-
-    df = load_table(args.input)
-    aggregate, per_game = compute_stats_for_team(df, args.team, season=args.season)
+    p.add_argument("--cache", action=argparse.BooleanOptionalAction, default=False,
+                   help="Reuse a parsed copy of the input cached in .curling_cache/ next to it (default: off)")
+    p.add_argument("--rebuild-cache", action="store_true", help="Re-parse the input and overwrite its cache")
+    p.add_argument("--infer-hammer", action="store_true",
+                   help="Fill unknown hammer states from the neighbouring ends before computing")
+    p.add_argument("--fast-path", action=argparse.BooleanOptionalAction, default=True,
+                   help=f"Read single CSV inputs up to {CSV_FAST_PATH_MAX_BYTES // 2**20} MB without pandas (default: on)")
+    add_metrics_arguments(p, hot_stage="parse_ends")
+
+    args = p.parse_args(argv)
+    metrics = metrics_from_args(args, "curling_stats", argv=argv)
+    m = metrics or NO_METRICS
+
+    use_cache = args.cache or args.rebuild_cache
+    if use_cache and is_multi_file(args.input):
+        print("Parse cache is only used for single input files; reading partitions directly")
+        use_cache = False
+
+    fast = (args.fast_path and not use_cache and not args.infer_hammer
+            and use_csv_fast_path(args.input, args.out_games))
+    if fast:
+        if metrics is not None and metrics.cprofile_stage == "parse_ends":
+            # The stdlib path has no parse_ends stage: it parses each end token inside its aggregate loop
+            metrics.cprofile_stage = "aggregate"
+        aggregate, per_game = compute_stats_for_team_csv(args.input, args.team, season=args.season, metrics=metrics)
+    else:
+        with m.stage("load"):
+            if use_cache:
+                df, ends = load_table_cached(args.input, rebuild=args.rebuild_cache)
+            else:
+                df, ends = load_table(args.input, season=args.season, team=args.team), None
+        m.count(rows_loaded=len(df), parse_cache=use_cache)
+        if args.infer_hammer:
+            ends = infer_hammer_ends(df, ends, metrics)
+        aggregate, per_game = compute_stats_for_team(df, args.team, season=args.season, ends=ends, metrics=metrics)
 
     # Pretty print summary
     print("\n=== Team Summary ===")
@@ -437,13 +1576,23 @@ def main():
             json.dump(aggregate, f, indent=2, default=str)
 
     if args.out_games:
-        save_table(per_game, args.out_games)
+        with m.stage("write_outputs"):
+            if fast:
+                _write_rows_csv(per_game, args.out_games)
+            else:
+                save_table(per_game, args.out_games)
 
     print("\nPer-game breakdown (first 10 rows):")
-    try:
-        print(per_game.head(10).to_string(index=False))
-    except Exception:
-        print(per_game.head(10))
+    if fast:
+        print(_rows_text(per_game[:10]))
+    else:
+        try:
+            print(per_game.head(10).to_string(index=False))
+        except Exception:
+            print(per_game.head(10))
+
+    if metrics is not None:
+        metrics.finish(args.metrics_out, print_summary=args.profile)
 
 # Checking to see if script is being called/run directly or importated as a module
 if __name__ == "__main__":
@@ -0,0 +1,277 @@
+"""
+Synthetic Curling Dataset Generator
+===================================
+
+Writes realistic fixed-schema curling files (the same columns as curling_data.csv)
+at any size, for load testing and benchmarks (see curling_bench.py).
+
+Games are simulated end by end with the hammer alternation rule (the team scored
+on gets hammer, a blank keeps it) and a typical end-score distribution, so hammer,
+steal and force rates look like real data. Games stop at their planned ends (mix of
+`ends`) or earlier when the score gets out of reach. End cells are rendered with the
+same token variants the parser accepts ("+2H", "2H", "-1", "0H", "BH", "B",
+"blank", " +1h", ...). A configurable share of cells are malformed, and a few
+Outcome / Ends Played values are missing or wrong so the validators have something
+to find.
+
+Rows are generated and written in chunks (vectorized per chunk), so 10M-row CSV or
+Parquet files never need to be held in memory. Excel output is limited to Excel's
+1,048,575 data rows.
+
+Usage examples:
+  python curling_synth.py synthetic_100k.csv --rows 100000 --teams 200 --seasons 5
+  python curling_synth.py synthetic_10m.parquet --rows 10000000 --teams 5000 --seasons 10 --seed 7
+"""
+
+#########################################
+# Importing Base Packages for Scripting #
+#########################################
+
+# Standard Python Base Packages
+from __future__ import annotations
+import argparse
+import os
+from typing import List, Optional, Sequence
+
+# Third-Party Packages to be Installed via pip
+import numpy as np
+import pandas as pd
+
+# Project modules
+from curling_stats import SCHEMA_COLS
+
+###########################
+# Vocabulary / parameters #
+###########################
+
+# Net end score with hammer (points for - points against) and its probability;
+# without hammer the same table is used from the other team's side (negated)
+HAMMER_NET = np.array([-3, -2, -1, 0, 1, 2, 3, 4, 5])
+HAMMER_NET_P = np.array([0.01, 0.03, 0.12, 0.10, 0.35, 0.24, 0.10, 0.04, 0.01])
+
+MAX_NET = 8
+EXCEL_MAX_ROWS = 1_048_575
+
+TEAM_PREFIXES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Rocky Mtn", "Granite", "Pebble", "Sunday", "Twilight"]
+TEAM_NOUNS = ["Raccoons", "Monsters", "Hijinks", "Rookies", "Sobering", "Babes", "Chaos", "Dreams", "Lobstaaas", "Loons",
+              "Sweepers", "Rocks", "Hammers", "Buttons", "Guards"]
+OPPONENTS = ["Matthews", "Sleeper", "Wilson", "Feldman", "Neill", "Craftwerk", "Braustolz", "Watzdorfer", "Holzlandbrau",
+             "Rain", "Weds Night", "Uneo", "Strouse", "McLeod", "Kaatz", "Cousins", "Shroeder", "Workin", "McDonald",
+             "Stavely", "Finlon", "Scieffer", "Witschen", "Sandquist", "O'Connell", "White Heathers"]
+LOCATIONS = ["Denver Curling Club", "Granite Curling Club - MB", "St. Paul Curling Club", "Rock Creek Curling",
+             "Wausau Curling Club", "Coyotes CC", "Evergreen CC", "Lakeshore CC"]
+GAME_TYPES = ["Social Leauge", "Competitive League", "Bonspiel", "Playoff", "Friendly"]
+GAME_TYPE_P = [0.35, 0.25, 0.25, 0.1, 0.05]
+SHEETS = list("ABCDEF")
+STONES = ["Red", "Yellow"]
+MALFORMED_TOKENS = np.array(["?", "x", "--", "H", "n/a", "2-1", "++", "1HN"], dtype=object)
+
+# Token variants per cell: canonical "+2H", unsigned "2H", no hammer marker "+2", lowercase/padded " +2h"
+VARIANT_CANONICAL, VARIANT_UNSIGNED, VARIANT_UNMARKED, VARIANT_LOOSE = range(4)
+
+
+def _token_vocab() -> np.ndarray:
+    # [variant, net + MAX_NET, had_hammer] -> end token string
+    vocab = np.empty((4, 2 * MAX_NET + 1, 2), dtype=object)
+    for net in range(-MAX_NET, MAX_NET + 1):
+        for h, flag in ((0, "N"), (1, "H")):
+            i = net + MAX_NET
+            if net == 0:
+                vocab[VARIANT_CANONICAL, i, h] = f"0{flag}"
+                vocab[VARIANT_UNSIGNED, i, h] = f"B{flag}"
+                vocab[VARIANT_UNMARKED, i, h] = "B"
+                vocab[VARIANT_LOOSE, i, h] = "blank"
+            else:
+                vocab[VARIANT_CANONICAL, i, h] = f"{net:+d}{flag}"
+                vocab[VARIANT_UNSIGNED, i, h] = f"{net:d}{flag}"
+                vocab[VARIANT_UNMARKED, i, h] = f"{net:+d}"
+                vocab[VARIANT_LOOSE, i, h] = f" {net:+d}{flag.lower()} "
+    return vocab
+
+TOKENS = _token_vocab()
+
+def team_names(n_teams: int) -> np.ndarray:
+    base = len(TEAM_PREFIXES) * len(TEAM_NOUNS)
+    names = []
+    for i in range(n_teams):
+        name = f"{TEAM_PREFIXES[i % len(TEAM_PREFIXES)]}_{TEAM_NOUNS[(i // len(TEAM_PREFIXES)) % len(TEAM_NOUNS)]}"
+        names.append(name if i < base else f"{name}_{i // base + 1}")
+    return np.array(names, dtype=object)
+
+def season_dates(first_year: int, n_seasons: int):
+    # Season labels and, per season, every game date Sep 15 .. Apr 30 as M/D/YYYY text
+    labels, dates = [], []
+    for k in range(n_seasons):
+        y = first_year + k
+        labels.append(f"{y}-{y + 1}")
+        days = pd.date_range(f"{y}-09-15", f"{y + 1}-04-30", freq="D")
+        dates.append(np.array([f"{d.month}/{d.day}/{d.year}" for d in days], dtype=object))
+    return np.array(labels, dtype=object), dates
+
+
+#################
+# Chunk builder #
+#################
+
+def _simulate_ends(n: int, n_ends: int, rng: np.random.Generator):
+    # Net score (team's view) and team-has-hammer flag per game and end, hammer alternating
+    cdf = np.cumsum(HAMMER_NET_P)
+    cdf[-1] = 1.0
+    hammer = rng.random(n) < 0.5
+    net = np.empty((n, n_ends), dtype=np.int64)
+    had = np.empty((n, n_ends), dtype=bool)
+    for j in range(n_ends):
+        hammer_net = HAMMER_NET[np.searchsorted(cdf, rng.random(n), side="right").clip(0, len(HAMMER_NET) - 1)]
+        net[:, j] = np.where(hammer, hammer_net, -hammer_net)
+        had[:, j] = hammer
+        hammer = np.where(net[:, j] > 0, False, np.where(net[:, j] < 0, True, hammer))
+    return net, had
+
+def synthetic_frame(
+    n_rows: int,
+    rng: np.random.Generator,
+    n_teams: int = 50,
+    n_seasons: int = 3,
+    first_season: int = 2021,
+    ends: Sequence[int] = (8, 10),
+    unmarked: float = 0.05,
+    malformed: float = 0.001,
+    missing_outcome: float = 0.05,
+) -> pd.DataFrame:
+    """
+    One block of `n_rows` synthetic games. `ends` is the mix of planned game lengths;
+    `unmarked` is the share of end cells written without H/N, `malformed` the share
+    of cells replaced by junk, `missing_outcome` the share of empty Outcome cells
+    (plus a tenth as many wrong ones).
+    """
+    n_cols = max(ends)
+    teams = team_names(n_teams)
+    seasons, dates = season_dates(first_season, n_seasons)
+
+    season_idx = rng.integers(n_seasons, size=n_rows)
+    date_text = np.empty(n_rows, dtype=object)
+    for k in range(n_seasons):
+        m = season_idx == k
+        date_text[m] = dates[k][rng.integers(len(dates[k]), size=int(m.sum()))]
+
+    planned = np.asarray(ends)[rng.integers(len(ends), size=n_rows)]
+    net, had = _simulate_ends(n_rows, n_cols, rng)
+
+    # A game ends at its planned length, or after end 6+ once a side leads by 5 or more
+    lead = np.abs(np.cumsum(net, axis=1))
+    end_no = np.arange(1, n_cols + 1)
+    stop = (end_no >= planned[:, None]) | ((end_no >= 6) & (lead >= 5))
+    ends_played = np.argmax(stop, axis=1) + 1
+    played = end_no <= ends_played[:, None]
+
+    # Render tokens: mostly canonical, some unsigned / unmarked / loose, a few malformed
+    other = (1.0 - unmarked) * 0.08
+    variant = rng.choice(4, size=net.shape, p=[1.0 - unmarked - other, other * 0.6, unmarked, other * 0.4])
+    cells = TOKENS[variant, np.clip(net, -MAX_NET, MAX_NET) + MAX_NET, had.astype(np.int64)]
+    bad = rng.random(net.shape) < malformed
+    cells[bad] = MALFORMED_TOKENS[rng.integers(len(MALFORMED_TOKENS), size=int(bad.sum()))]
+    cells[~played] = None
+
+    total = np.where(played, net, 0).sum(axis=1)
+    outcome = np.where(total > 0, "Win", np.where(total < 0, "Loss", "Tie")).astype(object)
+    u = rng.random(n_rows)
+    outcome[u < missing_outcome] = None
+    wrong = (u >= missing_outcome) & (u < missing_outcome * 1.1)
+    outcome[wrong] = np.where(total[wrong] > 0, "Loss", "Win")
+
+    ends_played_col = ends_played.copy()
+    off = rng.random(n_rows) < missing_outcome * 0.1
+    ends_played_col[off] += 1
+
+    frame = pd.DataFrame({
+        "Season": seasons[season_idx],
+        "Date": date_text,
+        "Team Name": teams[rng.integers(n_teams, size=n_rows)],
+        "Opponent": np.array(OPPONENTS, dtype=object)[rng.integers(len(OPPONENTS), size=n_rows)],
+        "Location": np.array(LOCATIONS, dtype=object)[rng.integers(len(LOCATIONS), size=n_rows)],
+        "Outcome": outcome,
+        "Sheet": np.array(SHEETS, dtype=object)[rng.integers(len(SHEETS), size=n_rows)],
+        "Stone Color": np.array(STONES, dtype=object)[rng.integers(2, size=n_rows)],
+        "Game Type": np.array(GAME_TYPES, dtype=object)[rng.choice(len(GAME_TYPES), size=n_rows, p=GAME_TYPE_P)],
+        "Planned Ends": planned,
+        "Ends Played": ends_played_col,
+    })
+    for j in range(n_cols):
+        frame[f"End {j + 1}"] = cells[:, j]
+    return frame[SCHEMA_COLS + [f"End {j + 1}" for j in range(n_cols)]]
+
+
+##########
+# Writer #
+##########
+
+def write_synthetic(path: str, n_rows: int, seed: Optional[int] = None, chunk_rows: int = 250_000, **options) -> str:
+    """
+    Write `n_rows` synthetic games to `path` (.csv / .parquet / .xlsx by extension),
+    `chunk_rows` at a time. `options` are passed to synthetic_frame().
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in {".xlsx", ".xls"} and n_rows > EXCEL_MAX_ROWS:
+        raise ValueError(f"Excel files hold at most {EXCEL_MAX_ROWS} rows; use CSV or Parquet for {n_rows}")
+    if ext not in {".csv", ".parquet", ".xlsx", ".xls"}:
+        raise ValueError(f"Unsupported output format '{ext}' (use .csv, .parquet or .xlsx)")
+
+    rng = np.random.default_rng(seed)
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+
+    if ext in {".xlsx", ".xls"}:
+        synthetic_frame(n_rows, rng, **options).to_excel(path, index=False)
+        return path
+
+    writer = None
+    try:
+        for start in range(0, n_rows, chunk_rows):
+            chunk = synthetic_frame(min(chunk_rows, n_rows - start), rng, **options)
+            if ext == ".csv":
+                chunk.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+            else:
+                import pyarrow as pa  # pandas' own Parquet engine
+                import pyarrow.parquet as pq
+                if writer is None:
+                    # Fixed schema, so a column that happens to be all-empty in one chunk still lines up
+                    schema = pa.schema([
+                        (c, pa.int64() if c in ("Planned Ends", "Ends Played") else pa.string()) for c in chunk.columns
+                    ])
+                    writer = pq.ParquetWriter(path, schema)
+                writer.write_table(pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False))
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
+
+
+############################
+# Command line entry point #
+############################
+
+def main(argv: Optional[List[str]] = None):
+    p = argparse.ArgumentParser(description="Write a synthetic fixed-schema curling dataset.")
+    p.add_argument("out", help="Output path (.csv, .parquet or .xlsx)")
+    p.add_argument("--rows", type=int, default=10_000, help="Number of game rows (default: 10000)")
+    p.add_argument("--teams", type=int, default=50, help="Number of distinct teams (default: 50)")
+    p.add_argument("--seasons", type=int, default=3, help="Number of seasons (default: 3)")
+    p.add_argument("--first-season", type=int, default=2021, help="Start year of the first season (default: 2021)")
+    p.add_argument("--ends", type=int, nargs="+", default=[8, 10], help="Planned game lengths to mix (default: 8 10)")
+    p.add_argument("--unmarked", type=float, default=0.05, help="Share of end cells without an H/N marker (default: 0.05)")
+    p.add_argument("--malformed", type=float, default=0.001, help="Share of end cells replaced by junk (default: 0.001)")
+    p.add_argument("--missing-outcome", type=float, default=0.05, help="Share of empty Outcome cells (default: 0.05)")
+    p.add_argument("--chunk-rows", type=int, default=250_000, help="Rows generated per write (default: 250000)")
+    p.add_argument("--seed", type=int, default=None, help="Random seed for a reproducible file")
+    args = p.parse_args(argv)
+
+    write_synthetic(
+        args.out, args.rows, seed=args.seed, chunk_rows=args.chunk_rows,
+        n_teams=args.teams, n_seasons=args.seasons, first_season=args.first_season, ends=args.ends,
+        unmarked=args.unmarked, malformed=args.malformed, missing_outcome=args.missing_outcome,
+    )
+    print(f"Wrote {args.rows} synthetic games: {args.out}")
+
+if __name__ == "__main__":
+    main()
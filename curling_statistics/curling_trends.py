@@ -0,0 +1,266 @@
+"""
+Curling Team Trends (Rolling / Cumulative Stats)
+================================================
+
+Game-by-game trend lines for every team without recomputing a window at a time.
+
+Each team's games are sorted by Date and every TeamAggregate counter (games, W/L/T,
+points, hammer / no-hammer end counts, steals, forces) is turned into a prefix-sum
+array once. Any window of games is then `prefix[stop] - prefix[start]`, so a
+"last N games", "season-to-date" or "as of a date" aggregate costs O(1) regardless
+of how many games it spans.
+
+The tidy output has one row per team game with the same KPIs finalize() reports,
+flattened with the dotted names used in ALL_team_aggregate.csv (points.for,
+hammer.scoring_rate, no_hammer.steal_rate, ...). Rates are None/NaN when the window
+has no ends of that kind, and rounded to 3 places like finalize().
+
+Usage examples:
+  python curling_trends.py curling_statistics\\data\\curling_data.csv --out trends.csv
+  python curling_trends.py curling_statistics\\data\\curling_data.csv --window 5 --by-season --out last5.csv
+"""
+
+#########################################
+# Importing Base Packages for Scripting #
+#########################################
+
+# Standard Python Base Packages
+from __future__ import annotations
+import argparse
+from typing import Dict, List, Optional
+
+# Third-Party Packages to be Installed via pip
+import numpy as np
+import pandas as pd
+
+# Project modules
+from curling_stats import (
+    GAME_COUNTER_FIELDS, EndMatrix, TeamAggregate, _end_matrix, _resolve_columns, _result_letters,
+    _team_groups, load_table, save_table,
+)
+
+#######################
+# Counter definitions #
+#######################
+
+# Column order of the prefix-sum matrices; each name is a TeamAggregate field
+TREND_FIELDS = ["games_played", "wins", "losses", "ties"] + GAME_COUNTER_FIELDS
+_F = {name: i for i, name in enumerate(TREND_FIELDS)}
+
+
+#################################
+# Prefix-sum trend for one team #
+#################################
+
+class TeamTrend:
+    """
+    Date-ordered prefix sums of one team's game counters.
+
+    `prefix[i]` holds the totals of the first i games (row 0 is all zeros), so the
+    games in [start, stop) sum to `prefix[stop] - prefix[start]`. Games without a
+    parseable Date sort last, after all dated games.
+    """
+
+    def __init__(self, team: str, dates: np.ndarray, prefix: np.ndarray, games: pd.DataFrame):
+        self.team = team
+        self.dates = dates
+        self.prefix = prefix
+        self.games = games
+
+    @classmethod
+    def from_counters(
+        cls,
+        team: str,
+        counters: Dict[str, np.ndarray],
+        letters: np.ndarray,
+        games: pd.DataFrame,
+        dates: np.ndarray,
+    ) -> "TeamTrend":
+        # np.argsort puts NaT last; stable keeps file order for same-day games
+        order = np.argsort(dates, kind="stable")
+        per_game = np.column_stack(
+            [np.ones(len(letters), dtype=np.int64), letters == "W", letters == "L", letters == "T"]
+            + [counters[f] for f in GAME_COUNTER_FIELDS]
+        ).astype(np.int64)[order]
+        prefix = np.zeros((len(order) + 1, len(TREND_FIELDS)), dtype=np.int64)
+        np.cumsum(per_game, axis=0, out=prefix[1:])
+        return cls(team, dates[order], prefix, games.iloc[order].reset_index(drop=True))
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def window_sums(self, start, stop) -> np.ndarray:
+        # Counter totals for games [start, stop); scalars or equal-length index arrays
+        return self.prefix[stop] - self.prefix[start]
+
+    def aggregate(self, start: int, stop: int) -> TeamAggregate:
+        sums = self.window_sums(start, stop)
+        seasons = {str(v) for v in self.games["Season"].iloc[start:stop]}
+        return TeamAggregate(team=self.team, seasons=seasons, **{f: int(sums[_F[f]]) for f in TREND_FIELDS})
+
+    def as_of(self, date) -> TeamAggregate:
+        # Totals over every game played on or before `date` (binary search on the sorted dates)
+        stop = int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(date), "ns"), side="right"))
+        return self.aggregate(0, stop)
+
+    def bounds(self, window: Optional[int] = None, by_season: bool = False):
+        # (start, stop) per game: the `window` games ending with it, or everything so far
+        stop = np.arange(1, len(self) + 1)
+        start = np.zeros(len(self), dtype=np.int64)
+        if by_season:
+            season = self.games["Season"].astype(str).to_numpy()
+            new_season = np.r_[True, season[1:] != season[:-1]]
+            start = np.maximum.accumulate(np.where(new_season, np.arange(len(self)), 0))
+        if window is not None:
+            start = np.maximum(start, stop - window)
+        return start, stop
+
+
+##########################
+# KPI frame (vectorized) #
+##########################
+
+def _round3(x: np.ndarray) -> np.ndarray:
+    # np.round scales by 1000 first, which can flip a .0005 tie (e.g. 21/80) relative to
+    # the built-in round() finalize() uses; re-round the few values near a tie exactly
+    out = np.round(x, 3)
+    scaled = x * 1000
+    with np.errstate(invalid="ignore"):
+        near_tie = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    for i in near_tie:
+        out[i] = round(float(x[i]), 3)
+    return out
+
+def _ratio(num: np.ndarray, den: np.ndarray, empty: float) -> np.ndarray:
+    # num / den rounded like finalize(), `empty` where den == 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den > 0, _round3(num / np.where(den > 0, den, 1)), empty)
+
+def _rate(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    return _ratio(num, den, np.nan)
+
+def kpi_frame(sums: np.ndarray) -> pd.DataFrame:
+    """
+    finalize()'s KPIs for many windows at once; `sums` is (windows x TREND_FIELDS).
+    Columns use the flattened names from ALL_team_aggregate.csv.
+    """
+    c = {f: sums[:, i] for f, i in _F.items()}
+    gp, pf, pa = c["games_played"], c["points_for"], c["points_against"]
+    h, nh = c["hammer_ends"], c["nonhammer_ends"]
+
+    return pd.DataFrame({
+        "games_played": gp,
+        "record.wins": c["wins"],
+        "record.losses": c["losses"],
+        "record.ties": c["ties"],
+        "points.for": pf,
+        "points.against": pa,
+        "points.diff": pf - pa,
+        "points.avg_for_per_game": _ratio(pf, gp, 0.0),
+        "points.avg_against_per_game": _ratio(pa, gp, 0.0),
+        "hammer.ends": h,
+        "hammer.scoring_ends": c["hammer_scoring_ends"],
+        "hammer.two_plus_ends": c["hammer_two_plus_ends"],
+        "hammer.blank_ends": c["hammer_blank_ends"],
+        "hammer.scoring_rate": _rate(c["hammer_scoring_ends"], h),
+        "hammer.two_plus_rate": _rate(c["hammer_two_plus_ends"], h),
+        "hammer.blank_rate": _rate(c["hammer_blank_ends"], h),
+        "hammer.steals_allowed": c["steals_against"],
+        "no_hammer.ends": nh,
+        "no_hammer.steals_for": c["steals_for"],
+        "no_hammer.steal_rate": _rate(c["steals_for"], nh),
+        "no_hammer.force_exactly_one_ends": c["force_exactly_one_ends"],
+        "no_hammer.force_rate": _rate(c["force_exactly_one_ends"], nh),
+        "no_hammer.defense_leq_one_ends": c["no_hammer_defense_leq_one_ends"],
+        "no_hammer.defense_leq_one_rate": _rate(c["no_hammer_defense_leq_one_ends"], nh),
+    })
+
+
+#####################
+# Dataset-level API #
+#####################
+
+def build_trends(
+    df: pd.DataFrame,
+    season: Optional[str] = None,
+    ends: Optional[EndMatrix] = None,
+) -> Dict[str, TeamTrend]:
+    """
+    One TeamTrend per team (sorted team names, matched like compute_stats_all_teams),
+    built from a single parse of the dataset.
+    """
+    cols, end_cols_real = _resolve_columns(df)
+    rows, groups = _team_groups(df, cols, season)
+    frame = df if rows is None else df.iloc[rows]
+
+    counters = _end_matrix(df, end_cols_real, ends, rows).game_counters()
+    letters = _result_letters(counters)
+    dates = pd.to_datetime(frame[cols["Date"]], errors="coerce").to_numpy(dtype="datetime64[ns]")
+    games = pd.DataFrame({
+        "Season": frame[cols["Season"]].to_numpy(),
+        "Date": frame[cols["Date"]].to_numpy(),
+        "Opponent": frame[cols["Opponent"]].to_numpy(),
+        "Computed Result": letters,
+    })
+
+    return {
+        team: TeamTrend.from_counters(
+            team,
+            {f: v[team_rows] for f, v in counters.items()},
+            letters[team_rows],
+            games.iloc[team_rows],
+            dates[team_rows],
+        )
+        for team, team_rows in groups.items()
+    }
+
+def trend_frame(
+    trends: Dict[str, TeamTrend],
+    window: Optional[int] = None,
+    by_season: bool = False,
+) -> pd.DataFrame:
+    """
+    Tidy frame with one row per team game (date order): the KPIs over the `window`
+    games ending with that game, or cumulative when `window` is None. `by_season`
+    restarts the accumulation at each new season (season-to-date).
+    """
+    frames: List[pd.DataFrame] = []
+    for team, trend in trends.items():
+        if not len(trend):
+            continue
+        start, stop = trend.bounds(window=window, by_season=by_season)
+        info = trend.games.assign(team=team, game_number=stop, window_games=stop - start)
+        info = info[["team", "game_number", "Season", "Date", "Opponent", "Computed Result", "window_games"]]
+        frames.append(pd.concat([info, kpi_frame(trend.window_sums(start, stop))], axis=1))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+############################
+# Command line entry point #
+############################
+
+def main(argv: Optional[List[str]] = None):
+    p = argparse.ArgumentParser(description="Rolling / cumulative curling KPIs for every team, one row per game.")
+    p.add_argument("input", help="Path to input table (CSV/XLSX/Parquet), or a directory/glob of partition files")
+    p.add_argument("--season", default=None, help="Optional season filter (exact match)")
+    p.add_argument("--window", type=int, default=None, help="Rolling window in games (default: cumulative)")
+    p.add_argument("--by-season", action="store_true", help="Restart the accumulation each season (season-to-date)")
+    p.add_argument("--out", default=None, help="Optional path to write the trend table (CSV/XLSX/Parquet)")
+    args = p.parse_args(argv)
+    if args.window is not None and args.window <= 0:
+        p.error("--window must be positive")
+
+    df = load_table(args.input, season=args.season)
+    trends = build_trends(df, season=args.season)
+    out = trend_frame(trends, window=args.window, by_season=args.by_season)
+
+    if args.out:
+        save_table(out, args.out)
+        print(f"Wrote {len(out)} rows for {len(trends)} teams: {args.out}")
+    else:
+        print(out.head(20).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Curling Data Consistency Checks / Hammer Inference
+==================================================
+
+Bulk validation of a curling dataset against its own end-by-end results, for all
+games at once (no per-row Python loop).
+
+Hammer inference: ends recorded without H/N (e.g. "-2" or a bare "B") have an
+unknown hammer state and drop out of every hammer / no-hammer counter. The team
+scored on gets hammer for the next end and a blank keeps it, so most of those
+states follow from the neighbouring ends (EndMatrix.infer_hammer).
+
+Checks per game (one boolean column each, plus an `issues` summary):
+- outcome_mismatch: Outcome (Win/Loss/Tie, W/L/T, "W 7-6", ...) disagrees with the
+  result computed from the ends
+- outcome_unrecognized: Outcome is filled in but not a win/loss/tie value
+- ends_played_mismatch: Ends Played differs from the number of filled-in end cells
+- unparsed_end: an end cell is filled in but could not be parsed
+- end_gap: a played end follows an empty one
+- hammer_conflict: a hammer state contradicts the previous end's result
+- hammer_unknown: a played end's hammer state is unknown even after inference
+
+Usage examples:
+  python curling_validate.py curling_statistics\\data\\curling_data.csv --out issues.csv
+  python curling_validate.py curling_statistics\\data\\curling_data.csv --out-cleaned curling_data_hammer.csv
+"""
+
+#########################################
+# Importing Base Packages for Scripting #
+#########################################
+
+# Standard Python Base Packages
+from __future__ import annotations
+import argparse
+from typing import List, Optional
+
+# Third-Party Packages to be Installed via pip
+import numpy as np
+import pandas as pd
+
+# Project modules
+from curling_stats import (
+    HAMMER_UNKNOWN, HAMMER_YES, EndMatrix, _end_matrix, _normalized, _resolve_columns,
+    _result_letters, _team_groups, load_table, save_table,
+)
+
+#########################
+# Outcome normalization #
+#########################
+
+# First letter of a normalized Outcome value -> W/L/T ("d" for draw)
+OUTCOME_LETTERS = {"w": "W", "l": "L", "t": "T", "d": "T"}
+
+ISSUE_COLUMNS = [
+    "outcome_mismatch", "outcome_unrecognized", "ends_played_mismatch",
+    "unparsed_end", "end_gap", "hammer_conflict", "hammer_unknown",
+]
+
+def outcome_letters(outcome: pd.Series) -> pd.Series:
+    # W/L/T per row, "" when Outcome is empty, "?" when it is not a win/loss/tie value
+    norm = _normalized(outcome)
+    letters = norm.str[:1].map(OUTCOME_LETTERS).fillna("?")
+    empty = outcome.isna() | (norm == "")
+    return letters.mask(empty, "")
+
+
+##################
+# Report builder #
+##################
+
+def _filled_cells(frame: pd.DataFrame, end_cols: List[object]) -> np.ndarray:
+    # True where an end cell holds anything other than NaN / whitespace
+    if not end_cols:
+        return np.zeros((len(frame), 0), dtype=bool)
+    cells = frame[end_cols]
+    return (cells.notna() & (cells.astype(str).apply(lambda c: c.str.strip()) != "")).to_numpy()
+
+def consistency_report(
+    df: pd.DataFrame,
+    season: Optional[str] = None,
+    ends: Optional[EndMatrix] = None,
+    include_clean: bool = False,
+) -> pd.DataFrame:
+    """
+    One row per game (only games with at least one issue unless `include_clean`),
+    keyed by `row`, the game's 0-based position in `df`. `ends` may carry the
+    already-parsed EndMatrix for all of `df`.
+    """
+    cols, end_cols_real = _resolve_columns(df)
+    rows, _ = _team_groups(df, cols, season)
+    frame = df if rows is None else df.iloc[rows]
+    positions = np.arange(len(df)) if rows is None else rows
+
+    matrix = _end_matrix(df, end_cols_real, ends, rows)
+    inferred = matrix.infer_hammer()
+    counters = matrix.game_counters()
+    computed = _result_letters(counters)
+
+    filled = _filled_cells(frame, end_cols_real)
+    played = matrix.played
+    known_before = played & (matrix.hammer != HAMMER_UNKNOWN)
+    known_after = played & (inferred.hammer != HAMMER_UNKNOWN)
+
+    outcome = outcome_letters(frame[cols["Outcome"]]).to_numpy()
+    ends_played = pd.to_numeric(frame[cols["Ends Played"]], errors="coerce").to_numpy()
+    ends_recorded = filled.sum(axis=1)
+
+    flags = pd.DataFrame({
+        "outcome_mismatch": np.isin(outcome, ["W", "L", "T"]) & (outcome != computed),
+        "outcome_unrecognized": outcome == "?",
+        "ends_played_mismatch": ~np.isnan(ends_played) & (ends_played != ends_recorded),
+        "unparsed_end": (filled & ~played).any(axis=1),
+        "end_gap": (played & (np.cumsum(~played, axis=1) > 0)).any(axis=1),
+        "hammer_conflict": inferred.hammer_conflicts().any(axis=1),
+        "hammer_unknown": (played & ~known_after).any(axis=1),
+    })
+
+    report = pd.DataFrame({
+        "row": positions,
+        "Season": frame[cols["Season"]].to_numpy(),
+        "Date": frame[cols["Date"]].to_numpy(),
+        "Team Name": frame[cols["Team Name"]].to_numpy(),
+        "Opponent": frame[cols["Opponent"]].to_numpy(),
+        "Outcome": frame[cols["Outcome"]].to_numpy(),
+        "Computed Result": computed,
+        "Ends Played": ends_played,
+        "ends_recorded": ends_recorded,
+        "ends_parsed": played.sum(axis=1),
+        "hammer_known": known_before.sum(axis=1),
+        "hammer_inferred": (known_after & ~known_before).sum(axis=1),
+        "hammer_conflicts": inferred.hammer_conflicts().sum(axis=1),
+    })
+    report = pd.concat([report, flags], axis=1)
+    # "a;b" list of the issue flags set on each row
+    report["issues"] = flags.dot(pd.Index(flags.columns) + ";").str.rstrip(";")
+    if not include_clean:
+        report = report[flags.any(axis=1).to_numpy()].reset_index(drop=True)
+    return report
+
+def issue_summary(report: pd.DataFrame) -> pd.Series:
+    # Games flagged per issue
+    return report[ISSUE_COLUMNS].sum().astype(int)
+
+
+###############################
+# Cleaned copy with H/N added #
+###############################
+
+def with_inferred_hammer(df: pd.DataFrame, ends: Optional[EndMatrix] = None) -> pd.DataFrame:
+    """
+    Copy of `df` where every end cell whose hammer state was inferred is rewritten
+    as a canonical token with the H/N marker ("-2" -> "-2N", "B" -> "BH").
+    Other cells are left exactly as they were.
+    """
+    _, end_cols_real = _resolve_columns(df)
+    matrix = _end_matrix(df, end_cols_real, ends)
+    inferred = matrix.infer_hammer()
+    changed = matrix.played & (matrix.hammer == HAMMER_UNKNOWN) & (inferred.hammer != HAMMER_UNKNOWN)
+
+    net = matrix.points_for.astype(np.int64) - matrix.points_against
+    score = np.where(matrix.blank, "B", np.char.mod("%+d", net))
+    tokens = np.char.add(score, np.where(inferred.hammer == HAMMER_YES, "H", "N"))
+
+    out = df.copy()
+    for j, col in enumerate(end_cols_real):
+        if changed[:, j].any():
+            out[col] = out[col].astype(object).mask(changed[:, j], tokens[:, j])
+    return out
+
+
+############################
+# Command line entry point #
+############################
+
+def main(argv: Optional[List[str]] = None):
+    p = argparse.ArgumentParser(description="Check a curling dataset for inconsistencies and infer missing hammer states.")
+    p.add_argument("input", help="Path to input table (CSV/XLSX/Parquet), or a directory/glob of partition files")
+    p.add_argument("--season", default=None, help="Optional season filter (exact match)")
+    p.add_argument("--all", action="store_true", help="Report every game, not only games with issues")
+    p.add_argument("--out", default=None, help="Optional path to write the report (CSV/XLSX/Parquet)")
+    p.add_argument("--out-cleaned", default=None,
+                   help="Optional path to write a copy of the input with inferred H/N markers added to end cells")
+    args = p.parse_args(argv)
+
+    df = load_table(args.input, season=args.season)
+    _, end_cols = _resolve_columns(df)
+    ends = EndMatrix.from_frame(df, end_cols)
+    report = consistency_report(df, season=args.season, ends=ends, include_clean=args.all)
+
+    flagged = int(report["issues"].ne("").sum())
+    print(f"Checked {len(df)} rows: {flagged} game(s) with issues")
+    print(issue_summary(report).to_string())
+    print(f"Hammer states inferred: {int((ends.infer_hammer().hammer != ends.hammer).sum())}")
+
+    if args.out:
+        save_table(report, args.out)
+        print(f"Wrote report: {args.out}")
+    if args.out_cleaned:
+        save_table(with_inferred_hammer(df, ends=ends), args.out_cleaned)
+        print(f"Wrote cleaned copy: {args.out_cleaned}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""
+Curling Win-Probability Tables (Monte Carlo)
+============================================
+
+Win probability for every (score differential, ends remaining, hammer) state,
+estimated from each team's own end-by-end results.
+
+1) Empirical end distributions: every played end with a known hammer state gives
+   one net score (points for - points against, clipped to +/-8). Counting them per
+   team and hammer state is one np.bincount over the whole dataset. Team counts are
+   smoothed toward the league distribution with `prior_ends` pseudo-ends, so thin
+   samples do not produce 0% / 100% outcomes.
+2) Monte Carlo: simulated games are NumPy arrays advanced one end per array step
+   (not one Python loop per game). A steal leaves hammer where it was, a blank keeps
+   it, and any score by the hammer team passes it. Games tied after the last end go
+   to extra ends; games still tied after EXTRA_END_LIMIT extra ends count as half a
+   win. Each path serves every starting lead and every shorter ends-remaining count
+   (see simulate_win_prob), so a whole table costs 2 x sims x max_ends draws.
+3) The estimates are stored in a dense WinProbTable, so lookups during a live game
+   are a single array index.
+
+Perspective: `diff` is the team's lead before the next end (negative when behind),
+`ends_remaining` counts the next end, and `hammer` is whether the team has it.
+
+Usage examples:
+  python curling_win_prob.py curling_statistics\\data\\curling_data.csv --out win_prob.csv
+  python curling_win_prob.py curling_statistics\\data\\curling_data.csv --team Monsters --sims 50000 --lookup -2 3 H
+"""
+
+#########################################
+# Importing Base Packages for Scripting #
+#########################################
+
+# Standard Python Base Packages
+from __future__ import annotations
+import argparse
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Third-Party Packages to be Installed via pip
+import numpy as np
+import pandas as pd
+
+# Project modules
+from curling_stats import (
+    HAMMER_NO, HAMMER_YES, EndMatrix, _end_matrix, _resolve_columns, _team_groups,
+    load_table, save_table,
+)
+
+########################
+# Simulation constants #
+########################
+
+MAX_END_SCORE = 8  # eight stones per team: the most one end can score
+OUTCOMES = np.arange(-MAX_END_SCORE, MAX_END_SCORE + 1)  # net end score, team's view
+EXTRA_END_LIMIT = 3  # extra ends simulated before a tie is scored as half a win
+LEAGUE = "__league__"  # key / team label of the all-teams table
+SIM_BATCH_ELEMENTS = 4_000_000  # simulated ends held in memory at once
+
+
+###############################
+# Empirical end distributions #
+###############################
+
+class EndDistribution:
+    """
+    Net end score probabilities for one team: `probs[h]` over OUTCOMES, where h is
+    HAMMER_NO (0) or HAMMER_YES (1). `counts` keeps the raw observed ends.
+    """
+
+    def __init__(self, team: str, counts: np.ndarray, probs: np.ndarray):
+        self.team = team
+        self.counts = counts
+        self.probs = probs
+
+    @property
+    def cdf(self) -> np.ndarray:
+        cdf = np.cumsum(self.probs, axis=1)
+        cdf[:, -1] = 1.0  # guard against float round-off short of 1
+        return cdf
+
+    def expected_net(self) -> Tuple[float, float]:
+        # Mean net points per end (without hammer, with hammer)
+        return tuple(float(v) for v in self.probs @ OUTCOMES)
+
+def _normalize_rows(counts: np.ndarray) -> np.ndarray:
+    totals = counts.sum(axis=-1, keepdims=True)
+    return np.divide(counts, totals, out=np.zeros(counts.shape), where=totals > 0)
+
+def end_distributions(
+    df: pd.DataFrame,
+    season: Optional[str] = None,
+    ends: Optional[EndMatrix] = None,
+    prior_ends: float = 20.0,
+) -> Dict[str, EndDistribution]:
+    """
+    League distribution (key LEAGUE) plus one per team, matched and named as
+    compute_stats_all_teams does. Ends with an unknown hammer state are skipped.
+    """
+    cols, end_cols_real = _resolve_columns(df)
+    rows, groups = _team_groups(df, cols, season)
+    frame_len = len(df) if rows is None else len(rows)
+    matrix = _end_matrix(df, end_cols_real, ends, rows)
+
+    team_code = np.full(frame_len, -1, dtype=np.int64)
+    for i, team_rows in enumerate(groups.values()):
+        team_code[team_rows] = i
+
+    # Rows with no (matching) team name count toward no team
+    known = matrix.played & ((matrix.hammer == HAMMER_YES) | (matrix.hammer == HAMMER_NO))
+    known &= (team_code >= 0)[:, None]
+    game, _ = np.nonzero(known)
+    net = np.clip(matrix.points_for[known].astype(np.int64) - matrix.points_against[known], -MAX_END_SCORE, MAX_END_SCORE)
+    hammer = matrix.hammer[known].astype(np.int64)
+    key = (team_code[game] * 2 + hammer) * len(OUTCOMES) + (net + MAX_END_SCORE)
+    counts = np.bincount(key, minlength=len(groups) * 2 * len(OUTCOMES)).reshape(len(groups), 2, len(OUTCOMES))
+
+    league_counts = counts.sum(axis=0)
+    league_probs = _normalize_rows(league_counts)
+    out = {LEAGUE: EndDistribution(LEAGUE, league_counts, league_probs)}
+    for i, team in enumerate(groups):
+        smoothed = counts[i] + prior_ends * league_probs
+        out[team] = EndDistribution(team, counts[i], _normalize_rows(smoothed))
+    return out
+
+
+#########################
+# Win-probability table #
+#########################
+
+class WinProbTable:
+    """
+    Dense win probabilities indexed [diff + max_diff, ends_remaining, hammer].
+    Leads beyond +/-max_diff are looked up at the edge of the table.
+    """
+
+    def __init__(self, team: str, probs: np.ndarray, n_sims: int):
+        self.team = team
+        self.probs = probs
+        self.n_sims = n_sims
+
+    @property
+    def max_diff(self) -> int:
+        return (self.probs.shape[0] - 1) // 2
+
+    @property
+    def max_ends(self) -> int:
+        return self.probs.shape[1] - 1
+
+    def lookup(self, diff, ends_remaining, hammer):
+        """
+        P(win) for the given state(s); scalars or equal-length arrays. `hammer` is a
+        bool (or 0/1) for whether the team has hammer for the next end.
+        """
+        ends_remaining = np.asarray(ends_remaining)
+        if np.any((ends_remaining < 0) | (ends_remaining > self.max_ends)):
+            raise ValueError(f"ends_remaining must be between 0 and {self.max_ends}")
+        d = np.clip(np.asarray(diff), -self.max_diff, self.max_diff) + self.max_diff
+        p = self.probs[d, ends_remaining, np.asarray(hammer, dtype=np.int64)]
+        return float(p) if np.ndim(p) == 0 else p
+
+    def to_frame(self) -> pd.DataFrame:
+        d, e, h = np.meshgrid(
+            np.arange(-self.max_diff, self.max_diff + 1),
+            np.arange(self.max_ends + 1),
+            [False, True],
+            indexing="ij",
+        )
+        return pd.DataFrame({
+            "team": self.team,
+            "diff": d.ravel(),
+            "ends_remaining": e.ravel(),
+            "hammer": h.ravel(),
+            "win_prob": self.probs.ravel(),
+            "sims": self.n_sims,
+        })
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "WinProbTable":
+        # Inverse of to_frame() for a single team's rows
+        max_diff = int(frame["diff"].max())
+        max_ends = int(frame["ends_remaining"].max())
+        probs = np.full((2 * max_diff + 1, max_ends + 1, 2), np.nan)
+        probs[
+            frame["diff"].to_numpy() + max_diff,
+            frame["ends_remaining"].to_numpy(),
+            frame["hammer"].astype(bool).to_numpy().astype(np.int64),
+        ] = frame["win_prob"].to_numpy()
+        return cls(str(frame["team"].iloc[0]), probs, int(frame["sims"].iloc[0]))
+
+
+#####################
+# Vectorized engine #
+#####################
+
+def _draw(cdf: np.ndarray, hammer: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    # One net end score per game, inverse-CDF sampled from the hammer-state distribution.
+    # Both CDF rows are searched in one call: row h and the uniforms of hammer state h are shifted up by h.
+    stacked = (cdf + np.arange(2)[:, None]).ravel()
+    idx = np.searchsorted(stacked, rng.random(len(hammer)) + hammer, side="right") - hammer * len(OUTCOMES)
+    return OUTCOMES[np.clip(idx, 0, len(OUTCOMES) - 1)]
+
+def _next_hammer(net: np.ndarray, hammer: np.ndarray) -> np.ndarray:
+    # Scoring with hammer passes it, a steal leaves it, a blank keeps it
+    return np.where(net > 0, HAMMER_NO, np.where(net < 0, HAMMER_YES, hammer)).astype(np.int8)
+
+def _start_hammer(n_sims: int) -> np.ndarray:
+    return np.repeat(np.array([HAMMER_NO, HAMMER_YES], dtype=np.int8), n_sims)
+
+def _extra_end_win_prob(cdf: np.ndarray, n_sims: int, rng: np.random.Generator) -> np.ndarray:
+    # P(win) of a game tied after regulation, by who has hammer for the first extra end
+    hammer = _start_hammer(n_sims)
+    diff = np.zeros(len(hammer), dtype=np.int32)
+    for _ in range(EXTRA_END_LIMIT):
+        tied = diff == 0
+        if not tied.any():
+            break
+        net = np.where(tied, _draw(cdf, hammer, rng), 0)
+        diff += net
+        hammer = _next_hammer(net, hammer)
+    return ((diff > 0) + 0.5 * (diff == 0)).reshape(2, n_sims).mean(axis=1)
+
+def _regulation_paths(cdf: np.ndarray, max_ends: int, n_sims: int, rng: np.random.Generator):
+    # n_sims paths of max_ends ends from each start hammer state; row e holds the
+    # running net score and the hammer holder after the first e ends
+    hammer = _start_hammer(n_sims)
+    totals = np.zeros((max_ends + 1, len(hammer)), dtype=np.int32)
+    hammers = np.empty((max_ends + 1, len(hammer)), dtype=np.int8)
+    hammers[0] = hammer
+    for e in range(1, max_ends + 1):
+        net = _draw(cdf, hammers[e - 1], rng)
+        totals[e] = totals[e - 1] + net
+        hammers[e] = _next_hammer(net, hammers[e - 1])
+    return totals, hammers
+
+def simulate_win_prob(
+    dist: EndDistribution,
+    max_ends: int = 10,
+    max_diff: int = 10,
+    n_sims: int = 100_000,
+    rng: Optional[np.random.Generator] = None,
+) -> WinProbTable:
+    """
+    Monte Carlo estimate of P(win) for every start state from `n_sims` simulated
+    games per (ends_remaining, hammer) with the team's end distributions.
+
+    The ends played out do not depend on the starting lead, so each simulated path
+    serves every `diff` at once: P(win | diff) = P(net over the remaining ends > -diff)
+    plus P(net == -diff) weighted by the extra-end win probability for whoever holds
+    hammer at that point. The first e ends of a max_ends path likewise serve
+    ends_remaining = e.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    cdf = dist.cdf
+    tie_win = _extra_end_win_prob(cdf, n_sims, rng)
+
+    # Histograms over (ends_remaining, start hammer, net total), with room for +/-max_diff on both sides
+    offset = MAX_END_SCORE * max_ends + max_diff
+    span = 2 * offset + 1
+    shape = (max_ends + 1, 2, span)
+    counts = np.zeros(shape)
+    tie_weight = np.zeros(shape)
+
+    # Batches keep one batch of paths around SIM_BATCH_ELEMENTS ends
+    per_batch = max(1, SIM_BATCH_ELEMENTS // (2 * (max_ends + 1)))
+    done = 0
+    while done < n_sims:
+        k = min(per_batch, n_sims - done)
+        totals, hammers = _regulation_paths(cdf, max_ends, k, rng)
+        state = np.arange(max_ends + 1)[:, None] * 2 + np.repeat([HAMMER_NO, HAMMER_YES], k)[None, :]
+        key = (state * span + totals + offset).ravel()
+        counts += np.bincount(key, minlength=counts.size).reshape(shape)
+        tie_weight += np.bincount(key, weights=tie_win[hammers].ravel(), minlength=counts.size).reshape(shape)
+        done += k
+
+    greater = counts[..., ::-1].cumsum(axis=-1)[..., ::-1] - counts  # paths with net total > index
+    at = offset - np.arange(-max_diff, max_diff + 1)  # index of net total == -diff
+    probs = (greater[..., at] + tie_weight[..., at]) / n_sims  # (ends, hammer, diff)
+    return WinProbTable(dist.team, probs.transpose(2, 0, 1).copy(), n_sims)
+
+def build_win_prob_tables(
+    df: pd.DataFrame,
+    season: Optional[str] = None,
+    teams: Optional[Sequence[str]] = None,
+    max_ends: Optional[int] = None,
+    max_diff: int = 10,
+    n_sims: int = 100_000,
+    prior_ends: float = 20.0,
+    seed: Optional[int] = None,
+    ends: Optional[EndMatrix] = None,
+) -> Dict[str, WinProbTable]:
+    """
+    League table (key LEAGUE) plus one per team (all teams, or those in `teams`,
+    matched case-insensitively). `max_ends` defaults to the dataset's End N columns.
+    """
+    dists = end_distributions(df, season=season, ends=ends, prior_ends=prior_ends)
+    if max_ends is None:
+        max_ends = len(_resolve_columns(df)[1])
+    if teams is not None:
+        wanted = {t.strip().lower() for t in teams}
+        missing = wanted - {t.lower() for t in dists}
+        if missing:
+            raise ValueError(f"No rows found for team(s): {sorted(missing)}")
+        dists = {t: d for t, d in dists.items() if t == LEAGUE or t.lower() in wanted}
+
+    rng = np.random.default_rng(seed)
+    return {
+        team: simulate_win_prob(dist, max_ends=max_ends, max_diff=max_diff, n_sims=n_sims, rng=rng)
+        for team, dist in dists.items()
+    }
+
+def tables_frame(tables: Dict[str, WinProbTable]) -> pd.DataFrame:
+    return pd.concat([t.to_frame() for t in tables.values()], ignore_index=True)
+
+def load_win_prob_tables(path: str) -> Dict[str, WinProbTable]:
+    # Read a table written by this script (CSV/XLSX/Parquet) back for lookups
+    frame = load_table(path)
+    return {str(team): WinProbTable.from_frame(rows) for team, rows in frame.groupby("team", sort=False)}
+
+
+############################
+# Command line entry point #
+############################
+
+def main(argv: Optional[List[str]] = None):
+    p = argparse.ArgumentParser(description="Monte Carlo win-probability tables from empirical end distributions.")
+    p.add_argument("input", help="Path to input table (CSV/XLSX/Parquet), or a directory/glob of partition files")
+    p.add_argument("--season", default=None, help="Optional season filter (exact match)")
+    p.add_argument("--team", action="append", default=None, help="Only build this team's table, plus the league (repeatable)")
+    p.add_argument("--sims", type=int, default=100_000, help="Simulated games per (ends remaining, hammer) state (default: 100000)")
+    p.add_argument("--max-ends", type=int, default=None, help="Largest ends-remaining state (default: number of End N columns)")
+    p.add_argument("--max-diff", type=int, default=10, help="Largest lead/deficit state (default: 10)")
+    p.add_argument("--prior-ends", type=float, default=20.0, help="League pseudo-ends blended into each team (default: 20)")
+    p.add_argument("--seed", type=int, default=None, help="Random seed for reproducible tables")
+    p.add_argument("--out", default=None, help="Optional path to write the tables (CSV/XLSX/Parquet)")
+    p.add_argument("--lookup", nargs=3, metavar=("DIFF", "ENDS_REMAINING", "H|N"),
+                   help="Print P(win) for one state from each table built")
+    args = p.parse_args(argv)
+    if args.sims <= 0:
+        p.error("--sims must be positive")
+
+    df = load_table(args.input, season=args.season)
+    tables = build_win_prob_tables(
+        df, season=args.season, teams=args.team, max_ends=args.max_ends, max_diff=args.max_diff,
+        n_sims=args.sims, prior_ends=args.prior_ends, seed=args.seed,
+    )
+
+    if args.out:
+        save_table(tables_frame(tables), args.out)
+        print(f"Wrote win-probability tables for {len(tables) - 1} team(s) plus the league: {args.out}")
+    if args.lookup:
+        diff, ends_remaining, hammer = int(args.lookup[0]), int(args.lookup[1]), args.lookup[2].strip().upper() == "H"
+        for team, table in tables.items():
+            print(f"{team}: P(win | diff={diff:+d}, ends_remaining={ends_remaining}, hammer={hammer}) = "
+                  f"{table.lookup(diff, ends_remaining, hammer):.3f}")
+    elif not args.out:
+        print(tables[LEAGUE].to_frame().query("ends_remaining <= 2 and abs(diff) <= 2").to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -5,16 +5,36 @@ Run curling stats for ALL teams and write:
 - Consolidated datasets:
   * <OUTDIR>/ALL_per_game.csv  (all teams' per-game rows combined)
   * <OUTDIR>/ALL_team_aggregate.csv  (one row per team; flattened KPIs)
+- Or, with --output-format dataset, a team-partitioned Parquet dataset plus
+  team_stats.jsonl / ALL_team_aggregate.parquet instead (see curling_dataset.py)
+- With --elo, every per-game row also carries Elo features (see curling_ratings.py)
 
-Edit INPUT_PATH / SEASON / OUTDIR below or pass via env vars.
+Edit INPUT_PATH / SEASON / OUTDIR below, pass via env vars, or use the CLI flags
+(--input/--season/--outdir; --cache/--rebuild-cache for the parse cache;
+--profile/--metrics-out for per-stage timings and counts).
 Requires `curling_stats.py` (fixed-schema version) in the same directory.
 """
+import argparse
+import contextlib
+import csv
+import hashlib
 import os
 import json
+from concurrent.futures import Future, ProcessPoolExecutor
+import numpy as np
 import pandas as pd
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 
-from curling_stats import load_table, save_table, compute_stats_for_team
+from curling_dataset import (
+    PerGameStream, dataset_outputs_exist, per_game_schema, per_game_table, read_team_stats,
+    write_per_game_dataset, write_team_stats,
+)
+from curling_metrics import NO_METRICS, RunMetrics, add_metrics_arguments, metrics_from_args
+from curling_ratings import rating_features
+from curling_stats import (
+    EndMatrix, TeamStatsAccumulator, infer_hammer_ends, is_multi_file, iter_table_chunks, load_table, load_table_cached, save_table,
+    compute_stats_for_team, compute_stats_all_teams, team_row_positions,
+)
 
 # -----------------------
 # Config
@@ -23,6 +43,11 @@ INPUT_PATH = "curling_statistics\data\curling_data.csv"        # or .xlsx / .par
 SEASON = None                   # e.g., "2025" to filter; or None for all seasons
 OUTDIR = "curling_statistics\data\outputs"
 
+MANIFEST_NAME = ".run_all_manifest.json"  # per-team row hashes for --incremental
+MANIFEST_VERSION = 3
+PER_GAME_ALL = "ALL_per_game.csv"
+AGG_ALL = "ALL_team_aggregate.csv"
+
 # -----------------------
 # Helpers
 # -----------------------
@@ -42,15 +67,228 @@ def flatten(d: Dict[str, Any], parent: str = "", sep: str = ".") -> Dict[str, An
             out[nk] = v
     return out
 
+def write_team_outputs(outdir: str, team: str, agg: Dict[str, Any], per_game: pd.DataFrame):
+    safe = safe_name(team)
+    with open(os.path.join(outdir, f"{safe}_stats.json"), "w", encoding="utf-8") as f:
+        json.dump(agg, f, indent=2, ensure_ascii=False)
+    save_table(per_game, os.path.join(outdir, f"{safe}_per_game.csv"))
+
+
+def agg_table(rows: List[Dict[str, Any]]) -> pd.DataFrame:
+    agg_all = pd.DataFrame(rows)
+    # Order helpful columns first
+    preferred = [
+        "team", "games_played", "record.wins", "record.losses", "record.ties",
+        "points.for", "points.against", "points.diff",
+        "hammer.ends", "hammer.scoring_rate", "hammer.two_plus_rate", "hammer.blank_rate",
+        "no_hammer.ends", "no_hammer.steal_rate", "no_hammer.force_rate", "no_hammer.defense_leq_one_rate",
+    ]
+    cols = [c for c in preferred if c in agg_all.columns] + [c for c in agg_all.columns if c not in preferred]
+    return agg_all[cols]
+
+# -----------------------
+# Incremental support
+# -----------------------
+
+def team_row_hashes(df: pd.DataFrame, positions: Dict[str, np.ndarray]) -> Dict[str, str]:
+    # One digest per team over its rows (in file order) and the column header
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    header = "\x1f".join(str(c) for c in df.columns).encode("utf-8")
+    out = {}
+    for team, rows in positions.items():
+        h = hashlib.blake2b(header, digest_size=16)
+        h.update(row_hashes[rows].tobytes())
+        out[team] = h.hexdigest()
+    return out
+
+def load_manifest(
+    outdir: str,
+    input_path: str,
+    season: Optional[str],
+    infer_hammer: bool = False,
+    output_format: str = "files",
+    elo: bool = False,
+) -> Optional[Dict[str, str]]:
+    # Previous team hashes, or None when the manifest is missing or was built for other inputs
+    try:
+        with open(os.path.join(outdir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (manifest.get("version") != MANIFEST_VERSION
+            or manifest.get("input") != os.path.abspath(input_path)
+            or manifest.get("season") != season
+            or manifest.get("infer_hammer", False) != infer_hammer
+            or manifest.get("output_format", "files") != output_format
+            or manifest.get("elo", False) != elo):
+        return None
+    if output_format == "dataset":
+        if not dataset_outputs_exist(outdir):
+            return None
+    elif not all(os.path.exists(os.path.join(outdir, n)) for n in (PER_GAME_ALL, AGG_ALL)):
+        return None
+    return manifest.get("teams", {})
+
+def save_manifest(
+    outdir: str,
+    input_path: str,
+    season: Optional[str],
+    teams: Dict[str, str],
+    infer_hammer: bool = False,
+    output_format: str = "files",
+    elo: bool = False,
+):
+    path = os.path.join(outdir, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({
+            "version": MANIFEST_VERSION,
+            "input": os.path.abspath(input_path),
+            "season": season,
+            "infer_hammer": infer_hammer,
+            "output_format": output_format,
+            "elo": elo,
+            "teams": dict(sorted(teams.items())),
+        }, f, indent=2, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+def read_team_blocks(path: str) -> Tuple[List[str], Dict[str, List[List[str]]]]:
+    # Consolidated CSV as (header, {team: rows}); the team is the first column
+    blocks: Dict[str, List[List[str]]] = {}
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        for row in reader:
+            blocks.setdefault(row[0], []).append(row)
+    return header, blocks
+
+def splice_consolidated(
+    path: str,
+    new_rows: pd.DataFrame,
+    drop: set,
+    team_order: List[str],
+) -> bool:
+    """
+    Replace the rows of `drop` teams in an existing consolidated CSV with `new_rows`
+    (same columns, team in the first column), keeping teams in `team_order`.
+    Returns False when the existing header no longer matches, so the caller can
+    fall back to a full rebuild.
+    """
+    header, blocks = read_team_blocks(path)
+    if not new_rows.empty and [str(c) for c in new_rows.columns] != header:
+        return False
+    for team in drop:
+        blocks.pop(team, None)
+
+    # Render new rows exactly as save_table would, then re-read them as text records
+    if not new_rows.empty:
+        text = new_rows.to_csv(index=False, header=False)
+        for row in csv.reader(text.splitlines()):
+            blocks.setdefault(row[0], []).append(row)
+
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(header)
+        for team in team_order:
+            writer.writerows(blocks.get(team, []))
+    os.replace(tmp, path)
+    return True
+
+# -----------------------
+# Parallel execution
+# -----------------------
+
+def _team_worker(
+    team: str,
+    team_df: pd.DataFrame,
+    season: Optional[str],
+    ends: Optional[EndMatrix],
+    outdir: Optional[str],
+) -> Tuple[Dict[str, Any], pd.DataFrame]:
+    # Runs in a pool process on just this team's rows; writes its per-team files too unless outdir is None
+    agg, per_game = compute_stats_for_team(team_df, team, season=season, ends=ends)
+    if outdir is not None:
+        write_team_outputs(outdir, team, agg, per_game)
+    return agg, per_game
+
+def submit_teams(
+    pool: ProcessPoolExecutor,
+    df: pd.DataFrame,
+    ends: Optional[EndMatrix],
+    positions: Dict[str, np.ndarray],
+    teams: List[str],
+    season: Optional[str],
+    outdir: Optional[str],
+) -> Dict[str, Future]:
+    # Each task pickles only the team's own rows (and parsed ends), never the full frame
+    futures = {}
+    for team in teams:
+        rows = positions[team]
+        team_ends = ends.take(rows) if ends is not None else None
+        futures[team] = pool.submit(_team_worker, team, df.iloc[rows], season, team_ends, outdir)
+    return futures
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Compute curling stats for every team in a fixed-schema dataset.")
+    p.add_argument("--input", default=os.environ.get("CURLING_INPUT", INPUT_PATH),
+                   help="Path to input table (CSV/XLSX/Parquet) or a directory/glob of season-partitioned files; env CURLING_INPUT")
+    p.add_argument("--season", default=os.environ.get("CURLING_SEASON", SEASON),
+                   help="Optional season filter (exact match); env CURLING_SEASON")
+    p.add_argument("--outdir", default=os.environ.get("CURLING_OUTDIR", OUTDIR),
+                   help="Output directory; env CURLING_OUTDIR")
+    p.add_argument("--cache", action=argparse.BooleanOptionalAction, default=False,
+                   help="Reuse a parsed copy of the input cached in .curling_cache/ next to it (default: off)")
+    p.add_argument("--rebuild-cache", action="store_true", help="Re-parse the input and overwrite its cache")
+    p.add_argument("--incremental", action="store_true",
+                   help=f"Recompute only teams whose rows changed since the last run (tracked in OUTDIR/{MANIFEST_NAME})")
+    p.add_argument("--workers", type=int, default=1,
+                   help="Compute teams in N worker processes (0 = one per CPU core; default 1 = serial)")
+    p.add_argument("--infer-hammer", action="store_true",
+                   help="Fill unknown hammer states from the neighbouring ends before computing")
+    p.add_argument("--chunksize", type=int, default=None,
+                   help="Stream the input N rows at a time (CSV chunks / Parquet batches) instead of loading it whole")
+    p.add_argument("--output-format", choices=["files", "dataset"], default=os.environ.get("CURLING_OUTPUT_FORMAT", "files"),
+                   help="files: per-team JSON/CSV plus ALL_* CSVs (default); dataset: team-partitioned Parquet "
+                        "per-game dataset plus team_stats.jsonl and ALL_team_aggregate.parquet; env CURLING_OUTPUT_FORMAT")
+    p.add_argument("--elo", action="store_true",
+                   help="Add Elo rating features (rating before the game, opponent rating, expected score, "
+                        "rating change) to every per-game row")
+    add_metrics_arguments(p, hot_stage="compute")
+    args = p.parse_args(argv)
+    if args.chunksize is not None:
+        if args.chunksize <= 0:
+            p.error("--chunksize must be positive")
+        if args.incremental or args.workers != 1 or args.cache or args.rebuild_cache:
+            p.error("--chunksize cannot be combined with --incremental, --workers or the parse cache")
+    if args.elo and (args.incremental or args.chunksize is not None):
+        # A changed game moves every later rating, so no team's rows can be reused or streamed
+        p.error("--elo cannot be combined with --incremental or --chunksize")
+    return args
+
 # -----------------------
 # Main
 # -----------------------
 
-def main():
-    os.makedirs(OUTDIR, exist_ok=True)
+def run(args: argparse.Namespace, metrics: Optional[RunMetrics] = None):
+    m = metrics or NO_METRICS
+    outdir, season = args.outdir, args.season
+    dataset = args.output_format == "dataset"
+    os.makedirs(outdir, exist_ok=True)
 
-    # Load once
-    df = load_table(INPUT_PATH)
+    # Load once (optionally with the parsed ends from the on-disk cache)
+    use_cache = args.cache or args.rebuild_cache
+    if use_cache and is_multi_file(args.input):
+        print("Parse cache is only used for single input files; reading partitions directly")
+        use_cache = False
+
+    with m.stage("load"):
+        if use_cache:
+            df, ends = load_table_cached(args.input, rebuild=args.rebuild_cache)
+        else:
+            df, ends = load_table(args.input, season=season), None
+    m.count(rows_loaded=len(df), parse_cache=use_cache)
+    if args.infer_hammer:
+        ends = infer_hammer_ends(df, ends, metrics)
 
     # Resolve actual column name for "Team Name" robustly
     lc = {str(c).strip().lower(): c for c in df.columns}
@@ -62,56 +300,263 @@ def main():
     teams = sorted(df[team_col].dropna().astype(str).unique())
     print(f"Found {len(teams)} teams")
 
+    # Hash each team's rows so later --incremental runs can tell what changed
+    with m.stage("hash_rows"):
+        positions = team_row_positions(df, season=season)
+        hashes = team_row_hashes(df, positions)
+
+    features = None
+    if args.elo:
+        with m.stage("ratings"):
+            features, book = rating_features(df, season=season, ends=ends)
+        m.count(rated_rows=int(features["Elo"].notna().sum()), rated_teams=len(book.names))
+
+    previous = (load_manifest(outdir, args.input, season, args.infer_hammer, args.output_format)
+                if args.incremental else None)
+    if args.incremental and previous is None:
+        print("No usable manifest in output directory; running a full rebuild")
+    incremental = previous is not None
+
+    if incremental:
+        changed = [t for t in teams if t in hashes and previous.get(t) != hashes[t]]
+        removed = [t for t in previous if t not in hashes]
+        print(f"Incremental: {len(changed)} changed, {len(removed)} removed, "
+              f"{len(hashes) - len(changed)} unchanged")
+    else:
+        changed, removed = [t for t in teams if t in hashes], []
+
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    results: Dict[str, Dict[str, Any]] = {}
+    per_game_by_team: Dict[str, pd.DataFrame] = {}
+    pending: Dict[str, Future] = {}
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 and changed else None
+
+    m.count(teams_changed=len(changed), teams_removed=len(removed), workers=workers if pool is not None else 1)
+
+    with m.stage("compute"):
+        if pool is not None:
+            # Fan teams out to worker processes; results are gathered below in team order
+            # (their time shows up in write_teams, and their parse counts are not collected)
+            # With --elo the parent adds the rating columns and writes the files itself
+            writer = None if dataset or features is not None else outdir
+            pending = submit_teams(pool, df, ends, positions, changed, season, writer)
+        else:
+            # One grouped pass computes every (changed) team; per-team frames are slices of the combined one
+            work_df, work_ends = df, ends
+            if incremental:
+                rows = np.sort(np.concatenate([positions[t] for t in changed])) if changed else np.array([], dtype=np.intp)
+                work_df = df.iloc[rows]
+                work_ends = ends.take(rows) if ends is not None else None
+            results, per_game_combined = compute_stats_all_teams(work_df, season=season, ends=work_ends, metrics=metrics)
+            per_game_by_team = {
+                team: g.drop(columns="__Team__").reset_index(drop=True)
+                for team, g in per_game_combined.groupby("__Team__", sort=False)
+            }
+
     all_per_game: List[pd.DataFrame] = []
     all_agg_rows: List[Dict[str, Any]] = []
+    stats_by_team: Dict[str, Dict[str, Any]] = {}
+    written = {t: h for t, h in hashes.items() if t not in changed}
 
-    for team in teams:
-        try:
-            agg, per_game = compute_stats_for_team(df, team, season=SEASON)
+    with m.stage("write_teams"):
+        for team in teams:
+            if incremental and team not in changed:
+                continue
+            try:
+                if team in pending:
+                    # Computed (and, in files mode without --elo, written) by a worker process
+                    agg, per_game = pending[team].result()
+                else:
+                    if team not in results:
+                        msg = f"No rows found for team '{team}'" + (f" in season '{season}'" if season else "")
+                        raise ValueError(msg)
+                    agg, per_game = results[team], per_game_by_team[team]
+                if features is not None:
+                    # Per-game rows are the team's rows in file order, same as its positions
+                    per_game = pd.concat([per_game, features.iloc[positions[team]].reset_index(drop=True)], axis=1)
+                # Write per-team outputs
+                if not dataset and (team not in pending or features is not None):
+                    write_team_outputs(outdir, team, agg, per_game)
 
-            safe = safe_name(team)
-            # Write per-team outputs
-            with open(os.path.join(OUTDIR, f"{safe}_stats.json"), "w", encoding="utf-8") as f:
-                json.dump(agg, f, indent=2, ensure_ascii=False)
-            save_table(per_game, os.path.join(OUTDIR, f"{safe}_per_game.csv"))
+                # Accumulate for consolidated data sources
+                all_per_game.append(per_game.assign(**{"__Team__": team}))
+                flat = flatten(agg)
+                flat["team"] = team  # ensure plain team col exists
+                all_agg_rows.append(flat)
+                stats_by_team[team] = agg
+                written[team] = hashes[team]
 
-            # Accumulate for consolidated data sources
-            all_per_game.append(per_game.assign(**{"__Team__": team}))
-            flat = flatten(agg)
-            flat["team"] = team  # ensure plain team col exists
-            all_agg_rows.append(flat)
+                print(f"✓ {team}")
+            except Exception as e:
+                print(f"⚠️ Skipped {team}: {e}")
 
-            print(f"✓ {team}")
-        except Exception as e:
-            print(f"⚠️ Skipped {team}: {e}")
+    if pool is not None:
+        pool.shutdown()
+
+    for team in [] if dataset else removed:
+        safe = safe_name(team)
+        for name in (f"{safe}_stats.json", f"{safe}_per_game.csv"):
+            if os.path.exists(os.path.join(outdir, name)):
+                os.remove(os.path.join(outdir, name))
+        print(f"✗ Removed {team}")
 
     # -----------------------
     # Consolidated data sources
     # -----------------------
-    if all_per_game:
-        per_game_all = pd.concat(all_per_game, ignore_index=True)
-        # Move helper team col to front if not already present
-        cols = [c for c in per_game_all.columns if c != "__Team__"]
-        per_game_all = per_game_all[["__Team__"] + cols]
-        save_table(per_game_all, os.path.join(OUTDIR, "ALL_per_game.csv"))
-        print(f"Wrote consolidated per-game: {os.path.join(OUTDIR, 'ALL_per_game.csv')}")
+    with m.stage("consolidate"):
+        per_game_path = os.path.join(outdir, PER_GAME_ALL)
+        agg_path = os.path.join(outdir, AGG_ALL)
 
-    if all_agg_rows:
-        agg_all = pd.DataFrame(all_agg_rows)
-        # Order helpful columns first
-        preferred = [
-            "team", "games_played", "record.wins", "record.losses", "record.ties",
-            "points.for", "points.against", "points.diff",
-            "hammer.ends", "hammer.scoring_rate", "hammer.two_plus_rate", "hammer.blank_rate",
-            "no_hammer.ends", "no_hammer.steal_rate", "no_hammer.force_rate", "no_hammer.defense_leq_one_rate",
-        ]
-        cols = [c for c in preferred if c in agg_all.columns] + [c for c in agg_all.columns if c not in preferred]
-        agg_all = agg_all[cols]
-        save_table(agg_all, os.path.join(OUTDIR, "ALL_team_aggregate.csv"))
-        print(f"Wrote consolidated aggregates: {os.path.join(OUTDIR, 'ALL_team_aggregate.csv')}")
+        per_game_all = pd.DataFrame()
+        if all_per_game:
+            per_game_all = pd.concat(all_per_game, ignore_index=True)
+            # Move helper team col to front
+            per_game_all = per_game_all[["__Team__"] + [c for c in per_game_all.columns if c != "__Team__"]]
+
+        if dataset:
+            write_dataset_outputs(outdir, teams, per_game_all, stats_by_team, changed, removed, incremental, args.elo)
+        elif incremental:
+            # Splice recomputed teams into the existing consolidated files
+            drop = set(changed) | set(removed)
+            new_agg = agg_table(all_agg_rows) if all_agg_rows else pd.DataFrame()
+            ok = splice_consolidated(per_game_path, per_game_all, drop, teams)
+            ok = ok and splice_consolidated(agg_path, new_agg, drop, teams)
+            if not ok:
+                print("Consolidated file layout changed; falling back to a full rebuild")
+                args.incremental = False
+                return run(args, metrics)
+            print(f"Spliced {len(all_agg_rows)} team(s) into {per_game_path} and {agg_path}")
+        else:
+            if not per_game_all.empty:
+                save_table(per_game_all, per_game_path)
+                print(f"Wrote consolidated per-game: {per_game_path}")
+
+            if all_agg_rows:
+                save_table(agg_table(all_agg_rows), agg_path)
+                print(f"Wrote consolidated aggregates: {agg_path}")
 
+    save_manifest(outdir, args.input, season, written, args.infer_hammer, args.output_format, args.elo)
     print("Done.")
 
 
+def write_dataset_outputs(
+    outdir: str,
+    teams: List[str],
+    per_game_all: pd.DataFrame,
+    stats: Dict[str, Dict[str, Any]],
+    changed: List[str],
+    removed: List[str],
+    incremental: bool,
+    elo: bool = False,
+):
+    # --output-format dataset: per-game partitions plus the aggregate JSONL / Parquet files
+    table = per_game_table(per_game_all) if not per_game_all.empty else per_game_schema(elo).empty_table()
+    if incremental:
+        # Unchanged teams keep their partitions and their line in team_stats.jsonl
+        previous = read_team_stats(outdir)
+        merged: Dict[str, Dict[str, Any]] = {}
+        for team in teams:
+            if team in changed:
+                if team in stats:
+                    merged[team] = stats[team]
+            elif team in previous:
+                merged[team] = previous[team]
+        stats = merged
+        write_per_game_dataset(outdir, table, len(changed), replace_teams=changed, remove_teams=removed)
+        print(f"Replaced {len(changed)} and removed {len(removed)} team partition(s)")
+    else:
+        write_per_game_dataset(outdir, table, len(stats))
+    rows = [dict(flatten(agg), team=team) for team, agg in stats.items()]
+    write_team_stats(outdir, stats, agg_table(rows) if rows else pd.DataFrame())
+    print(f"Wrote per-game dataset and {len(stats)} team aggregate(s) to {outdir}")
+
+
+def append_csv(df: pd.DataFrame, path: str, first: bool):
+    # First write of a run truncates and writes the header; later chunks append rows
+    df.to_csv(path, mode="w" if first else "a", header=first, index=False)
+
+
+def run_streaming(args: argparse.Namespace, metrics: Optional[RunMetrics] = None):
+    """
+    Chunked variant of run(): per-game rows are appended to the per-team and
+    consolidated CSVs as each chunk is processed, and only the per-team
+    accumulators are kept in memory. Per-game rows stay in file order.
+    """
+    m = metrics or NO_METRICS
+    outdir, season = args.outdir, args.season
+    os.makedirs(outdir, exist_ok=True)
+    per_game_path = os.path.join(outdir, PER_GAME_ALL)
+    agg_path = os.path.join(outdir, AGG_ALL)
+
+    dataset = args.output_format == "dataset"
+
+    acc = TeamStatsAccumulator(season=season)
+    started: set = set()
+    n_rows = 0
+    chunks = iter_table_chunks(args.input, args.chunksize, season=season)
+    with PerGameStream(outdir) if dataset else contextlib.nullcontext() as stream:
+        while True:
+            # Stages are entered once per chunk; the metrics sum them
+            with m.stage("read_chunk"):
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            m.count(chunks=1)
+            ends = infer_hammer_ends(chunk, metrics=metrics) if args.infer_hammer else None
+            per_game = acc.update(chunk, ends=ends, metrics=metrics)
+            n_rows += len(chunk)
+            if per_game.empty:
+                continue
+            with m.stage("write_chunk"):
+                if dataset:
+                    stream.write(per_game)
+                    continue
+                append_csv(per_game, per_game_path, first=not started)
+                for team, g in per_game.groupby("__Team__", sort=False):
+                    team_path = os.path.join(outdir, f"{safe_name(team)}_per_game.csv")
+                    append_csv(g.drop(columns="__Team__"), team_path, first=team not in started)
+                    started.add(team)
+    print(f"Streamed {n_rows} rows in chunks of {args.chunksize}")
+
+    results = acc.results()
+    print(f"Found {len(results)} teams")
+    m.count(teams=len(results))
+    all_agg_rows: List[Dict[str, Any]] = []
+    with m.stage("write_teams"):
+        for team, agg in results.items():
+            if not dataset:
+                with open(os.path.join(outdir, f"{safe_name(team)}_stats.json"), "w", encoding="utf-8") as f:
+                    json.dump(agg, f, indent=2, ensure_ascii=False)
+            flat = flatten(agg)
+            flat["team"] = team  # ensure plain team col exists
+            all_agg_rows.append(flat)
+            print(f"✓ {team}")
+
+    if dataset:
+        with m.stage("consolidate"):
+            write_team_stats(outdir, results, agg_table(all_agg_rows) if all_agg_rows else pd.DataFrame())
+        print(f"Wrote per-game dataset and {len(results)} team aggregate(s) to {outdir}")
+        print("Done.")
+        return
+    if started:
+        print(f"Wrote consolidated per-game: {per_game_path}")
+    if all_agg_rows:
+        with m.stage("consolidate"):
+            save_table(agg_table(all_agg_rows), agg_path)
+        print(f"Wrote consolidated aggregates: {agg_path}")
+    print("Done.")
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    metrics = metrics_from_args(args, "run_all_teams", argv=argv)
+    if args.chunksize is not None:
+        run_streaming(args, metrics)
+    else:
+        run(args, metrics)
+    if metrics is not None:
+        metrics.finish(args.metrics_out, print_summary=args.profile)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,119 @@
+# Course catalog for golf rounds
+
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from golf_functions import typed_records
+
+MAX_HOLES = 18
+
+#########################################
+## Course catalog keyed by course/tees ##
+#########################################
+
+# Description: Holds par and yardage for every (course, tees) pair as two arrays of shape (courses, 18), so a round's
+# holes are joined to their par / yardage by indexing [course code, hole - 1] instead of merging on course names.
+# Codes are assigned in the order pairs are first registered and never change, so rounds can store them.
+# The catalog is saved as a Parquet file in the course-info layout (Course Name, Course Tees, Hole, Yardage, Par).
+
+class CourseCatalog:
+
+    def __init__(self, courses=None):
+        self.keys = []                        # (course, tees) for each code
+        self._codes = {}
+        self.par = np.full((0, MAX_HOLES), np.nan)
+        self.yardage = np.full((0, MAX_HOLES), np.nan)
+        if courses is not None:
+            self.add_courses(courses)
+
+    def add_courses(self, courses):
+        # Registers or updates every (course, tees) in a course-info frame (get_hole_info / ingest_scorecards 'course')
+        df = typed_records(courses, 'course')
+        df = df[df['Hole'].between(1, MAX_HOLES).fillna(False).to_numpy(dtype=bool)]
+        for (course, tees), g in df.groupby(['Course Name', 'Course Tees'], observed=True, sort=False):
+            key = (str(course), str(tees))
+            if key not in self._codes:
+                self._codes[key] = len(self.keys)
+                self.keys.append(key)
+                self.par = np.vstack([self.par, np.full(MAX_HOLES, np.nan)])
+                self.yardage = np.vstack([self.yardage, np.full(MAX_HOLES, np.nan)])
+            code, holes = self._codes[key], g['Hole'].to_numpy(dtype=int) - 1
+            self.par[code, holes] = g['Par'].to_numpy(dtype=float, na_value=np.nan)
+            self.yardage[code, holes] = g['Yardage'].to_numpy(dtype=float, na_value=np.nan)
+        return self
+
+    def code(self, course, tees):
+        return self._codes.get((str(course).strip(), str(tees).strip()), -1)
+
+    def codes(self, course, tees):
+        # Vectorized code lookup (-1 where the pair is not registered). Only the category pairs are looked up by name;
+        # each row is then one index into that small table by its two category codes.
+        course, tees = pd.Categorical(course), pd.Categorical(tees)
+        table = np.full((len(course.categories) + 1, len(tees.categories) + 1), -1, dtype=np.int32)
+        for i, c in enumerate(course.categories):
+            for j, t in enumerate(tees.categories):
+                table[i, j] = self.code(c, t)
+        # Missing values have category code -1, which lands on the padding row / column
+        return table[course.codes, tees.codes]
+
+    def hole_info(self, codes, holes):
+        # (par, yardage) float arrays for each (code, hole); NaN for unknown courses or holes
+        codes = np.asarray(codes, dtype=float)
+        holes = pd.to_numeric(pd.Series(holes), errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        ok = (codes >= 0) & (holes >= 1) & (holes <= MAX_HOLES)
+        par, yardage = np.full(len(codes), np.nan), np.full(len(codes), np.nan)
+        c, h = codes[ok].astype(int), holes[ok].astype(int) - 1
+        par[ok], yardage[ok] = self.par[c, h], self.yardage[c, h]
+        return par, yardage
+
+    def to_frame(self):
+        rows = [
+            {'Course Name': course, 'Course Tees': tees, 'Hole': h + 1, 'Yardage': self.yardage[code, h], 'Par': self.par[code, h]}
+            for code, (course, tees) in enumerate(self.keys) for h in range(MAX_HOLES)
+            if not (np.isnan(self.par[code, h]) and np.isnan(self.yardage[code, h]))
+        ]
+        return typed_records(rows, 'course')
+
+    def save(self, path):
+        # Rows are written in code order, so loading the file gives every pair its old code back
+        df = self.to_frame().astype({'Course Name': 'string', 'Course Tees': 'string'})
+        df.to_parquet(path + '.tmp', index=False)
+        os.replace(path + '.tmp', path)
+
+    @classmethod
+    def from_file(cls, path):
+        return cls(pd.read_parquet(path)) if os.path.exists(path) else cls()
+
+## Example on how to call and use the function:
+# catalog = CourseCatalog(get_hole_info())
+# catalog.hole_info(catalog.codes(holes['Course'], holes['Tee']), holes['Hole'])
+
+##################################
+## Function to use the registry ##
+##################################
+
+# Description: load_catalog() reads the registry once and keeps it in memory (LRU cache keyed on the file's
+# modification time, so a registry updated by register_courses() is read again). Treat the loaded catalog as
+# read-only; register_courses() loads its own copy, adds the courses and saves.
+
+@lru_cache(maxsize=8)
+def _cached_catalog(path, mtime_ns):
+    return CourseCatalog.from_file(path)
+
+def load_catalog(path):
+    path = os.path.abspath(path)
+    mtime = os.stat(path).st_mtime_ns if os.path.exists(path) else None
+    return _cached_catalog(path, mtime)
+
+def register_courses(path, courses):
+    catalog = CourseCatalog.from_file(path).add_courses(courses)
+    catalog.save(path)
+    return catalog
+
+## Example on how to call and use the function:
+# register_courses('golf_data/courses.parquet', get_hole_info())
+# catalog = load_catalog('golf_data/courses.parquet')
+# append_to_round_store('golf_data', detailed_round_trends(), 'detail', catalog=catalog)
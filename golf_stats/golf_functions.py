@@ -1,5 +1,174 @@
 # Function collection for golf statistics
 
+import datetime
+import glob
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+#####################################
+## Column layouts and typed frames ##
+#####################################
+
+# Description: Each kind of record has a fixed column layout so rounds entered by prompt, CSV or JSON all line up.
+# Integer columns use pandas' nullable Int64 (a blank or "N/A" becomes <NA>), dates are datetime64, and the
+# repeated text columns are categoricals.
+
+SHOT_RESULTS = ['Right', 'Hit', 'Left', 'Short', 'Long', 'N/A']
+
+RECORD_SCHEMAS = {
+    'course': {
+        'Course Name': 'category', 'Course Tees': 'category', 'Hole': 'Int64', 'Yardage': 'Int64', 'Par': 'Int64',
+    },
+    'summary': {
+        'Date': 'date', 'Course': 'category', 'Event': 'category', 'Tee': 'category',
+        'Holes Played': 'category', 'Course Handicap': 'Int64', 'Score': 'Int64', 'Course Code': 'Int64',
+    },
+    'detail': {
+        'Date': 'date', 'Course': 'category', 'Event': 'category', 'Hole': 'Int64', 'Tee': 'category',
+        'Fairway': 'shot', 'Green': 'shot', 'Putts': 'Int64', 'Score': 'Int64', 'Course Code': 'Int64',
+    },
+}
+
+# Older detailed rounds were saved with the course-info column names
+COLUMN_ALIASES = {'Course Name': 'Course', 'Course Tees': 'Tee'}
+
+# Filled with <NA> when absent: the (course, tees) code from a course catalog (see golf_courses.py)
+OPTIONAL_COLUMNS = ['Course Code']
+
+def _typed_column(values, kind):
+    if kind == 'Int64':
+        # Whole numbers only; anything else (blank, "N/A", 4.5) becomes <NA>
+        num = pd.to_numeric(values, errors='coerce')
+        return num.where(num % 1 == 0).astype('Int64')
+    if kind == 'date':
+        return pd.to_datetime(values, errors='coerce', format='mixed').astype('datetime64[ns]')
+    if kind == 'shot':
+        text = values.astype('string').str.strip().str.title().replace({'N/a': 'N/A', 'Na': 'N/A'})
+        return pd.Categorical(text, categories=SHOT_RESULTS)
+    text = values.astype('string').str.strip()
+    return text.astype('category')
+
+def typed_records(records, kind):
+
+    # Description: Turns a DataFrame or list of dicts into the typed column layout for `kind` ('course', 'summary' or 'detail')
+
+    if kind not in RECORD_SCHEMAS:
+        raise ValueError(f"Unknown record kind '{kind}'; choose from {sorted(RECORD_SCHEMAS)}")
+    schema = RECORD_SCHEMAS[kind]
+    df = records if isinstance(records, pd.DataFrame) else pd.DataFrame.from_records(list(records))
+    if df.empty and len(df.columns) == 0:
+        df = pd.DataFrame(columns=list(schema))
+    if kind != 'course':
+        df = df.rename(columns={k: v for k, v in COLUMN_ALIASES.items() if k in df.columns and v not in df.columns})
+    df = df.assign(**{c: pd.NA for c in OPTIONAL_COLUMNS if c in schema and c not in df.columns})
+    missing = [c for c in schema if c not in df.columns]
+    if missing:
+        raise ValueError(f"{kind} records are missing columns: {missing}")
+    return pd.DataFrame({c: _typed_column(df[c].reset_index(drop=True), t) for c, t in schema.items()})
+
+## Example on how to call and use the function:
+# rounds = typed_records([{'Date': '2024-06-01', 'Course': 'Wellshire', 'Event': 'League', 'Tee': 'White',
+#                          'Holes Played': 'Front 9', 'Course Handicap': 12, 'Score': 44}], 'summary')
+
+###########################################
+## Function to ingest scorecards in bulk ##
+###########################################
+
+# Description: Reads many scorecards at once from CSV or JSON files (or records already in memory) into typed frames.
+# JSON may be a list of records or JSON Lines (one record per line); CSV needs the column headers of the layout.
+
+def read_records(source):
+    if isinstance(source, (pd.DataFrame, list, tuple)):
+        return source
+    ext = os.path.splitext(str(source))[1].lower()
+    if ext == '.csv':
+        return pd.read_csv(source, dtype=str, keep_default_na=False, na_values=[''])
+    if ext in ('.json', '.jsonl'):
+        with open(source, 'r', encoding='utf-8') as f:
+            text = f.read()
+        if ext == '.jsonl' or not text.lstrip().startswith('['):
+            return [json.loads(line) for line in text.splitlines() if line.strip()]
+        return json.loads(text)
+    raise ValueError(f"Unsupported scorecard file type: {source} (use .csv, .json or .jsonl)")
+
+def ingest_scorecards(sources, kind):
+    if isinstance(sources, (str, os.PathLike)):
+        sources = sorted(glob.glob(str(sources))) or [sources]
+    frames = [typed_records(read_records(s), kind) for s in sources]
+    if not frames:
+        return typed_records([], kind)
+    return pd.concat(_align_categories(frames), ignore_index=True)
+
+def _align_categories(frames):
+    # pd.concat only keeps a categorical dtype when every frame has identical categories
+    out = [f.copy() for f in frames]
+    for c in out[0].columns:
+        if isinstance(out[0][c].dtype, pd.CategoricalDtype):
+            cats = pd.api.types.union_categoricals([f[c] for f in out]).categories
+            for f in out:
+                f[c] = f[c].cat.set_categories(cats)
+    return out
+
+## Example on how to call and use the function:
+# holes = ingest_scorecards('scorecards/2023_*.csv', 'detail')
+# rounds = ingest_scorecards(['rounds_2022.json', 'rounds_2023.jsonl'], 'summary')
+
+##########################################################
+## Function to append rounds to the Parquet round store ##
+##########################################################
+
+# Description: The round store is a folder with one sub-folder per record kind. Each append writes its rows as a
+# new Parquet part file (written under a temporary name, then renamed), so existing data is never rewritten.
+# Loading reads every part and restores the typed layout. compact_round_store() merges many small parts into one.
+# Pass a CourseCatalog (golf_courses.py) as `catalog` to store the course codes with the rounds.
+
+def append_to_round_store(store_dir, records, kind, catalog=None):
+    df = records if _is_typed(records, kind) else typed_records(records, kind)
+    if catalog is not None and kind != 'course':
+        # Store each round's (course, tees) code so later joins to par / yardage are array lookups
+        codes = catalog.codes(df['Course'], df['Tee'])
+        df = df.assign(**{'Course Code': pd.array(np.where(codes >= 0, codes, None), dtype='Int64')})
+    if df.empty:
+        return None
+    part_dir = os.path.join(store_dir, kind)
+    os.makedirs(part_dir, exist_ok=True)
+    stamp = datetime.datetime.now().strftime('%Y%m%dT%H%M%S%f')
+    path = os.path.join(part_dir, f'part-{stamp}-{os.getpid()}.parquet')
+    # Categories are stored as plain (dictionary-encoded) strings so parts with different courses still combine
+    df = df.astype({c: 'string' for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)})
+    df.to_parquet(path + '.tmp', index=False)
+    os.replace(path + '.tmp', path)
+    return path
+
+def _is_typed(records, kind):
+    return isinstance(records, pd.DataFrame) and list(records.columns) == list(RECORD_SCHEMAS[kind])
+
+def round_store_parts(store_dir, kind):
+    return sorted(glob.glob(os.path.join(store_dir, kind, 'part-*.parquet')))
+
+def load_round_store(store_dir, kind):
+    parts = round_store_parts(store_dir, kind)
+    if not parts:
+        return typed_records([], kind)
+    return typed_records(pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True), kind)
+
+def compact_round_store(store_dir, kind):
+    parts = round_store_parts(store_dir, kind)
+    if len(parts) < 2:
+        return
+    # Merged part is written (and renamed into place) before the old parts are removed
+    merged = append_to_round_store(store_dir, load_round_store(store_dir, kind), kind)
+    for p in parts:
+        if p != merged:
+            os.remove(p)
+
+## Example on how to call and use the function:
+# append_to_round_store('golf_data', ingest_scorecards('scorecards/2024_*.csv', 'detail'), 'detail')
+# holes = load_round_store('golf_data', 'detail')
+
 ###########################################
 ## Function to enter golf course details ##
 ###########################################
@@ -7,31 +176,25 @@
 # Description: Function will prompt user to enter details by hole from scorecard for either 9 or 18 holes
 
 def get_hole_info():
-    
-    tmp = pd.DataFrame(columns=['Course Name','Course Tees','Hole','Yardage','Par'])
+
+    records = []
     course_name = input("Enter the Course Name: ")
     course_tees = input("Enter the Tee Name: ")
     num_holes = input("Enter the number of holes (18 or 9): ")
-    
-    if num_holes == "18":
-        for hole in range(1, 19):
-            ydg = input(f"Enter yardage for hole {hole}: ")
-            par = input(f"Enter par for hole {hole}: ")
-            new_row = pd.DataFrame({'Course Name':[course_name],'Course Tees':[course_tees],'Hole':[hole],'Yardage':[ydg],'Par':[par]})
-            tmp = pd.concat([tmp, new_row], ignore_index=True)
-    elif num_holes == "9":
-        for hole in range(1, 10):
+
+    if num_holes in ("18", "9"):
+        for hole in range(1, int(num_holes) + 1):
             ydg = input(f"Enter yardage for hole {hole}: ")
             par = input(f"Enter par for hole {hole}: ")
-            new_row = pd.DataFrame({'Course Name':[course_name],'Course Tees':[course_tees],'Hole':[hole],'Yardage':[ydg],'Par':[par]})
-            tmp = pd.concat([tmp, new_row], ignore_index=True)
+            records.append({'Course Name':course_name,'Course Tees':course_tees,'Hole':hole,'Yardage':ydg,'Par':par})
     else:
         print("Invalid input. Please choose either '18' or '9' holes.")
-    return tmp
+    return typed_records(records, 'course')
 
 ## Example on how to call and use the function:
 # course_info = get_hole_info()
-# print(course_info) - view the course details - we need to write it then to the base dataset 
+# print(course_info) - view the course details
+# append_to_round_store('golf_data', course_info, 'course') - write it to the base dataset
 
 #############################################
 ## Function to enter summary round details ##
@@ -39,26 +202,27 @@ def get_hole_info():
 
 # Description: Function will prompt the user to enter the basic summary details from their round to include course, holes played, tees played, and score
 
-def create_summary_round():
-
-    tmp = pd.DataFrame(columns=['Date','Course','Event','Tee','Holes Played','Course Handicap','Score'])
+def _prompt_date():
     date_entry = input('Enter a date in YYYY-MM-DD format: ')
     year, month, day = map(int, date_entry.split('-'))
-    date1 = datetime.date(year, month, day)
+    return datetime.date(year, month, day)
+
+def create_summary_round():
 
+    date1 = _prompt_date()
     course_name = input("Enter the Course Name: ")
     course_tees = input("Enter the Tee Name: ")
     occasion = input("What is the Event/Occasion for Round: ")
     num_holes = input("Enter the number of holes (18, Front 9,  or Back 9): ")
     course_handicap = input("Enter the your Course Handicap: ")
     score = input("Enter the your final score (not adjusted for course handicap): ")
-    new_row = pd.DataFrame({'Date':[date1],'Course':[course_name],'Event':[occasion],'Tee':[course_tees],'Holes Played':[num_holes],'Course Handicap':[course_handicap],'Score':[score]})
-    tmp = pd.concat([tmp,new_row], ignore_index=True)
-    return tmp
+    record = {'Date':date1,'Course':course_name,'Event':occasion,'Tee':course_tees,'Holes Played':num_holes,'Course Handicap':course_handicap,'Score':score}
+    return typed_records([record], 'summary')
 
 ## Example on how to call an use the function:
 # round_summary = create_summary_round()
-# print(round_summary) - view round details - need to write it then to the base dataset
+# print(round_summary) - view round details
+# append_to_round_store('golf_data', round_summary, 'summary') - write it to the base dataset
 
 ######################################
 ## Function to enter detailed round ##
@@ -66,46 +230,29 @@ def create_summary_round():
 
 # Description: Function will prompt the user to enter a detailed round summary to include GIR, FIR, and putting trends
 
+HOLE_RANGES = {"18": range(1, 19), "Front 9": range(1, 10), "Back 9": range(10, 19)}
+
 def detailed_round_trends():
-    
-    tmp = pd.DataFrame(columns=['Date','Course','Event','Hole','Tee','Fairway','Green','Putts',	'Score'])
-    date_entry = input('Enter a date in YYYY-MM-DD format: ')
-    year, month, day = map(int, date_entry.split('-'))
-    date1 = datetime.date(year, month, day)
-    
+
+    records = []
+    date1 = _prompt_date()
     course_name = input("Enter the Course Name: ")
     course_tees = input("Enter the Tee Name: ")
     num_holes = input("Enter the number of holes (18, Front 9,  or Back 9 ")
     occasion = input("What is the Event/Occasion for Round: ")
-    
-    if num_holes == "18":
-        for hole in range(1, 19):
-            fir = input(f"Enter Fairway in Regulation for hole {hole}: Right, Hit, Left, Short, Long, N/A  ")
-            gir = input(f"Enter Green in Regulation for hole {hole}: Right, Hit, Left, Short, Long, N/A  ")
-            putts = input(f"Enter number of putts for hole {hole}:  ")
-            score = input(f"Enter score for hole {hole}:  ")
-            new_row = pd.DataFrame({'Date':[date1],'Course Name':[course_name],'Event':[occasion],'Hole':[hole],'Course Tees':[course_tees],'Fairway':[fir],'Green':[gir],'Putts':[putts],'Score':[score]})
-            tmp = pd.concat([tmp, new_row], ignore_index=True)
-    elif num_holes == "Front 9":
-        for hole in range(1, 10):
-            fir = input(f"Enter Fairway in Regulation for hole {hole}: Right, Hit, Left, Short, Long, N/A  ")
-            gir = input(f"Enter Green in Regulation for hole {hole}: Right, Hit, Left, Short, Long, N/A  ")
-            putts = input(f"Enter number of putts for hole {hole}:  ")
-            score = input(f"Enter score for hole {hole}:  ")
-            new_row = pd.DataFrame({'Date':[date1],'Course Name':[course_name],'Event':[occasion],'Hole':[hole],'Course Tees':[course_tees],'Fairway':[fir],'Green':[gir],'Putts':[putts],'Score':[score]})
-            tmp = pd.concat([tmp, new_row], ignore_index=True)
-    elif num_holes == "Back 9":
-        for hole in range(10, 19):
+
+    if num_holes in HOLE_RANGES:
+        for hole in HOLE_RANGES[num_holes]:
             fir = input(f"Enter Fairway in Regulation for hole {hole}: Right, Hit, Left, Short, Long, N/A  ")
             gir = input(f"Enter Green in Regulation for hole {hole}: Right, Hit, Left, Short, Long, N/A  ")
             putts = input(f"Enter number of putts for hole {hole}:  ")
             score = input(f"Enter score for hole {hole}:  ")
-            new_row = pd.DataFrame({'Date':[date1],'Course Name':[course_name],'Event':[occasion],'Hole':[hole],'Course Tees':[course_tees],'Fairway':[fir],'Green':[gir],'Putts':[putts],'Score':[score]})
-            tmp = pd.concat([tmp, new_row], ignore_index=True)
+            records.append({'Date':date1,'Course':course_name,'Event':occasion,'Hole':hole,'Tee':course_tees,'Fairway':fir,'Green':gir,'Putts':putts,'Score':score})
     else:
         print("Invalid input. Please choose either '18' or '9' holes.")
-    return tmp
+    return typed_records(records, 'detail')
 
 ## Example on how to call an use the function:
 # detailed_round = detailed_round_trends()
-# print(detailed_round) - view round details - need to write it then to the base dataset
\ No newline at end of file
+# print(detailed_round) - view round details
+# append_to_round_store('golf_data', detailed_round, 'detail') - write it to the base dataset
@@ -0,0 +1,197 @@
+# Function collection for golf round statistics
+
+import numpy as np
+import pandas as pd
+
+from golf_courses import CourseCatalog
+from golf_functions import SHOT_RESULTS
+
+##############################
+## Strokes-gained baselines ##
+##############################
+
+# Description: Expected strokes to hole out, used as the strokes-gained baseline. Hole-by-hole scorecards have no shot
+# distances, so each hole is split into fixed stages - tee shot (par 4/5), approach, around the green (missed greens
+# only) and putting - and the baseline at each stage boundary comes from a lookup table:
+#   - expected strokes from the tee by hole yardage (PGA Tour averages; par averages when yardage is unknown)
+#   - how much the tee shot's fairway result changes the expected strokes left
+#   - expected putts after hitting / missing the green, and expected strokes from just off the green
+# The stage values always add up to strokes gained total (tee baseline minus score).
+
+TEE_BASELINE_YARDS = [100, 120, 140, 160, 180, 200, 220, 240, 260, 280, 300, 320, 340, 360, 380, 400,
+                      420, 440, 460, 480, 500, 520, 540, 560, 580, 600]
+TEE_BASELINE_STROKES = [2.92, 2.99, 2.97, 2.99, 3.05, 3.12, 3.17, 3.25, 3.45, 3.65, 3.71, 3.79, 3.86, 3.92, 3.96, 3.99,
+                        4.02, 4.08, 4.17, 4.28, 4.41, 4.54, 4.65, 4.74, 4.79, 4.82]
+PAR_BASELINE = {3: 3.05, 4: 4.0, 5: 4.7}
+FAIRWAY_BASELINE = {'Hit': -0.08, 'Left': 0.12, 'Right': 0.12, 'Short': 0.25, 'Long': 0.10, 'N/A': 0.0}
+PUTTS_AFTER_GIR = 1.85
+PUTTS_AFTER_MISSED_GREEN = 1.45
+AROUND_GREEN_BASELINE = 2.6
+MAX_BASELINE_YARDS = 800
+
+def baseline_lookup():
+    # Expected strokes from the tee for every whole yardage, and the tee-shot adjustment by Fairway category code
+    yards = np.arange(MAX_BASELINE_YARDS + 1)
+    return {
+        'tee': np.interp(yards, TEE_BASELINE_YARDS, TEE_BASELINE_STROKES),
+        # Last slot is for a missing result (category code -1)
+        'fairway': np.array([FAIRWAY_BASELINE[r] for r in SHOT_RESULTS] + [0.0]),
+    }
+
+BASELINE_LOOKUP = baseline_lookup()
+
+##################################
+## Function to score every hole ##
+##################################
+
+# Description: Adds per-hole stat columns to a hole-level round frame (detailed_round_trends / load_round_store 'detail').
+# Par and Yardage come from the frame itself or from the course catalog (a CourseCatalog, or a course-info frame such as
+# get_hole_info / load_round_store 'course' output): the holes' course codes index straight into its par / yardage arrays.
+# GIR is reaching the green in par minus two strokes (score minus putts) when par and putts are known, else Green == 'Hit'.
+
+def _num(values):
+    return pd.to_numeric(values, errors='coerce').astype(float).to_numpy()
+
+def with_course_info(holes, courses):
+    if courses is None or ('Par' in holes.columns and 'Yardage' in holes.columns):
+        return holes
+    catalog = courses if isinstance(courses, CourseCatalog) else CourseCatalog(courses)
+    # Codes stored with the rounds are used as-is (they are stable for a registry); the rest are looked up
+    codes = catalog.codes(holes['Course'], holes['Tee'])
+    if isinstance(courses, CourseCatalog) and 'Course Code' in holes.columns:
+        stored = pd.to_numeric(holes['Course Code'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        codes = np.where(np.isnan(stored), codes, np.nan_to_num(stored)).astype(np.int32)
+    par, yardage = catalog.hole_info(codes, holes['Hole'])
+    return holes.assign(Par=par, Yardage=yardage)
+
+def hole_stats(holes, courses=None, baseline=None):
+    lookup = baseline or BASELINE_LOOKUP
+    holes = with_course_info(holes, courses)
+    n = len(holes)
+    par = _num(holes['Par']) if 'Par' in holes.columns else np.full(n, np.nan)
+    yards = _num(holes['Yardage']) if 'Yardage' in holes.columns else np.full(n, np.nan)
+    score, putts = _num(holes['Score']), _num(holes['Putts'])
+
+    fairway = pd.Categorical(holes['Fairway'], categories=SHOT_RESULTS)
+    green = pd.Categorical(holes['Green'], categories=SHOT_RESULTS)
+
+    # Fairways only count on par 4/5 (or unknown par) with a recorded result
+    fw_known = (fairway.codes >= 0) & (np.asarray(fairway != 'N/A')) & (par != 3)
+    fairway_hit = np.where(fw_known, np.asarray(fairway == 'Hit'), np.nan)
+
+    to_green = score - putts
+    green_known = (green.codes >= 0) & np.asarray(green != 'N/A')
+    gir = np.where(~np.isnan(to_green + par), to_green <= par - 2,
+                   np.where(green_known, np.asarray(green == 'Hit'), np.nan))
+    scramble = np.where(gir == 0, score <= par, np.nan)
+    scramble[np.isnan(score + par)] = np.nan
+
+    # Strokes gained by stage (see the baseline notes above)
+    e_tee = np.where(
+        np.isnan(yards),
+        pd.Series(par).map(PAR_BASELINE).to_numpy(dtype=float),
+        lookup['tee'][np.clip(np.nan_to_num(yards), 0, MAX_BASELINE_YARDS).astype(int)],
+    )
+    tee = (par >= 4).astype(float)
+    e_after_tee = e_tee - tee * (1 - lookup['fairway'][fairway.codes])
+    hit = gir == 1
+    approach = np.where(hit, to_green - tee, np.clip(np.minimum(par - 2 - tee, to_green - tee - 1), 0, None))
+    around = to_green - tee - approach
+
+    sg_ott = tee * (e_tee - 1 - e_after_tee)
+    sg_app = e_after_tee - approach - np.where(hit, PUTTS_AFTER_GIR, AROUND_GREEN_BASELINE)
+    sg_arg = np.where(hit, 0.0, AROUND_GREEN_BASELINE - around - PUTTS_AFTER_MISSED_GREEN)
+    sg_putt = np.where(hit, PUTTS_AFTER_GIR, PUTTS_AFTER_MISSED_GREEN) - putts
+    staged = ~np.isnan(gir) & ~np.isnan(to_green + par)
+
+    return holes.assign(**{
+        'Par': par, 'Yardage': yards,
+        'Fairway Hit': fairway_hit, 'GIR': gir, 'Scramble': scramble,
+        'Score to Par': score - par,
+        'SG Off the Tee': np.where(staged, sg_ott, np.nan),
+        'SG Approach': np.where(staged, sg_app, np.nan),
+        'SG Around the Green': np.where(staged, sg_arg, np.nan),
+        'SG Putting': np.where(staged, sg_putt, np.nan),
+        'SG Total': e_tee - score,
+    })
+
+## Example on how to call and use the function:
+# holes = hole_stats(load_round_store('golf_data', 'detail'), courses=load_catalog('golf_data/courses.parquet'))
+
+##################################################
+## Function to summarize rounds by any grouping ##
+##################################################
+
+# Description: The EDA metric list per round, course, tee or year (or any combination, e.g. by=['course', 'year']).
+# Holes are summed into rounds first (one round = Date, Course, Tee and Event), then rounds are averaged per group,
+# so Avg Score, Avg Putts and the strokes-gained columns are per round. Percentages are over attempts.
+
+ROUND_KEYS = ['Date', 'Course', 'Tee', 'Event']
+GROUPINGS = {'round': ROUND_KEYS, 'course': ['Course'], 'tee': ['Tee'], 'year': ['Year']}
+SG_COLUMNS = ['SG Off the Tee', 'SG Approach', 'SG Around the Green', 'SG Putting', 'SG Total']
+
+def _group_keys(by):
+    keys = [] if by is None else [k for g in ([by] if isinstance(by, str) else by) for k in GROUPINGS[g]]
+    return list(dict.fromkeys(keys))
+
+def round_stats(holes, by='round', courses=None):
+    h = hole_stats(holes, courses)
+    keys = _group_keys(by)
+    h = h.assign(
+        Year=pd.to_datetime(h['Date']).dt.year,
+        Score=_num(h['Score']), Putts=_num(h['Putts']),
+        **{'Fairway Attempts': ~np.isnan(h['Fairway Hit']), 'GIR Attempts': ~np.isnan(h['GIR']),
+           'Scramble Attempts': ~np.isnan(h['Scramble'])},
+    )
+    sums = ['Score', 'Putts', 'Score to Par', 'Fairway Hit', 'Fairway Attempts', 'GIR', 'GIR Attempts',
+            'Scramble', 'Scramble Attempts'] + SG_COLUMNS
+    round_cols = list(dict.fromkeys(ROUND_KEYS + [k for k in keys if k not in ROUND_KEYS]))
+
+    # One groupby pass down to rounds, then one over rounds to the requested groups
+    rounds = h.groupby(round_cols, observed=True, dropna=False, sort=False)[sums].sum(min_count=1)
+    rounds['Holes'] = h.groupby(round_cols, observed=True, dropna=False, sort=False).size()
+    rounds = rounds.reset_index()
+    groups = rounds.groupby(keys, observed=True, dropna=False) if keys else rounds.groupby(np.zeros(len(rounds)))
+    total = groups[sums + ['Holes']].sum(min_count=1)
+    mean = groups[['Score', 'Putts', 'Score to Par'] + SG_COLUMNS].mean()
+
+    out = pd.DataFrame({
+        'Rounds': groups.size(),
+        'Holes': total['Holes'],
+        'Fairway %': total['Fairway Hit'] / total['Fairway Attempts'].replace(0, np.nan),
+        'GIR %': total['GIR'] / total['GIR Attempts'].replace(0, np.nan),
+        'Avg Putts': mean['Putts'],
+        'Putts per Hole': total['Putts'] / total['Holes'],
+        'Scrambling %': total['Scramble'] / total['Scramble Attempts'].replace(0, np.nan),
+        'Avg Score': mean['Score'],
+        'Avg Score to Par': mean['Score to Par'],
+        **{c: mean[c] for c in SG_COLUMNS},
+    })
+    return out.reset_index(drop=not keys)
+
+## Example on how to call and use the function:
+# holes = load_round_store('golf_data', 'detail')
+# courses = load_catalog('golf_data/courses.parquet')
+# by_year = round_stats(holes, by='year', courses=courses)
+# by_course_tee = round_stats(holes, by=['course', 'tee'], courses=courses)
+
+############################################
+## Function to split scoring by par 3/4/5 ##
+############################################
+
+# Description: Average score and score to par on par 3s, 4s and 5s for each group (same `by` values as round_stats),
+# one row per group with a column pair per par. Holes with no par in the course catalog are left out.
+
+def par_type_stats(holes, by='year', courses=None):
+    h = hole_stats(holes, courses)
+    keys = _group_keys(by)
+    h = h.assign(Year=pd.to_datetime(h['Date']).dt.year, Score=_num(h['Score']), All='All')
+    h = h[np.isin(h['Par'], [3, 4, 5])]
+    grouped = h.groupby((keys or ['All']) + ['Par'], observed=True, dropna=False)
+    out = grouped[['Score', 'Score to Par']].mean().assign(Holes=grouped.size()).unstack('Par')
+    out.columns = [f'Par {int(p)} {"Avg " + c if c != "Holes" else c}' for c, p in out.columns]
+    order = [f'Par {p} {c}' for p in (3, 4, 5) for c in ('Holes', 'Avg Score', 'Avg Score to Par')]
+    return out.reindex(columns=order).reset_index(drop=not keys)
+
+## Example on how to call and use the function:
+# by_year = par_type_stats(load_round_store('golf_data', 'detail'), by='year', courses=load_catalog('golf_data/courses.parquet'))
@@ -0,0 +1,331 @@
+"""
+Titanic Feature Pipeline
+========================
+
+The cleaning steps of titanic_eda.ipynb and the features of
+titanic_feature_engineering.ipynb as one fit / transform object, producing the
+columns titanic_model_building.ipynb reads from df_full_featured.csv.
+
+fit() learns everything that depends on the data:
+  - fill values: Embarked mode; Fare mean per (Embarked, Pclass, has cabin); Age
+    median per (Pclass, Title)
+  - the cabin-deck KNN (k = 3 on standardized Pclass and Fare) that assigns a deck
+    to passengers without a cabin
+  - passengers per ticket (is_group, fare_divider, New Fare)
+  - the category vocabularies for the one-hot columns (Sex, Title, deck, Embarked)
+
+transform() is vectorized throughout. Titles and decks come from str.extract / str[0],
+tickets are counted once with value_counts and mapped, and each set of dummies is
+one comparison against the fixed vocabulary, so transformed chunks always get the
+same columns. The deck KNN finds the true k nearest neighbours without a distance to
+every known passenger: each Pclass's known fares are kept sorted, so a passenger's
+candidates come from a binary search per class. It matches the notebook's
+KNeighborsClassifier up to ties: when several passengers are as far as the k-th
+neighbour, the one in the lower Pclass, then with the lower fare, then in the earlier
+row is taken (sklearn's tree search may pick another), and a tied vote goes to the
+alphabetically first deck.
+
+A fitted pipeline is saved as a folder (meta.json plus .npy arrays, which can be
+memory-mapped). fit_cached() reuses a saved fit when the input data is unchanged.
+
+Usage examples:
+  python titanic_features.py data/train.csv data/test.csv --out df_full_featured.csv
+  python titanic_features.py data/train.csv data/test.csv --out df_full_featured.csv --cache .titanic_cache
+"""
+
+#########################################
+# Importing Base Packages for Scripting #
+#########################################
+
+# Standard Python Base Packages
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from typing import Dict, List, Optional
+
+# Third-Party Packages to be Installed via pip
+import numpy as np
+import pandas as pd
+
+PIPELINE_VERSION = 1
+
+UPPER_CLASS_TITLES = ['Rev', 'Dr', 'Col', 'Major', 'Sir', 'Mme', 'Capt', 'Dona', 'the Countess', 'Don', 'Jonkheer', 'Lady']
+MISS_TITLES = ['Ms', 'Mlle', 'Miss']
+NO_CABIN = 'X'
+KNN_NEIGHBORS = 3
+AGE_BINS = [0, 10, 20, 30, 40, 50, 60, 70, 80]
+MINOR_AGE = 14
+
+# Columns used by titanic_model_building.ipynb
+MODEL_FEATURES = [
+    'female', 'male', 'Fare', 'New Fare', 'Pclass', 'is_minor', 'is_group', 'Total Family', 'Upper', 'Miss', 'Mrs',
+    'fare_divider', 'Embarked_S', 'Embarked_Q', 'Embarked_C', 'cabin_B', 'cabin_C', 'cabin_D', 'cabin_G', 'cabin_F',
+]
+
+
+###########
+# Helpers #
+###########
+
+def titles(names: pd.Series) -> pd.Series:
+    # "Surname, Title. Given names" -> Title, with the rare titles grouped as in the EDA notebook
+    raw = names.astype('string').str.extract(r',\s*([^.]*)\.', expand=False).str.strip()
+    out = raw.where(~raw.isin(UPPER_CLASS_TITLES), 'Upper')
+    return out.where(~out.isin(MISS_TITLES), 'Miss')
+
+def decks(cabins: pd.Series) -> pd.Series:
+    # First letter of the cabin; X for no cabin
+    return cabins.astype('string').fillna(NO_CABIN).str[0].fillna(NO_CABIN)
+
+def one_hot(values: pd.Series, vocabulary: List[str], prefix: str = '') -> pd.DataFrame:
+    # One column per vocabulary entry (values outside it get all zeros), built in one comparison
+    codes = pd.Categorical(values, categories=vocabulary).codes
+    matrix = (codes[:, None] == np.arange(len(vocabulary))).astype(np.int8)
+    return pd.DataFrame(matrix, columns=[f'{prefix}{v}' for v in vocabulary], index=values.index)
+
+def _group_map(keys: pd.DataFrame, values: pd.Series, how: str) -> Dict[str, object]:
+    stats = values.groupby([keys[c] for c in keys.columns], dropna=True).agg(how).dropna()
+    return {json.dumps([_plain(k) for k in (i if isinstance(i, tuple) else (i,))]): float(v) for i, v in stats.items()}
+
+def _lookup(keys: pd.DataFrame, table: Dict[str, object]) -> pd.Series:
+    # Per-row value from a _group_map table (NaN for groups not seen at fit time); each distinct group is encoded once
+    ids, uniques = pd.MultiIndex.from_frame(keys).factorize()
+    values = np.array([table.get(json.dumps([_plain(v) for v in u]), np.nan) for u in uniques] + [np.nan], dtype=float)
+    return pd.Series(values[ids], index=keys.index)
+
+def _plain(v):
+    # JSON-able group key part (numpy scalars -> Python, NaN -> None)
+    if v is None or (isinstance(v, float) and np.isnan(v)) or v is pd.NA:
+        return None
+    return v.item() if isinstance(v, np.generic) else v
+
+
+####################
+# Feature pipeline #
+####################
+
+class TitanicFeatures:
+    """
+    Fit on the Kaggle columns (train and test together, as the notebooks do), then
+    transform any frame with those columns into the featured layout.
+    """
+
+    def __init__(self):
+        self.meta: Dict[str, object] = {}
+        self.arrays: Dict[str, np.ndarray] = {}
+
+    # ----- fit -----
+
+    def fit(self, df: pd.DataFrame) -> "TitanicFeatures":
+        df = df.reset_index(drop=True)
+        embarked_mode = df['Embarked'].mode()
+        embarked = df['Embarked'].fillna(embarked_mode.iat[0] if len(embarked_mode) else 'S')
+        has_cabin = df['Cabin'].notna()
+        fare_keys = pd.DataFrame({'Embarked': embarked, 'Pclass': df['Pclass'], 'has_cabin': has_cabin})
+        fare_means = _group_map(fare_keys, df['Fare'], 'mean')
+        fare = df['Fare'].fillna(_lookup(fare_keys, fare_means)).fillna(df['Fare'].mean())
+
+        title = titles(df['Name'])
+        age_keys = pd.DataFrame({'Pclass': df['Pclass'], 'Title': title})
+
+        # Deck KNN: scaler over every passenger, neighbours from those with a known cabin
+        deck = decks(df['Cabin'])
+        scale = {
+            'pclass_mean': float(np.nanmean(df['Pclass'])), 'pclass_std': float(np.nanstd(df['Pclass'])) or 1.0,
+            'fare_mean': float(np.nanmean(fare)), 'fare_std': float(np.nanstd(fare)) or 1.0,
+        }
+        known = (deck != NO_CABIN).to_numpy() & df['Pclass'].notna().to_numpy() & fare.notna().to_numpy()
+        deck_labels = sorted(deck[known].unique())
+        order = np.lexsort((fare.to_numpy()[known], df['Pclass'].to_numpy()[known]))
+
+        tickets = df['Ticket'].astype('string').value_counts()
+        self.meta = {
+            'version': PIPELINE_VERSION,
+            'embarked_fill': embarked_mode.iat[0] if len(embarked_mode) else 'S',
+            'fare_means': fare_means,
+            'fare_fill': float(df['Fare'].mean()),
+            'age_medians': _group_map(age_keys, df['Age'], 'median'),
+            'age_fill': float(df['Age'].median()),
+            'scale': scale,
+            'deck_labels': deck_labels,
+            'ticket_counts': {str(k): int(v) for k, v in tickets.items()},
+            'sex_vocab': sorted(df['Sex'].dropna().astype(str).unique()),
+            'title_vocab': sorted(title.dropna().unique()),
+            'deck_vocab': None,      # set below: decks after the KNN fill
+            'embarked_vocab': sorted(embarked.dropna().astype(str).unique()),
+        }
+        self.arrays = {
+            'knn_pclass': df['Pclass'].to_numpy(dtype=float)[known][order],
+            'knn_fare': fare.to_numpy(dtype=float)[known][order],
+            'knn_label': pd.Categorical(deck[known], categories=deck_labels).codes[order].astype(np.int16),
+        }
+        self.meta['deck_vocab'] = sorted(self._fill_decks(deck, df['Pclass'], fare).dropna().unique())
+        return self
+
+    # ----- transform -----
+
+    def _fill_decks(self, deck: pd.Series, pclass: pd.Series, fare: pd.Series) -> pd.Series:
+        # Predict a deck for passengers with no cabin (k nearest neighbours, majority vote); equal
+        # distances keep candidate order (Pclass, fare, row) through the stable argsort below
+        query = (deck == NO_CABIN).to_numpy() & pclass.notna().to_numpy() & fare.notna().to_numpy()
+        if not query.any() or not len(self.arrays['knn_fare']):
+            return deck
+        s = self.meta['scale']
+        k = KNN_NEIGHBORS
+        tp = (self.arrays['knn_pclass'] - s['pclass_mean']) / s['pclass_std']
+        tf = (self.arrays['knn_fare'] - s['fare_mean']) / s['fare_std']
+        qp = (pclass.to_numpy(dtype=float)[query] - s['pclass_mean']) / s['pclass_std']
+        qf = (fare.to_numpy(dtype=float)[query] - s['fare_mean']) / s['fare_std']
+
+        # Candidates: the k closest fares on each side within every class, then the k closest overall
+        cand_idx, cand_dist = [], []
+        classes = self.arrays['knn_pclass']
+        for value in np.unique(classes):
+            lo, hi = np.searchsorted(classes, value, side='left'), np.searchsorted(classes, value, side='right')
+            pos = lo + np.searchsorted(tf[lo:hi], qf)
+            idx = pos[:, None] + np.arange(-k, k)[None, :]
+            valid = (idx >= lo) & (idx < hi)
+            idx = np.clip(idx, lo, max(hi - 1, lo))
+            dist = (tp[idx] - qp[:, None]) ** 2 + (tf[idx] - qf[:, None]) ** 2
+            cand_idx.append(idx)
+            cand_dist.append(np.where(valid, dist, np.inf))
+        cand_idx, cand_dist = np.hstack(cand_idx), np.hstack(cand_dist)
+        nearest = np.take_along_axis(cand_idx, np.argsort(cand_dist, axis=1, kind='stable')[:, :k], axis=1)
+
+        labels = self.arrays['knn_label'][nearest]
+        n_labels = len(self.meta['deck_labels'])
+        votes = (labels[:, :, None] == np.arange(n_labels)[None, None, :]).sum(axis=1)
+        out = deck.copy()
+        out[query] = np.asarray(self.meta['deck_labels'], dtype=object)[votes.argmax(axis=1)]
+        return out
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Cleaned and featured copy of `df`: Embarked / Fare / Age filled, New Cabin,
+        Title, family and ticket-group features, the one-hot columns of the fitted
+        vocabularies, class_age, binned_age and is_minor.
+        """
+        if not self.meta:
+            raise ValueError("TitanicFeatures is not fitted; call fit() or load() first")
+        m = self.meta
+        out = df.copy()
+        out['Embarked'] = out['Embarked'].fillna(m['embarked_fill'])
+        fare_keys = pd.DataFrame({'Embarked': out['Embarked'], 'Pclass': out['Pclass'], 'has_cabin': out['Cabin'].notna()})
+        out['Fare'] = out['Fare'].fillna(_lookup(fare_keys, m['fare_means'])).fillna(m['fare_fill'])
+        out['Cabin'] = out['Cabin'].fillna(NO_CABIN)
+        out['New Cabin'] = self._fill_decks(decks(out['Cabin']), out['Pclass'], out['Fare'])
+
+        out['Title'] = titles(out['Name'])
+        age_keys = pd.DataFrame({'Pclass': out['Pclass'], 'Title': out['Title']})
+        out['Age'] = out['Age'].fillna(_lookup(age_keys, m['age_medians'])).fillna(m['age_fill'])
+
+        out['Total Family'] = out['Parch'] + out['SibSp']
+        # Passengers per ticket: fitted counts, or this frame's own count for tickets not seen at fit time
+        ticket = out['Ticket'].astype('string')
+        counts = ticket.map(m['ticket_counts']).astype(float)
+        counts = counts.fillna(ticket.map(ticket.value_counts()).astype(float))
+        out['is_group'] = (counts > 1).astype(np.int64)
+        out['fare_divider'] = counts.astype(np.int64)
+        out['New Fare'] = out['Fare'] / out['fare_divider']
+
+        dummies = [
+            one_hot(out['Sex'], m['sex_vocab']),
+            one_hot(out['Title'], m['title_vocab']),
+            one_hot(out['New Cabin'], m['deck_vocab'], prefix='cabin_'),
+            one_hot(out['Embarked'], m['embarked_vocab'], prefix='Embarked_'),
+        ]
+        out = pd.concat([out] + dummies, axis=1)
+
+        out['class_age'] = out['Pclass'] * out['Age']
+        out['binned_age'] = pd.cut(out['Age'], AGE_BINS, labels=AGE_BINS[:-1])
+        out['is_minor'] = (out['Age'] < MINOR_AGE).astype(np.int64)
+        return out
+
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self.fit(df).transform(df)
+
+    # ----- persistence -----
+
+    def save(self, path: str):
+        # Folder with meta.json and one .npy per array; written beside the target and renamed into place
+        tmp = f'{path}.tmp-{os.getpid()}'
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f)
+        for name, values in self.arrays.items():
+            np.save(os.path.join(tmp, f'{name}.npy'), values)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = 'r') -> "TitanicFeatures":
+        pipe = cls()
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            pipe.meta = json.load(f)
+        if pipe.meta.get('version') != PIPELINE_VERSION:
+            raise ValueError(f"Feature pipeline {path} has version {pipe.meta.get('version')}, expected {PIPELINE_VERSION}")
+        for name in ('knn_pclass', 'knn_fare', 'knn_label'):
+            pipe.arrays[name] = np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode)
+        return pipe
+
+
+def model_matrix(featured: pd.DataFrame, features: Optional[List[str]] = None) -> pd.DataFrame:
+    # The model notebook's feature columns; dummies of categories absent at fit time are all zeros
+    return featured.reindex(columns=features or MODEL_FEATURES, fill_value=0)
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    digest = hashlib.sha1(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    digest.update(json.dumps([str(c) for c in df.columns]).encode())
+    return digest.hexdigest()[:16]
+
+def fit_cached(df: pd.DataFrame, cache_dir: str) -> TitanicFeatures:
+    """
+    TitanicFeatures fitted on `df`, loaded from `cache_dir/<fingerprint>` when the
+    same data was fitted before, else fitted and saved there.
+    """
+    path = os.path.join(cache_dir, f'features-{data_fingerprint(df)}')
+    if os.path.exists(os.path.join(path, 'meta.json')):
+        try:
+            return TitanicFeatures.load(path)
+        except ValueError:
+            pass  # older pipeline version: refit below
+    pipe = TitanicFeatures().fit(df)
+    os.makedirs(cache_dir, exist_ok=True)
+    pipe.save(path)
+    return pipe
+
+def load_full(train_path: str, test_path: str) -> pd.DataFrame:
+    # Train and test stacked as in the notebooks, tagged with df_type for the model notebook
+    train = pd.read_csv(train_path).assign(df_type='Train')
+    test = pd.read_csv(test_path).assign(df_type='Test')
+    return pd.concat([train, test], ignore_index=True)
+
+
+############################
+# Command line entry point #
+############################
+
+def main(argv: Optional[List[str]] = None):
+    p = argparse.ArgumentParser(description="Build the Titanic featured dataset (df_full_featured.csv).")
+    p.add_argument('train', help='Kaggle train.csv')
+    p.add_argument('test', help='Kaggle test.csv')
+    p.add_argument('--out', default='df_full_featured.csv', help='Output CSV (default: df_full_featured.csv)')
+    p.add_argument('--cache', default=None, help='Folder for fitted pipelines; reused when the inputs are unchanged')
+    p.add_argument('--save', default=None, help='Also save the fitted pipeline to this folder')
+    args = p.parse_args(argv)
+
+    df_full = load_full(args.train, args.test)
+    pipe = fit_cached(df_full, args.cache) if args.cache else TitanicFeatures().fit(df_full)
+    featured = pipe.transform(df_full)
+    featured.to_csv(args.out, index=False)
+    print(f'Wrote {len(featured)} rows x {featured.shape[1]} columns: {args.out}')
+    if args.save:
+        pipe.save(args.save)
+        print(f'Saved feature pipeline: {args.save}')
+
+if __name__ == '__main__':
+    main()
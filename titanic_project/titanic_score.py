@@ -0,0 +1,301 @@
+"""
+Titanic Batch Scoring
+=====================
+
+Saves the fitted feature pipeline and survival model as one artifact folder and
+scores passenger CSVs of any size with it, in the gender_submission.csv layout
+(PassengerId, Survived).
+
+Artifact folder:
+  artifact.json   feature columns, threshold, classes, model params and training row count
+  features/       TitanicFeatures.save() (meta.json plus .npy arrays)
+  forest/         the fitted forest as flat .npy arrays: every tree's nodes
+                  (feature, threshold, children, missing-value direction) and
+                  class probabilities, one array each for the whole forest
+
+Scoring walks the trees with NumPy over those arrays instead of unpickling
+sklearn Tree objects (whose loader copies every node array into its own memory).
+The arrays are loaded with np.load(mmap_mode='r'), so loading is quick and worker
+processes scoring with the same artifact share one copy in the page cache. The
+score command does not import scikit-learn at all. load_artifact() also keeps
+loaded artifacts in memory (keyed on artifact.json's modification time) for
+per-request scoring.
+
+Scoring streams the input with read_csv(chunksize=...): each chunk is transformed,
+scored with predict_proba and appended to the output, so memory use depends on the
+chunk size, not the input size. The output is written under a temporary name and
+renamed when complete. Tickets not seen when the pipeline was fitted are counted
+within their own chunk (is_group / fare_divider).
+
+Usage examples:
+  python titanic_score.py train data/train.csv data/test.csv --artifact titanic_model
+  python titanic_score.py train data/train.csv data/test.csv --artifact titanic_model --params best_forest.json
+  python titanic_score.py score data/test.csv --artifact titanic_model --out submission.csv
+  python titanic_score.py score passengers_big.csv --artifact titanic_model --out scored.csv --chunksize 200000 --proba
+"""
+
+#########################################
+# Importing Base Packages for Scripting #
+#########################################
+
+# Standard Python Base Packages
+from __future__ import annotations
+import argparse
+import json
+import os
+import shutil
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+# Third-Party Packages to be Installed via pip
+import numpy as np
+import pandas as pd
+
+from titanic_features import MODEL_FEATURES, TitanicFeatures, fit_cached, load_full, model_matrix
+
+ARTIFACT_VERSION = 2
+THRESHOLD = 0.5
+CHUNKSIZE = 100_000
+SUBMISSION_COLUMNS = ['PassengerId', 'Survived']
+FOREST_ARRAYS = ('root', 'depth', 'feature', 'threshold', 'left', 'right', 'missing_left', 'proba')
+# Rows walked through the forest at once (the node index array is rows x trees)
+PREDICT_BATCH = 4096
+
+
+#################
+# Forest arrays #
+#################
+
+class ForestArrays:
+    """
+    A fitted tree-ensemble classifier (RandomForestClassifier, ExtraTreesClassifier)
+    as flat node arrays, with the same predict_proba. Children hold forest-wide node
+    indexes, and a leaf's children are the leaf itself, so every row can take
+    `depth` steps through every tree without checking for leaves. `root` is each
+    tree's first node.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], classes: List[Any]):
+        self.arrays = arrays
+        self.classes_ = np.asarray(classes)
+
+    @classmethod
+    def from_model(cls, model) -> "ForestArrays":
+        trees = [est.tree_ for est in model.estimators_]
+        sizes = np.array([t.node_count for t in trees])
+        root = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        left, right, feature, proba = [], [], [], []
+        for t, offset in zip(trees, root):
+            is_leaf = t.children_left < 0
+            node = np.arange(t.node_count) + offset
+            left.append(np.where(is_leaf, node, t.children_left + offset))
+            right.append(np.where(is_leaf, node, t.children_right + offset))
+            feature.append(np.where(is_leaf, 0, t.feature))
+            value = t.value[:, 0, :]
+            proba.append(value / value.sum(axis=1, keepdims=True))
+        arrays = {
+            'root': root.astype(np.int64),
+            'depth': np.array([max(t.max_depth for t in trees)], dtype=np.int64),
+            'feature': np.concatenate(feature).astype(np.int64),
+            # sklearn compares float32 features against float64 thresholds
+            'threshold': np.concatenate([t.threshold for t in trees]),
+            'left': np.concatenate(left).astype(np.int64),
+            'right': np.concatenate(right).astype(np.int64),
+            'missing_left': np.concatenate([t.missing_go_to_left for t in trees]).astype(bool),
+            'proba': np.concatenate(proba),
+        }
+        return cls(arrays, list(model.classes_))
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        out = np.empty((len(X), len(self.classes_)))
+        for lo in range(0, len(X), PREDICT_BATCH):
+            out[lo:lo + PREDICT_BATCH] = self._leaf_proba(X[lo:lo + PREDICT_BATCH])
+        return out
+
+    def _leaf_proba(self, X: np.ndarray) -> np.ndarray:
+        a = self.arrays
+        node = np.broadcast_to(a['root'], (len(X), len(a['root']))).copy()
+        rows = np.arange(len(X))[:, None]
+        has_nan = bool(np.isnan(X).any())
+        # One level of every tree per step; rows already on a leaf stay there
+        for _ in range(int(a['depth'][0])):
+            x = X[rows, a['feature'][node]]
+            go_left = x <= a['threshold'][node]
+            if has_nan:
+                go_left = np.where(np.isnan(x), a['missing_left'][node], go_left)
+            node = np.where(go_left, a['left'][node], a['right'][node])
+        return a['proba'][node].mean(axis=1)
+
+    def save(self, path: str):
+        os.makedirs(path)
+        for name in FOREST_ARRAYS:
+            np.save(os.path.join(path, f'{name}.npy'), self.arrays[name])
+
+    @classmethod
+    def load(cls, path: str, classes: List[Any], mmap_mode: Optional[str] = 'r') -> "ForestArrays":
+        return cls({name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode) for name in FOREST_ARRAYS},
+                   classes)
+
+
+##################
+# Model artifact #
+##################
+
+class ScoringArtifact:
+    """
+    A fitted TitanicFeatures pipeline plus a ForestArrays classifier trained on its
+    model matrix; predict_proba() / predict() take raw Kaggle-layout rows.
+    """
+
+    def __init__(self, features: TitanicFeatures, model, columns: Optional[List[str]] = None,
+                 threshold: float = THRESHOLD, info: Optional[Dict[str, Any]] = None):
+        self.features = features
+        self.model = model
+        self.columns = list(columns or MODEL_FEATURES)
+        self.threshold = threshold
+        self.info = dict(info or {})
+
+    def predict_proba(self, df: pd.DataFrame) -> np.ndarray:
+        # Probability of Survived == 1 for each row
+        X = model_matrix(self.features.transform(df), self.columns).to_numpy(dtype=float)
+        return self.model.predict_proba(X)[:, list(self.model.classes_).index(1)]
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        return (self.predict_proba(df) >= self.threshold).astype(np.int64)
+
+    def save(self, path: str):
+        # Written to a temporary folder beside the target and renamed into place
+        tmp = f'{path}.tmp-{os.getpid()}'
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        self.features.save(os.path.join(tmp, 'features'))
+        self.model.save(os.path.join(tmp, 'forest'))
+        meta = {'version': ARTIFACT_VERSION, 'columns': self.columns, 'threshold': self.threshold,
+                'classes': self.model.classes_.tolist(), **self.info}
+        with open(os.path.join(tmp, 'artifact.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2, default=str)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = 'r') -> "ScoringArtifact":
+        with open(os.path.join(path, 'artifact.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != ARTIFACT_VERSION:
+            raise ValueError(f"Model artifact {path} has version {meta.get('version')}, expected {ARTIFACT_VERSION}")
+        features = TitanicFeatures.load(os.path.join(path, 'features'), mmap_mode=mmap_mode)
+        model = ForestArrays.load(os.path.join(path, 'forest'), meta['classes'], mmap_mode=mmap_mode)
+        info = {k: v for k, v in meta.items() if k not in ('version', 'columns', 'threshold', 'classes')}
+        return cls(features, model, meta['columns'], meta['threshold'], info)
+
+@lru_cache(maxsize=4)
+def _cached_artifact(path: str, mtime_ns: int) -> ScoringArtifact:
+    return ScoringArtifact.load(path)
+
+def load_artifact(path: str) -> ScoringArtifact:
+    # Loaded once per process; a re-saved artifact (new folder, new mtime) is loaded again
+    path = os.path.abspath(path)
+    return _cached_artifact(path, os.stat(os.path.join(path, 'artifact.json')).st_mtime_ns)
+
+
+############
+# Training #
+############
+
+def train_artifact(train_path: str, test_path: str, params: Optional[Dict[str, Any]] = None,
+                   cache_dir: Optional[str] = None, threshold: float = THRESHOLD) -> ScoringArtifact:
+    """
+    Fits the feature pipeline on train and test together (as the notebooks do) and
+    the model on every Train row, with `params` on top of the notebook's forest.
+    """
+    from titanic_search import default_estimator  # scikit-learn is only needed to train
+
+    df_full = load_full(train_path, test_path)
+    features = fit_cached(df_full, cache_dir) if cache_dir else TitanicFeatures().fit(df_full)
+    known = features.transform(df_full[df_full['df_type'] == 'Train'])
+    model = default_estimator().set_params(**(params or {}))
+    model.fit(model_matrix(known, MODEL_FEATURES).to_numpy(dtype=float), known['Survived'].astype(int).to_numpy())
+    info = {'params': model.get_params(), 'model': type(model).__name__, 'train_rows': len(known)}
+    return ScoringArtifact(features, ForestArrays.from_model(model), MODEL_FEATURES, threshold, info)
+
+def read_params(path: Optional[str]) -> Dict[str, Any]:
+    # Best params from titanic_search.py --out (or a plain params dict)
+    if not path:
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data.get('best_params', data)
+
+
+#################
+# Batch scoring #
+#################
+
+def score_csv(artifact: ScoringArtifact, input_path: str, out_path: str, chunksize: int = CHUNKSIZE,
+              proba: bool = False) -> int:
+    """
+    Streams `input_path` through the artifact and writes PassengerId, Survived (plus
+    Probability when `proba`) to `out_path`. Returns the number of rows scored.
+    """
+    tmp = f'{out_path}.tmp-{os.getpid()}'
+    rows = 0
+    try:
+        with open(tmp, 'w', encoding='utf-8', newline='') as f:
+            f.write(','.join(SUBMISSION_COLUMNS + (['Probability'] if proba else [])) + '\n')
+            for chunk in pd.read_csv(input_path, chunksize=chunksize):
+                p = artifact.predict_proba(chunk)
+                out = pd.DataFrame({'PassengerId': chunk['PassengerId'].to_numpy(),
+                                    'Survived': (p >= artifact.threshold).astype(np.int64)})
+                if proba:
+                    out['Probability'] = np.round(p, 6)
+                out.to_csv(f, header=False, index=False)
+                rows += len(chunk)
+        os.replace(tmp, out_path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return rows
+
+
+############################
+# Command line entry point #
+############################
+
+def main(argv: Optional[List[str]] = None):
+    p = argparse.ArgumentParser(description="Train and save the Titanic model artifact, or batch-score CSVs with it.")
+    sub = p.add_subparsers(dest='command', required=True)
+
+    t = sub.add_parser('train', help='Fit the feature pipeline and model and save them as an artifact folder')
+    t.add_argument('train', help='Kaggle train.csv')
+    t.add_argument('test', help='Kaggle test.csv (used to fit the feature pipeline, as in the notebooks)')
+    t.add_argument('--artifact', required=True, help='Artifact folder to write')
+    t.add_argument('--params', default=None, help='JSON with model params (e.g. titanic_search.py --out)')
+    t.add_argument('--cache', default=None, help='Feature pipeline cache folder (see titanic_features.py --cache)')
+    t.add_argument('--threshold', type=float, default=THRESHOLD, help=f'Survived cut-off (default {THRESHOLD})')
+
+    s = sub.add_parser('score', help='Score a passenger CSV in chunks (gender_submission.csv layout)')
+    s.add_argument('input', help='CSV with the Kaggle passenger columns')
+    s.add_argument('--artifact', required=True, help='Artifact folder from the train command')
+    s.add_argument('--out', required=True, help='Output CSV')
+    s.add_argument('--chunksize', type=int, default=CHUNKSIZE, help=f'Rows per chunk (default {CHUNKSIZE})')
+    s.add_argument('--proba', action='store_true', help='Add a Probability column')
+    args = p.parse_args(argv)
+
+    if args.command == 'train':
+        artifact = train_artifact(args.train, args.test, read_params(args.params), args.cache, args.threshold)
+        artifact.save(args.artifact)
+        print(f"Saved {artifact.info['model']} trained on {artifact.info['train_rows']} rows: {args.artifact}")
+        return
+
+    if args.chunksize <= 0:
+        p.error('--chunksize must be positive')
+    start = time.perf_counter()
+    artifact = load_artifact(args.artifact)
+    loaded = time.perf_counter()
+    rows = score_csv(artifact, args.input, args.out, args.chunksize, args.proba)
+    print(f'Scored {rows} rows in {time.perf_counter() - loaded:.2f}s (artifact load {loaded - start:.3f}s): {args.out}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,473 @@
+"""
+Titanic Hyperparameter Search
+=============================
+
+Budget-aware replacement for the random-forest GridSearchCV in
+titanic_model_building.ipynb (2 x 7 x 9 x 5 x 4 x 2 = 5,040 candidates x 5 folds).
+
+- Successive halving: every candidate is first scored on a small share of each
+  training fold; only the best 1/factor go on to the next rung, which uses factor
+  times more rows, until the survivors are scored on the full folds.
+- Randomized search: --candidates N scores N grid points drawn at random instead of
+  the whole grid.
+- Budgets: no new candidate group is started once --time-budget seconds or
+  --max-fits fold fits are used, and a group started within the budget is scored on
+  every fold (cut to its smallest n_estimators values if --max-fits would otherwise
+  be exceeded), so any budget of at least one fit per fold yields a result: the best
+  candidate of the furthest rung reached.
+- Warm start: candidates that differ only in n_estimators share one forest per
+  fold, grown with warm_start through the n_estimators values and scored at each
+  size (the same trees a fresh fit of that size grows).
+- Parallel: (candidate group, fold) fits run in a process pool on every core.
+- Cache: each (params, fold, rows) score is appended to a JSON Lines file named by
+  a fingerprint of the data, folds and estimator, so a rerun on unchanged data
+  skips everything already scored.
+
+Fits are counted the way GridSearchCV counts them (one per candidate per fold),
+so --max-fits 25200 is the full grid search.
+
+Usage examples:
+  python titanic_search.py df_full_featured.csv --cache .titanic_cache
+  python titanic_search.py df_full_featured.csv --cache .titanic_cache --time-budget 300 --out best_forest.json
+  python titanic_search.py df_full_featured.csv --candidates 500 --factor 3 --workers 8
+"""
+
+#########################################
+# Importing Base Packages for Scripting #
+#########################################
+
+# Standard Python Base Packages
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import math
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Third-Party Packages to be Installed via pip
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import ParameterGrid, StratifiedKFold, train_test_split
+
+from titanic_features import MODEL_FEATURES, data_fingerprint
+
+RANDOM_STATE = 5254
+N_FOLDS = 5
+TEST_SIZE = 0.15
+
+# The notebook's random-forest grid
+RF_GRID: Dict[str, List[Any]] = {
+    'bootstrap': [True, False],
+    'n_estimators': [35, 40, 45, 50, 100, 200, 300],
+    'max_depth': [5, 8, 10, 13, 15, 18, 20, 25, 30],
+    'min_samples_split': [2, 5, 10, 15, 100],
+    'min_samples_leaf': [1, 2, 5, 10],
+    'criterion': ['gini', 'entropy'],
+}
+
+HALVING_FACTOR = 3
+MIN_ROWS = 50
+
+
+###############
+# Score cache #
+###############
+
+class ScoreCache:
+    """
+    Per-fold scores keyed by (params, fold, share of the fold's training rows).
+    With a path, scores are loaded from and appended to a JSON Lines file; only
+    the parent process writes it.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.scores: Dict[str, float] = {}
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # last line of an interrupted run
+                    self.scores[rec['key']] = rec['score']
+
+    @staticmethod
+    def key(params: Dict[str, Any], fold: int, share: float) -> str:
+        return json.dumps({'params': params, 'fold': fold, 'share': round(share, 6)}, sort_keys=True, default=str)
+
+    def get(self, key: str) -> Optional[float]:
+        return self.scores.get(key)
+
+    def add(self, scored: List[Tuple[str, float]]):
+        self.scores.update(scored)
+        if self.path and scored:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.writelines(json.dumps({'key': k, 'score': s}) + '\n' for k, s in scored)
+
+def search_fingerprint(X: pd.DataFrame, y: np.ndarray, folds: List[Tuple[np.ndarray, np.ndarray]],
+                       estimator, random_state: int) -> str:
+    # Scores are only reusable for the same rows, labels, folds, base estimator and row subsampling
+    digest = hashlib.sha1(data_fingerprint(X.assign(__label__=y)).encode())
+    for _, test in folds:
+        digest.update(np.asarray(test, dtype=np.int64).tobytes())
+    digest.update(f'{estimator!r}|{random_state}'.encode())
+    return digest.hexdigest()[:16]
+
+
+#######################
+# Pool worker helpers #
+#######################
+
+# Set once per worker process by the pool initializer, so tasks do not pickle the data
+_DATA: Dict[str, Any] = {}
+
+def _init_worker(estimator, X: np.ndarray, y: np.ndarray):
+    _DATA.update(estimator=estimator, X=X, y=y)
+
+def _score_group(params: Dict[str, Any], sizes: List[Optional[int]], train: np.ndarray,
+                 test: np.ndarray) -> List[float]:
+    # Accuracy on the fold for each n_estimators in `sizes`, growing one warm-started forest through them
+    X, y = _DATA['X'], _DATA['y']
+    model = clone(_DATA['estimator']).set_params(**params)
+    if sizes == [None]:
+        return [float(model.fit(X[train], y[train]).score(X[test], y[test]))]
+    model.set_params(warm_start=True, n_jobs=1)
+    scores = []
+    for n in sizes:
+        model.set_params(n_estimators=n).fit(X[train], y[train])
+        scores.append(float(model.score(X[test], y[test])))
+    return scores
+
+def _fold_score(model, X: np.ndarray, y: np.ndarray, train: np.ndarray, test: np.ndarray) -> float:
+    return float(clone(model).fit(X[train], y[train]).score(X[test], y[test]))
+
+
+##########################
+# Successive halving run #
+##########################
+
+@dataclass
+class SearchResult:
+    best_params_: Dict[str, Any]
+    best_score_: float
+    cv_results_: pd.DataFrame
+    fits: int = 0
+    cached: int = 0
+    seconds: float = 0.0
+    stopped: Optional[str] = None          # 'time' or 'fits' when a budget ended the search
+    rungs: List[Dict[str, Any]] = field(default_factory=list)
+
+    def best_estimator(self, estimator=None, X=None, y=None):
+        # Base estimator with the best params, refit on (X, y) when given
+        model = clone(estimator if estimator is not None else default_estimator()).set_params(**self.best_params_)
+        return model.fit(X, y) if X is not None else model
+
+def default_estimator() -> RandomForestClassifier:
+    return RandomForestClassifier(random_state=RANDOM_STATE)
+
+def sample_candidates(grid: Dict[str, List[Any]], n_candidates: Optional[int], random_state: int) -> List[Dict[str, Any]]:
+    candidates = list(ParameterGrid(grid))
+    if n_candidates is not None and n_candidates < len(candidates):
+        pick = np.random.RandomState(random_state).choice(len(candidates), n_candidates, replace=False)
+        candidates = [candidates[i] for i in np.sort(pick)]
+    return candidates
+
+def rung_shares(n_rows: int, n_candidates: int, factor: int, min_rows: int) -> List[float]:
+    # Shares of each training fold per rung, ending at 1.0; the first rung keeps at least min_rows rows
+    # and there are never more rungs than halvings needed to get down to one candidate
+    by_rows = 1 + int(math.floor(math.log(max(n_rows / max(min_rows, 1), 1), factor)))
+    by_candidates = 1 + int(math.ceil(math.log(max(n_candidates, 1), factor)))
+    rungs = max(1, min(by_rows, by_candidates))
+    return [float(factor) ** -(rungs - 1 - r) for r in range(rungs)]
+
+def _group_candidates(candidates: List[Dict[str, Any]]) -> Dict[str, Tuple[Dict[str, Any], List[Optional[int]]]]:
+    # Candidates differing only in n_estimators share one warm-started forest
+    groups: Dict[str, Tuple[Dict[str, Any], List[Optional[int]]]] = {}
+    for c in candidates:
+        base = {k: v for k, v in c.items() if k != 'n_estimators'}
+        gkey = json.dumps(base, sort_keys=True, default=str)
+        groups.setdefault(gkey, (base, []))[1].append(c.get('n_estimators'))
+    return {k: (base, sorted(set(sizes), key=lambda n: -1 if n is None else n)) for k, (base, sizes) in groups.items()}
+
+def _with_size(base: Dict[str, Any], n: Optional[int]) -> Dict[str, Any]:
+    return base if n is None else {**base, 'n_estimators': n}
+
+def halving_search(
+    X: pd.DataFrame,
+    y,
+    grid: Optional[Dict[str, List[Any]]] = None,
+    estimator=None,
+    cv=None,
+    factor: int = HALVING_FACTOR,
+    min_rows: int = MIN_ROWS,
+    n_candidates: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    max_fits: Optional[int] = None,
+    cache_dir: Optional[str] = None,
+    workers: int = 0,
+    random_state: int = RANDOM_STATE,
+    verbose: bool = True,
+) -> SearchResult:
+    """
+    Successive-halving (optionally randomized) search scored by fold accuracy.
+    `workers` = 0 uses one process per CPU core; 1 runs in this process.
+    `max_fits` counts one fit per candidate per fold and is never exceeded.
+    """
+    start = time.perf_counter()
+    grid = grid if grid is not None else RF_GRID
+    estimator = estimator if estimator is not None else default_estimator()
+    X = pd.DataFrame(X).reset_index(drop=True)
+    y = np.asarray(y)
+    cv = cv if cv is not None else StratifiedKFold(n_splits=N_FOLDS)
+    folds = [(np.asarray(tr), np.asarray(te)) for tr, te in cv.split(X, y)]
+    if max_fits is not None and max_fits < len(folds):
+        raise ValueError(f'max_fits={max_fits} cannot score a candidate on all {len(folds)} folds')
+
+    cache_path = None
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_path = os.path.join(cache_dir, f'search-{search_fingerprint(X, y, folds, estimator, random_state)}.jsonl')
+    cache = ScoreCache(cache_path)
+
+    candidates = sample_candidates(grid, n_candidates, random_state)
+    shares = rung_shares(min(len(tr) for tr, _ in folds), len(candidates), factor, min_rows)
+    # Rows for each rung: a fixed random order of each fold's training rows, cut to the rung's share
+    orders = [np.random.RandomState(random_state + i).permutation(tr) for i, (tr, _) in enumerate(folds)]
+
+    def rows(fold: int, share: float) -> np.ndarray:
+        return folds[fold][0] if share >= 1 else np.sort(orders[fold][:max(2, int(math.ceil(share * len(orders[fold]))))])
+
+    n_workers = workers if workers > 0 else (os.cpu_count() or 1)
+    X_values = X.to_numpy(dtype=float)
+    pool = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                               initargs=(estimator, X_values, y)) if n_workers > 1 else None
+    if pool is None:
+        _init_worker(estimator, X_values, y)
+
+    fits = cached = 0
+    stopped: Optional[str] = None
+    best: Optional[Tuple[Dict[str, Any], List[float]]] = None
+    records: List[Dict[str, Any]] = []
+    rung_log: List[Dict[str, Any]] = []
+    survivors = candidates
+
+    def out_of_budget(started: int) -> Optional[str]:
+        # `started` = fits already started in the current rung; the time budget never stops
+        # the first group, so there is always one candidate scored on every fold
+        if time_budget is not None and (best is not None or started) and time.perf_counter() - start >= time_budget:
+            return 'time'
+        if max_fits is not None and fits + started >= max_fits:
+            return 'fits'
+        return None
+
+    def fits_left(started: int) -> Optional[int]:
+        return None if max_fits is None else max_fits - fits - started
+
+    try:
+        for rung, share in enumerate(shares):
+            # Per group, one task per fold with the n_estimators values not already in the cache
+            units = []
+            for base, sizes in _group_candidates(survivors).values():
+                unit = []
+                for fold in range(len(folds)):
+                    missing = [n for n in sizes if cache.get(ScoreCache.key(_with_size(base, n), fold, share)) is None]
+                    cached += len(sizes) - len(missing)
+                    if missing:
+                        unit.append((base, missing, fold))
+                if unit:
+                    units.append(unit)
+
+            stopped = _run_tasks(units, pool, rows, folds, share, cache, out_of_budget, fits_left, n_workers)
+            fits += _count_done([task for unit in units for task in unit], cache, share)
+
+            scored = _rung_scores(survivors, len(folds), share, cache)
+            n_rows = len(rows(0, share))
+            if scored:
+                best = scored[0]
+            for rank, (c, scores) in enumerate(scored):
+                records.append({**c, 'rung': rung, 'share': share, 'rows': n_rows,
+                                'mean_test_score': float(np.mean(scores)), 'std_test_score': float(np.std(scores)),
+                                'rank_test_score': rank + 1})
+            rung_log.append({'rung': rung, 'share': share, 'candidates': len(survivors), 'scored': len(scored)})
+            if verbose:
+                print(f'Rung {rung}: {len(scored)}/{len(survivors)} candidates scored on {share:.3g} of each fold '
+                      f'({time.perf_counter() - start:.1f}s, {fits} fits)')
+            if stopped is not None or not scored:
+                break
+            if rung < len(shares) - 1:
+                survivors = [c for c, _ in scored[:max(1, int(math.ceil(len(scored) / factor)))]]
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    if best is None:
+        raise RuntimeError('Budget ran out before any candidate was scored on every fold')
+    if verbose and stopped:
+        print(f'Stopped early: {stopped} budget used')
+    # Best candidate of the furthest rung that any candidate finished
+    return SearchResult(dict(best[0]), float(np.mean(best[1])), pd.DataFrame(records), fits=fits, cached=cached,
+                        seconds=time.perf_counter() - start, stopped=stopped, rungs=rung_log)
+
+def _run_tasks(units, pool, rows, folds, share, cache: ScoreCache, out_of_budget, fits_left,
+               n_workers: int) -> Optional[str]:
+    # Runs each group's fold tasks (in the pool when there is one), storing scores as they finish.
+    # Budgets are checked before a group starts; a started group runs on every fold. Returns the
+    # budget that stopped it.
+    def store(task, scores):
+        base, sizes, fold = task
+        cache.add([(ScoreCache.key(_with_size(base, n), fold, share), s) for n, s in zip(sizes, scores)])
+
+    pending = list(reversed(units))
+    started = 0
+    stop: Optional[str] = None
+
+    def admit() -> List[Tuple[Dict[str, Any], List[Optional[int]], int]]:
+        # The next group's tasks, cut to the fits left; [] once a budget has run out
+        nonlocal started, stop
+        if stop is not None or not pending:
+            return []
+        stop = out_of_budget(started)
+        if stop:
+            return []
+        tasks, whole = _within_fits(pending.pop(), fits_left(started))
+        if not whole:
+            stop = 'fits'
+        started += sum(len(sizes) for _, sizes, _ in tasks)
+        return tasks
+
+    if pool is None:
+        while True:
+            tasks = admit()
+            if not tasks:
+                return stop
+            for task in tasks:
+                base, sizes, fold = task
+                store(task, _score_group(base, sizes, rows(fold, share), folds[fold][1]))
+
+    # Keep a couple of tasks per worker in flight so the budget check stops new groups promptly
+    queue, running = [], {}
+    while True:
+        while len(running) < 2 * n_workers:
+            if not queue:
+                queue = list(reversed(admit()))
+                if not queue:
+                    break
+            task = queue.pop()
+            base, sizes, fold = task
+            running[pool.submit(_score_group, base, sizes, rows(fold, share), folds[fold][1])] = task
+        if not running:
+            return stop
+        done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+        for fut in done:
+            store(running.pop(fut), fut.result())
+
+def _within_fits(unit, left: Optional[int]):
+    # (tasks, whole): the group's fold tasks cut to its smallest n_estimators values so they
+    # take at most `left` fits (None = no limit); whole is False when anything was cut
+    if left is None:
+        return unit, True
+    order = sorted({n for _, sizes, _ in unit for n in sizes}, key=lambda n: -1 if n is None else n)
+    for k in range(len(order), 0, -1):
+        keep = set(order[:k])
+        tasks = [(base, [n for n in sizes if n in keep], fold) for base, sizes, fold in unit]
+        tasks = [t for t in tasks if t[1]]
+        if sum(len(sizes) for _, sizes, _ in tasks) <= left:
+            return tasks, k == len(order)
+    return [], False
+
+def _count_done(tasks, cache: ScoreCache, share: float) -> int:
+    return sum(cache.get(ScoreCache.key(_with_size(base, n), fold, share)) is not None
+               for base, sizes, fold in tasks for n in sizes)
+
+def _rung_scores(candidates, n_folds: int, share: float, cache: ScoreCache) -> List[Tuple[Dict[str, Any], List[float]]]:
+    # Candidates with a score on every fold, best mean first (lower spread, then grid order, breaks ties)
+    scored = []
+    for i, c in enumerate(candidates):
+        scores = [cache.get(ScoreCache.key(c, f, share)) for f in range(n_folds)]
+        if all(s is not None for s in scores):
+            scored.append((-float(np.mean(scores)), float(np.std(scores)), i, c, scores))
+    scored.sort(key=lambda t: t[:3])
+    return [(c, scores) for _, _, _, c, scores in scored]
+
+###########################
+# Out-of-the-box compare #
+###########################
+
+def compare_models(models: Sequence, X: pd.DataFrame, y, cv=None, workers: int = 0) -> pd.DataFrame:
+    """
+    Fold accuracy of each model (the notebook's cross_val_score loop), with every
+    (model, fold) fit spread over the pool at once rather than n_jobs=4 per model.
+    """
+    X_values, y = pd.DataFrame(X).to_numpy(dtype=float), np.asarray(y)
+    cv = cv if cv is not None else StratifiedKFold(n_splits=N_FOLDS)
+    folds = list(cv.split(X_values, y))
+    jobs = [(m, tr, te) for m in models for tr, te in folds]
+    n_workers = workers if workers > 0 else (os.cpu_count() or 1)
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures: List[Future] = [pool.submit(_fold_score, m, X_values, y, tr, te) for m, tr, te in jobs]
+            scores = [f.result() for f in futures]
+    else:
+        scores = [_fold_score(m, X_values, y, tr, te) for m, tr, te in jobs]
+    by_model = np.array(scores).reshape(len(models), len(folds))
+    return pd.DataFrame({
+        'Cross_Val_Median': np.median(by_model, axis=1),
+        'Cross_Val_Errors': np.std(by_model, axis=1),
+        'Model_Types': [type(m).__name__.replace('Classifier', '') for m in models],
+    })
+
+
+############################
+# Command line entry point #
+############################
+
+def training_split(featured: pd.DataFrame, features: Optional[List[str]] = None,
+                   random_state: int = RANDOM_STATE) -> Tuple[pd.DataFrame, pd.Series, pd.DataFrame, pd.Series]:
+    # The notebook's 85/15 split of the Train rows of df_full_featured.csv
+    known = featured[featured['df_type'] == 'Train']
+    train, test = train_test_split(known, test_size=TEST_SIZE, random_state=random_state)
+    cols = features or MODEL_FEATURES
+    return train[cols], train['Survived'].astype(int), test[cols], test['Survived'].astype(int)
+
+def main(argv: Optional[List[str]] = None):
+    p = argparse.ArgumentParser(description="Successive-halving random-forest search for the Titanic model.")
+    p.add_argument('featured', help='df_full_featured.csv (from titanic_features.py)')
+    p.add_argument('--cache', default=None, help='Folder for per-fold scores; reruns on unchanged data skip scored fits')
+    p.add_argument('--candidates', type=int, default=None, help='Randomized search: score N grid points (default: all)')
+    p.add_argument('--factor', type=int, default=HALVING_FACTOR, help=f'Keep 1/factor per rung (default {HALVING_FACTOR})')
+    p.add_argument('--min-rows', type=int, default=MIN_ROWS, help=f'Training rows per fold at the first rung (default {MIN_ROWS})')
+    p.add_argument('--time-budget', type=float, default=None, help='Stop starting fits after this many seconds')
+    p.add_argument('--max-fits', type=int, default=None, help='Stop after this many fold fits (full grid = 25200)')
+    p.add_argument('--workers', type=int, default=0, help='Worker processes (0 = one per CPU core; 1 = serial)')
+    p.add_argument('--out', default=None, help='Write the best params and scores to this JSON file')
+    p.add_argument('--results', default=None, help='Write every scored (candidate, rung) to this CSV')
+    args = p.parse_args(argv)
+    if args.factor < 2:
+        p.error('--factor must be at least 2')
+    if args.max_fits is not None and args.max_fits < N_FOLDS:
+        p.error(f'--max-fits must be at least {N_FOLDS} (one fit per fold)')
+
+    X_train, y_train, X_test, y_test = training_split(pd.read_csv(args.featured))
+    res = halving_search(X_train, y_train, factor=args.factor, min_rows=args.min_rows, n_candidates=args.candidates,
+                         time_budget=args.time_budget, max_fits=args.max_fits, cache_dir=args.cache,
+                         workers=args.workers)
+    holdout = float(res.best_estimator(X=X_train, y=y_train).score(X_test, y_test))
+    print(f'{res.fits} fits ({res.cached} cached) in {res.seconds:.1f}s')
+    print(f'Best params: {res.best_params_}')
+    print(f'CV accuracy: {res.best_score_:.4f} | hold-out accuracy: {holdout:.4f}')
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump({'best_params': res.best_params_, 'cv_accuracy': res.best_score_, 'holdout_accuracy': holdout,
+                       'fits': res.fits, 'cached': res.cached, 'stopped': res.stopped, 'rungs': res.rungs}, f, indent=2)
+    if args.results:
+        res.cv_results_.to_csv(args.results, index=False)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,394 @@
+"""
+Whisky Distillery Geocoder
+==========================
+
+Geocoding for distillery_data_script.ipynb: looks up every distillery name (and
+the listed countries for the fallback) with a persistent cache, so re-running
+the enrichment only goes to the network for names it has never seen.
+
+- Cache: a SQLite file keyed by the normalized query (Unicode NFKC, case-folded,
+  single spaces), holding found and not-found answers.
+  Lookups that keep failing are not cached and are retried on the next run.
+- Deduplication: each distinct query is geocoded once per run, and a query that
+  is already being looked up is awaited rather than sent again.
+- Concurrency: a fixed pool of asyncio workers, a token-bucket rate limit (the
+  public Nominatim server allows one request per second), and retries with
+  exponential backoff and jitter on timeouts, rate limiting and unavailable service.
+- Backends: NominatimBackend (geopy, one client for the whole run) or any object
+  with a geocode(query) method, plain or async, returning a GeocodeResult or
+  None; StubBackend answers from a local table for offline runs and tests.
+
+Enrichment follows the notebook: distillery name -> address lat/long/country; where
+the address country differs from the listed country, the country's coordinates.
+Inside a running event loop (a Jupyter cell) use the coroutine form:
+  df = await enrich_distilleries_async(df, Geocoder(cache=GeocodeCache()))
+
+Usage examples:
+  python whisky_geocode.py distilleries.csv --out distillery_data.csv
+  python whisky_geocode.py distilleries.csv --out distillery_data.csv --cache geocode_cache.sqlite --rate 1
+  python whisky_geocode.py distilleries.csv --out distillery_data.csv --stub known_places.csv
+"""
+
+#########################################
+# Importing Base Packages for Scripting #
+#########################################
+
+# Standard Python Base Packages
+from __future__ import annotations
+import argparse
+import asyncio
+import datetime
+import inspect
+import random
+import sqlite3
+import sys
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+# Third-Party Packages to be Installed via pip
+import pandas as pd
+
+CACHE_PATH = 'geocode_cache.sqlite'
+USER_AGENT = 'whisky_distillery_geocoder'
+CONCURRENCY = 4
+RATE = 1.0            # requests per second (Nominatim usage policy)
+BURST = 1
+RETRIES = 4
+BACKOFF = 1.0         # seconds before the first retry, doubled each time
+TIMEOUT = 10.0
+
+
+###########
+# Results #
+###########
+
+@dataclass
+class GeocodeResult:
+    latitude: float
+    longitude: float
+    country: Optional[str] = None       # last part of the display name, as the notebook reads it
+    display_name: Optional[str] = None
+
+def normalize_query(query: str) -> str:
+    # Cache / dedup key: NFKC Unicode, case-folded, single spaces
+    return ' '.join(unicodedata.normalize('NFKC', str(query)).casefold().split())
+
+def country_of(display_name: Optional[str]) -> Optional[str]:
+    return display_name.rsplit(',', 1)[-1].strip() if display_name else None
+
+
+###############
+# Cache store #
+###############
+
+class GeocodeCache:
+    """
+    SQLite table of normalized query -> result (found = 0 records a lookup that
+    returned nothing). Only used from the event loop's thread.
+    """
+
+    def __init__(self, path: str = CACHE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS geocode ('
+            ' query TEXT PRIMARY KEY, found INTEGER NOT NULL, latitude REAL, longitude REAL,'
+            ' country TEXT, display_name TEXT, updated TEXT NOT NULL)'
+        )
+        self.conn.commit()
+
+    def get_many(self, queries: Iterable[str]) -> Dict[str, Optional[GeocodeResult]]:
+        # Cached answers for the (normalized) queries that have one; None values are cached "not found"s
+        out: Dict[str, Optional[GeocodeResult]] = {}
+        queries = list(queries)
+        for i in range(0, len(queries), 500):  # stay under SQLite's bound-parameter limit
+            batch = queries[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT query, found, latitude, longitude, country, display_name FROM geocode "
+                f"WHERE query IN ({','.join('?' * len(batch))})", batch)
+            for query, found, lat, lon, country, name in rows:
+                out[query] = GeocodeResult(lat, lon, country, name) if found else None
+        return out
+
+    def put(self, query: str, result: Optional[GeocodeResult]):
+        found = result is not None
+        self.conn.execute(
+            'INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (query, int(found), result.latitude if found else None, result.longitude if found else None,
+             result.country if found else None, result.display_name if found else None,
+             datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')),
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+############
+# Backends #
+############
+
+class NominatimBackend:
+    """geopy's Nominatim client, created once and shared by every lookup."""
+
+    def __init__(self, user_agent: str = USER_AGENT, timeout: float = TIMEOUT):
+        from geopy.geocoders import Nominatim  # only needed when geocoding online
+        self.client = Nominatim(user_agent=user_agent, timeout=timeout)
+
+    def geocode(self, query: str) -> Optional[GeocodeResult]:
+        loc = self.client.geocode(query)
+        if loc is None:
+            return None
+        name = loc.raw.get('display_name')
+        return GeocodeResult(float(loc.latitude), float(loc.longitude), country_of(name), name)
+
+class StubBackend:
+    """
+    Offline geocoder answering from a local table: a mapping of query ->
+    (latitude, longitude, country), or a CSV with query, latitude, longitude and
+    country columns. Unknown queries are not found. `delay` simulates latency.
+    """
+
+    def __init__(self, table, delay: float = 0.0):
+        if isinstance(table, str):
+            df = pd.read_csv(table)
+            table = {r.query: (r.latitude, r.longitude, r.country) for r in df.itertuples(index=False)}
+        self.table = {normalize_query(q): v for q, v in dict(table).items()}
+        self.delay = delay
+        self.calls = 0
+
+    async def geocode(self, query: str) -> Optional[GeocodeResult]:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        hit = self.table.get(normalize_query(query))
+        if hit is None:
+            return None
+        lat, lon, country = hit
+        return GeocodeResult(float(lat), float(lon), country, f'{query}, {country}')
+
+def retryable_errors() -> Tuple[type, ...]:
+    # Timeouts and connection / service errors are retried; anything else fails the lookup straight away
+    errors: Tuple[type, ...] = (TimeoutError, asyncio.TimeoutError, ConnectionError)
+    try:
+        from geopy.exc import GeocoderRateLimited, GeocoderTimedOut, GeocoderUnavailable
+        errors += (GeocoderTimedOut, GeocoderUnavailable, GeocoderRateLimited)
+    except ImportError:
+        pass
+    return errors
+
+
+##########################
+# Rate-limited geocoding #
+##########################
+
+class TokenBucket:
+    """`rate` requests per second on average, at most `burst` at once; rate <= 0 means no limit."""
+
+    def __init__(self, rate: float = RATE, burst: int = BURST):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        # An asyncio.Lock belongs to one event loop and every geocode_all() call runs a new one; the tokens
+        # carry over between runs, so back-to-back runs still share the rate limit
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock, self._loop = asyncio.Lock(), loop
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class Geocoder:
+    """
+    Cached, deduplicated, rate-limited geocoding over any backend.
+    geocode_all() is the synchronous entry point; geocode_many() is the coroutine,
+    awaited directly where an event loop is already running (e.g. Jupyter).
+    Lookups that run out of retries count in stats['failed'] and are listed in
+    `failures` for the caller to report.
+    """
+
+    def __init__(self, backend=None, cache: Optional[GeocodeCache] = None, concurrency: int = CONCURRENCY,
+                 rate: float = RATE, burst: int = BURST, retries: int = RETRIES, backoff: float = BACKOFF):
+        self.backend = backend if backend is not None else NominatimBackend()
+        self.cache = cache
+        self.concurrency = max(1, concurrency)
+        self.bucket = TokenBucket(rate, burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.errors = retryable_errors()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {'cached': 0, 'fetched': 0, 'failed': 0}
+        self.failures: List[Tuple[str, str]] = []  # (query, error) for lookups that ran out of retries
+
+    async def _fetch(self, query: str) -> Optional[GeocodeResult]:
+        # One backend lookup with retries; raises the last error when they run out
+        for attempt in range(self.retries + 1):
+            await self.bucket.acquire()
+            try:
+                if inspect.iscoroutinefunction(self.backend.geocode):
+                    return await self.backend.geocode(query)
+                return await asyncio.get_running_loop().run_in_executor(None, self.backend.geocode, query)
+            except self.errors:
+                if attempt == self.retries:
+                    raise
+                await asyncio.sleep(self.backoff * 2 ** attempt * (0.5 + random.random()))
+        return None
+
+    async def _worker(self, queue: asyncio.Queue, originals: Mapping[str, str]):
+        while True:
+            key = await queue.get()
+            future = self._inflight[key]
+            try:
+                result = await self._fetch(originals[key])
+            except Exception as exc:  # failed lookups are reported as not found but not cached
+                self.stats['failed'] += 1
+                self.failures.append((originals[key], repr(exc)))
+                future.set_result(None)
+            else:
+                self.stats['fetched'] += 1
+                if self.cache is not None:
+                    self.cache.put(key, result)
+                future.set_result(result)
+            finally:
+                del self._inflight[key]
+                queue.task_done()
+
+    async def geocode_many(self, queries: Iterable[str]) -> Dict[str, Optional[GeocodeResult]]:
+        """Result (or None) for each distinct query, keyed by the query as given."""
+        originals: Dict[str, str] = {}
+        by_query: Dict[str, str] = {}
+        for q in queries:
+            if q is None or (isinstance(q, float) and q != q):
+                continue
+            key = normalize_query(q)
+            by_query[q] = key
+            originals.setdefault(key, str(q).strip())
+
+        known = self.cache.get_many(originals) if self.cache is not None else {}
+        self.stats['cached'] += len(known)
+        waiting: Dict[str, asyncio.Future] = {}
+        queue: asyncio.Queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        for key in originals:
+            if key in known:
+                continue
+            if key not in self._inflight:  # else another call is already looking it up
+                self._inflight[key] = loop.create_future()
+                queue.put_nowait(key)
+            waiting[key] = self._inflight[key]
+
+        workers = [asyncio.create_task(self._worker(queue, originals))
+                   for _ in range(min(self.concurrency, queue.qsize()))]
+        try:
+            await queue.join()
+            fetched = {key: await fut for key, fut in waiting.items()}
+        finally:
+            for w in workers:
+                w.cancel()
+        answers = {**known, **fetched}
+        return {q: answers.get(key) for q, key in by_query.items()}
+
+    def geocode_all(self, queries: Iterable[str]) -> Dict[str, Optional[GeocodeResult]]:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.geocode_many(queries))
+        # Checked before the coroutine is created, so none is left un-awaited
+        raise RuntimeError('geocode_all() cannot run inside an event loop (e.g. a Jupyter cell); '
+                           'await geocode_many() or enrich_distilleries_async() instead')
+
+
+#########################
+# Distillery enrichment #
+#########################
+
+def enrich_distilleries(distilleries: pd.DataFrame, geocoder: Geocoder,
+                        name_col: str = 'distillery', country_col: str = 'country') -> pd.DataFrame:
+    """
+    Adds address_latitude / address_longitude / address_country from the
+    distillery name, and latitude / longitude: the address when its country
+    matches the listed one, else the listed country's coordinates. Every distinct
+    name and country is geocoded once, in one concurrent pass.
+    """
+    found = geocoder.geocode_all(_enrichment_queries(distilleries, name_col, country_col))
+    return _add_coordinates(distilleries, found, name_col, country_col)
+
+async def enrich_distilleries_async(distilleries: pd.DataFrame, geocoder: Geocoder,
+                                    name_col: str = 'distillery', country_col: str = 'country') -> pd.DataFrame:
+    """enrich_distilleries for callers already inside an event loop (e.g. Jupyter)."""
+    found = await geocoder.geocode_many(_enrichment_queries(distilleries, name_col, country_col))
+    return _add_coordinates(distilleries, found, name_col, country_col)
+
+def _enrichment_queries(df: pd.DataFrame, name_col: str, country_col: str) -> List[str]:
+    return df[name_col].dropna().unique().tolist() + df[country_col].dropna().unique().tolist()
+
+def _add_coordinates(distilleries: pd.DataFrame, found: Mapping[str, Optional[GeocodeResult]],
+                     name_col: str, country_col: str) -> pd.DataFrame:
+    df = distilleries.copy()
+
+    def column(values: pd.Series, attr: str) -> pd.Series:
+        return values.map(lambda v: getattr(found.get(v), attr, None))
+
+    df['address_latitude'] = pd.to_numeric(column(df[name_col], 'latitude'), errors='coerce')
+    df['address_longitude'] = pd.to_numeric(column(df[name_col], 'longitude'), errors='coerce')
+    df['address_country'] = column(df[name_col], 'country')
+    same = (df['address_country'] == df[country_col]).to_numpy()
+    df['latitude'] = df['address_latitude'].where(same, pd.to_numeric(column(df[country_col], 'latitude'), errors='coerce'))
+    df['longitude'] = df['address_longitude'].where(same, pd.to_numeric(column(df[country_col], 'longitude'), errors='coerce'))
+    return df
+
+
+############################
+# Command line entry point #
+############################
+
+def main(argv: Optional[List[str]] = None):
+    p = argparse.ArgumentParser(description="Geocode whisky distilleries (name, then listed country) with a persistent cache.")
+    p.add_argument('input', help="CSV with 'distillery' and 'country' columns (the notebook's scraped table)")
+    p.add_argument('--out', default='distillery_data.csv', help='Output CSV (default: distillery_data.csv)')
+    p.add_argument('--cache', default=CACHE_PATH, help=f'SQLite geocode cache (default: {CACHE_PATH})')
+    p.add_argument('--concurrency', type=int, default=CONCURRENCY, help=f'Lookups in flight (default {CONCURRENCY})')
+    p.add_argument('--rate', type=float, default=RATE, help=f'Requests per second, 0 = unlimited (default {RATE})')
+    p.add_argument('--retries', type=int, default=RETRIES, help=f'Retries per lookup on timeouts (default {RETRIES})')
+    p.add_argument('--user-agent', default=USER_AGENT, help='User agent sent to Nominatim')
+    p.add_argument('--stub', default=None,
+                   help='Answer from this CSV (query, latitude, longitude, country) instead of Nominatim')
+    p.add_argument('--all-columns', action='store_true', help='Keep the address_* columns in the output')
+    args = p.parse_args(argv)
+
+    backend = StubBackend(args.stub) if args.stub else NominatimBackend(args.user_agent)
+    cache = GeocodeCache(args.cache)
+    try:
+        geocoder = Geocoder(backend, cache, concurrency=args.concurrency, rate=args.rate, retries=args.retries)
+        start = time.perf_counter()
+        df = enrich_distilleries(pd.read_csv(args.input), geocoder)
+    finally:
+        cache.close()
+    if not args.all_columns:
+        df = df[['distillery', 'country', 'latitude', 'longitude']]
+    df.to_csv(args.out)
+    for query, error in geocoder.failures:
+        print(f'Geocoding failed for {query!r}: {error}', file=sys.stderr)
+    s = geocoder.stats
+    print(f"Geocoded {len(df)} distilleries in {time.perf_counter() - start:.1f}s: "
+          f"{s['cached']} cached, {s['fetched']} looked up, {s['failed']} failed -> {args.out}")
+
+if __name__ == '__main__':
+    main()